@@ -0,0 +1,74 @@
+import sys
+import os
+import argparse
+import json
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.models.backtest import run_backtest
+from src.models.forecast_engines import FORECAST_ENGINES
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="预测准确度和速度的滚动起点回测")
+    parser.add_argument('ledgers', nargs='*', default=['data/account_records.json'],
+                        help="账本数据文件或包含账本文件的目录")
+    parser.add_argument('--engines', default='numpy,holt_winters',
+                        help=f"逗号分隔的预测引擎，可选: {', '.join(FORECAST_ENGINES)}")
+    parser.add_argument('--horizon', type=int, default=30, help="预测天数")
+    parser.add_argument('--min-train', type=int, default=60, help="第一个起点的训练天数")
+    parser.add_argument('--step', type=int, default=7, help="相邻起点间隔的天数")
+    parser.add_argument('--workers', type=int, default=None, help="并行进程数，默认为CPU核数")
+    parser.add_argument('--output', default='backtest_results.json', help="结果JSON文件路径")
+    return parser.parse_args(argv)
+
+def collect_ledgers(paths):
+    """把命令行中的文件和目录展开为账本数据文件列表"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith('.json'))
+        else:
+            files.append(path)
+    return files
+
+def main(argv=None):
+    args = parse_args(argv)
+    engines = [name.strip() for name in args.engines.split(',') if name.strip()]
+    ledgers = collect_ledgers(args.ledgers)
+    print(f"开始回测: {len(ledgers)} 个账本，引擎 {', '.join(engines)}，预测 {args.horizon} 天")
+
+    start = time.time()
+    results = run_backtest(ledgers, engines, horizon=args.horizon, min_train=args.min_train,
+                           step=args.step, max_workers=args.workers)
+    elapsed = time.time() - start
+
+    report = {
+        'generated_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime()),
+        'elapsed_seconds': elapsed,
+        'config': {'engines': engines, 'horizon': args.horizon, 'min_train': args.min_train,
+                   'step': args.step, 'ledgers': ledgers},
+        'results': results,
+    }
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    for result in results:
+        if not result['folds']:
+            print(f"  {result['ledger']} / {result['engine']}: 数据不足，跳过")
+            continue
+        mae = result['mae']
+        print(f"  {result['ledger']} / {result['engine']}: {result['folds']} 折，"
+              f"首日MAE 收入 {mae['income'][0]:.2f} 支出 {mae['expense'][0]:.2f}，"
+              f"平均拟合耗时 {result['fit_latency_ms']['mean']:.3f} 毫秒，"
+              f"外推耗时 {result['predict_latency_ms']['mean']:.3f} 毫秒")
+    print(f"结果已写入 {args.output}（耗时 {elapsed:.1f} 秒）")
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import sys
+import os
+import argparse
+import json
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.models.profile_batch import collect_ledger_files, run_profiles
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="批量并行计算多个账本的经济画像")
+    parser.add_argument('ledgers', nargs='*', default=['data/ledgers'],
+                        help="账本数据文件、包含账本文件的目录或通配符（如 'data/households/*.json'）")
+    parser.add_argument('--output', default='profiles.jsonl', help="经济画像JSONL文件路径")
+    parser.add_argument('--summary', default='profiles_summary.json', help="人群分位统计JSON文件路径")
+    parser.add_argument('--workers', type=int, default=None, help="并行进程数，默认为CPU核数")
+    parser.add_argument('--chunk-size', type=int, default=16, help="每个任务包含的账本数")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    data_files = collect_ledger_files(args.ledgers)
+    print(f"开始计算经济画像: {len(data_files)} 个账本")
+
+    start = time.time()
+    summary = run_profiles(data_files, args.output, max_workers=args.workers, chunk_size=args.chunk_size)
+    summary['elapsed_seconds'] = time.time() - start
+
+    summary_dir = os.path.dirname(args.summary)
+    if summary_dir:
+        os.makedirs(summary_dir, exist_ok=True)
+    with open(args.summary, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    labels = {'engel_coefficient': '恩格尔系数', 'avg_propensity_consumption': 'APC',
+              'marginal_propensity_consumption': 'MPC'}
+    for name, label in labels.items():
+        percentiles = summary['percentiles'][name]
+        if percentiles:
+            print(f"  {label}: P10 {percentiles['p10']:.2%}，中位数 {percentiles['p50']:.2%}，P90 {percentiles['p90']:.2%}")
+    if summary['failed']:
+        print(f"  {summary['failed']} 个账本无法读取，错误信息见 {args.output}")
+    print(f"{summary['profiled']}/{summary['ledgers']} 个账本生成了画像，"
+          f"结果已写入 {args.output} 和 {args.summary}（耗时 {summary['elapsed_seconds']:.1f} 秒）")
+    return summary
+
+if __name__ == "__main__":
+    main()
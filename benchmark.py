@@ -0,0 +1,107 @@
+import sys
+import os
+import subprocess
+import time
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.models.account_model import AccountModel
+from src.models.forecast_engines import FORECAST_ENGINES
+from src.models.prediction_model import PredictionModel
+
+class Benchmark:
+    """预测相关路径的简单性能基准"""
+
+    def __init__(self, repeat=200):
+        self.repeat = repeat
+
+    def measure_import(self, statement):
+        """在新的解释器中测量导入耗时（毫秒）"""
+        code = f"import time; t = time.perf_counter(); {statement}; print((time.perf_counter() - t) * 1000)"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        return float(output.stdout.strip())
+
+    def measure_call(self, func, repeat=None):
+        """测量函数平均每次调用耗时（毫秒）"""
+        repeat = repeat or self.repeat
+        func()  # 预热（包括可能的延迟导入）
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000 / repeat
+
+    def run_imports(self):
+        """比较启动阶段的导入耗时"""
+        print("\n导入耗时（新解释器，毫秒）")
+        for label, statement in (
+            ("PredictionModel", "from src.models.prediction_model import PredictionModel"),
+            ("sklearn.linear_model", "import sklearn.linear_model"),
+        ):
+            try:
+                print(f"  {label:<24}{self.measure_import(statement):>10.1f}")
+            except subprocess.CalledProcessError:
+                print(f"  {label:<24}{'未安装':>10}")
+
+    def run_engines(self, sizes=(30, 365, 3650), days_ahead=30):
+        """比较各预测引擎单次预测耗时"""
+        print(f"\n单序列预测耗时（预测{days_ahead}天，毫秒/次）")
+        print(f"  {'历史天数':<10}" + ''.join(f"{name:>14}" for name in FORECAST_ENGINES))
+        rng = np.random.default_rng(0)
+        for size in sizes:
+            values = rng.uniform(0, 1000, size=size)
+            row = f"  {size:<14}"
+            for name in FORECAST_ENGINES:
+                engine = FORECAST_ENGINES[name]()
+                try:
+                    elapsed = self.measure_call(lambda: np.maximum(engine.forecast(values, days_ahead), 0))
+                    row += f"{elapsed:>14.3f}"
+                except ImportError:
+                    row += f"{'未安装':>14}"
+            print(row)
+
+    def build_models(self, count, seed=0):
+        """生成包含count条随机记录的临时账本（不写入文件）"""
+        rng = np.random.default_rng(seed)
+        days = rng.integers(0, 3650, size=count)
+        dates = (np.datetime64('2015-01-01') + days).astype(str)
+        cents = rng.integers(1, 1_000_000, size=count)
+        is_income = rng.random(count) < 0.3
+        account_model = AccountModel('data/benchmark_records.json')
+        account_model.records = [
+            {'id': i + 1, 'amount': int(cents[i]) / 100, 'amount_cents': int(cents[i]),
+             'type': 'income' if is_income[i] else 'expense', 'date': str(dates[i]),
+             'description': '', 'category': 'other'}
+            for i in range(count)
+        ]
+        return account_model, PredictionModel(account_model)
+
+    def run_time_range(self, count=1_000_000):
+        """按时间区间预测的耗时"""
+        print(f"\n按时间区间预测（{count}条记录，毫秒/次）")
+        account_model, prediction_model = self.build_models(count)
+        start = time.perf_counter()
+        account_model.get_record_arrays()
+        print(f"  {'构建列式数组（首次）':<20}{(time.perf_counter() - start) * 1000:>10.1f}")
+        query = lambda: prediction_model.predict_future_by_time_range('2018-01-01', '2020-12-31', 30)
+
+        def uncached():
+            prediction_model.result_cache.clear()
+            query()
+
+        elapsed = self.measure_call(uncached, repeat=20)
+        print(f"  {'predict_future_by_time_range':<20}{elapsed:>10.3f}")
+        elapsed = self.measure_call(query, repeat=1000)
+        print(f"  {'重复查询（命中缓存）':<20}{elapsed:>10.4f}")
+
+    def run(self):
+        print("开始性能基准测试...")
+        self.run_imports()
+        self.run_engines()
+        self.run_time_range()
+
+if __name__ == "__main__":
+    Benchmark().run()
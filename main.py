@@ -1,12 +1,13 @@
 import sys
 import os
+import argparse
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # 导入模型
-from src.models.account_model import AccountModel
-from src.models.prediction_model import PredictionModel
+from src.models.ledger_registry import LedgerRegistry, DEFAULT_LEDGER
+from src.models.budget_model import BudgetEngine, DEFAULT_BUDGET_RULES_FILE, load_budget_rules
 
 # 确保导入PySide6时出现问题不会导致整个程序崩溃
 try:
@@ -18,20 +19,45 @@ except ImportError:
     print("警告: PySide6库未安装。请安装PySide6库以使用图形界面。")
     print("安装命令: pip install PySide6")
 
+def parse_args(argv=None):
+    """解析命令行参数（未识别的参数留给Qt处理）"""
+    parser = argparse.ArgumentParser(description="智能记账本")
+    parser.add_argument('--ledger', default=DEFAULT_LEDGER, help="要打开的账本名称")
+    parser.add_argument('--ledger-dir', default='data/ledgers', help="账本数据文件所在目录")
+    parser.add_argument('--serve', action='store_true', help="以无界面模式启动本地HTTP/JSON接口服务")
+    parser.add_argument('--host', default='127.0.0.1', help="接口服务监听地址")
+    parser.add_argument('--port', type=int, default=8000, help="接口服务监听端口")
+    parser.add_argument('--budget-rules', default=DEFAULT_BUDGET_RULES_FILE, help="预算规则JSON文件")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
 def main():
     """主函数"""
+    args = parse_args()
+    
+    registry = LedgerRegistry(ledger_dir=args.ledger_dir)
+    budget_rules = load_budget_rules(args.budget_rules)
+    
+    # 无界面服务模式：模型常驻内存，通过HTTP接口访问
+    if args.serve:
+        from src.views.api_server import ApiServer
+        ApiServer(registry, args.host, args.port, budget_rules=budget_rules).serve_forever()
+        return
+    
     # 初始化模型
-    account_model = AccountModel()
-    prediction_model = PredictionModel(account_model)
+    account_model, prediction_model = registry.get(args.ledger)
     
     # 尝试启动图形界面
     if has_gui:
         try:
             print("正在启动图形界面...")
             app = QApplication(sys.argv)
-            window = PyQtMainView(account_model, prediction_model)
+            budget_engine = BudgetEngine(account_model, prediction_model, budget_rules) if budget_rules else None
+            window = PyQtMainView(account_model, prediction_model, budget_engine)
             window.show()
-            sys.exit(app.exec())
+            exit_code = app.exec()
+            registry.close()
+            sys.exit(exit_code)
         except Exception as e:
             print(f"启动图形界面时出错: {str(e)}")
             print("请确保PySide6已正确安装: pip install PySide6")
@@ -43,6 +69,7 @@ def main():
     print("可以通过以下命令安装：pip install PySide6")
     print("\n现在启动功能完整的终端界面版本...")
     run_terminal_interface(account_model, prediction_model)
+    registry.close()
 
 def run_terminal_interface(account_model, prediction_model):
     """终端界面版本"""
@@ -70,20 +97,29 @@ def run_terminal_interface(account_model, prediction_model):
         else:
             print("无效的选择，请重新输入。")
 
-def show_all_records(account_model):
-    """显示所有记录"""
-    records = account_model.get_all_records()
-    if not records:
+def show_all_records(account_model, page_size=20):
+    """分页显示所有记录"""
+    page = account_model.get_records_page(limit=page_size, order_by='date')
+    if not page['records']:
         print("暂无记录。")
         return
     
     print("\n===== 所有记录 =====")
-    print(f"{'ID':<5} {'金额':<10} {'类型':<8} {'日期':<12} {'描述':<20} {'创建时间':<20}")
-    print("-" * 85)
+    print(f"{'ID':<5} {'金额':<10} {'类型':<8} {'分类':<8} {'日期':<12} {'描述':<20} {'创建时间':<20}")
+    print("-" * 95)
     
-    for record in records:
-        type_text = "收入" if record['type'] == 'income' else "支出"
-        print(f"{record['id']:<5} {record['amount']:<10.2f} {type_text:<8} {record['date']:<12} {record['description'][:18]:<20} {record['created_at'][:19]:<20}")
+    get_label = account_model.classifier.get_label
+    while True:
+        for record in page['records']:
+            type_text = "收入" if record['type'] == 'income' else "支出"
+            category_text = get_label(record.get('category'))
+            print(f"{record['id']:<5} {record['amount']:<10.2f} {type_text:<8} {category_text:<8} {record['date']:<12} {record['description'][:18]:<20} {record['created_at'][:19]:<20}")
+        
+        if not page['next_cursor']:
+            break
+        if input("按回车查看下一页，输入q返回: ").strip().lower() == 'q':
+            break
+        page = account_model.get_records_page(page['next_cursor'], limit=page_size, order_by='date')
 
 def add_new_record(account_model):
     """新增记录"""
@@ -1,16 +1,100 @@
+import bisect
+import itertools
 import json
+import math
 import os
+from contextlib import contextmanager
 from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+import numpy as np
+
+from src.models.category_model import CategoryClassifier
+
+# 分页游标中各排序方式的前缀
+_CURSOR_ORDERS = ('date', '-date', 'id', '-id')
+
+# 账本版本号来源：进程内全局递增，账本被淘汰后重新加载也不会与旧版本号重复
+_version_counter = itertools.count(1)
+
+# 内存估算：每个账本的固定开销和每条记录（字典、字符串及索引项）的平均开销
+LEDGER_BASE_BYTES = 64 * 1024
+RECORD_BYTES = 1024
+
+# 单笔金额上限（分）：元金额可用浮点数精确表示到分，且大量记录求和不会超出int64
+MAX_CENTS = 10 ** 15
+
+def to_cents(amount):
+    """把金额转换为以分为单位的整数（四舍五入到分），超出 ±MAX_CENTS 时抛出ValueError"""
+    if isinstance(amount, int):
+        cents = amount * 100
+    else:
+        # 快速路径：最多两位小数的普通写法（如 '19.9'、12.35）直接按字符串拆分
+        text = str(amount).strip()
+        whole, _, frac = text.partition('.')
+        digits = whole[1:] if whole[:1] in ('-', '+') else whole
+        if digits.isdigit() and len(frac) <= 2 and (not frac or frac.isdigit()):
+            cents = int(digits) * 100 + int(frac.ljust(2, '0'))
+            if whole[:1] == '-':
+                cents = -cents
+        else:
+            try:
+                value = Decimal(text)
+                if not value.is_finite():
+                    raise ValueError(f"无效的金额: {amount}")
+                if abs(value) * 100 > MAX_CENTS:
+                    raise ValueError(f"金额超出范围: {amount}")
+                cents = int(value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP) * 100)
+            except InvalidOperation:
+                raise ValueError(f"无效的金额: {amount}")
+    if not -MAX_CENTS <= cents <= MAX_CENTS:
+        raise ValueError(f"金额超出范围: {amount}")
+    return cents
+
+def from_cents(cents):
+    """把以分为单位的整数转换回元"""
+    return int(cents) / 100
+
+def day_number(date):
+    """把 'YYYY-MM-DD' 日期转换为自1970-01-01起的天数"""
+    return int(np.datetime64(AccountModel._date_key(date), 'D').astype(np.int64))
 
 class AccountModel:
-    def __init__(self, data_file='data/account_records.json'):
+    def __init__(self, data_file='data/account_records.json', categories=None):
         self.data_file = data_file
+        # 交易分类器，categories为 分类 -> 关键词列表，默认使用内置分类体系
+        self.classifier = CategoryClassifier(categories)
         self.ensure_data_directory()
+        # 账本版本号，每次修改记录都会递增，可用作缓存键
+        self.version = 0
+        # 记录变化监听器，回调形式为 callback(event, record)
+        self._listeners = []
         self.records = self.load_records()
+        # 内存中是否有尚未写入文件的修改
+        self._dirty = False
+        # 批量操作的嵌套层数，大于0时修改只在内存中进行，退出批量时统一保存
+        self._batch_depth = 0
+    
+    @property
+    def records(self):
+        """当前内存中的全部记录（按插入顺序）"""
+        return self._records
+    
+    @records.setter
+    def records(self, records):
+        """整体替换记录时同步重建索引；无法解析的记录移入 quarantined_records，不影响账本其余记录的使用"""
+        self._records, self.quarantined_records = self._split_invalid(records)
+        if self.quarantined_records:
+            print(f"账本 {self.data_file} 中有 {len(self.quarantined_records)} 条记录无法解析，已隔离（保存时原样保留）")
+        self._rebuild_indexes()
+        self._mark_changed()
+        self._notify('reset')
     
     def ensure_data_directory(self):
-        """确保数据目录存在"""
-        os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
+        """确保数据目录存在（数据文件在当前目录时无需创建）"""
+        data_dir = os.path.dirname(self.data_file)
+        if data_dir:
+            os.makedirs(data_dir, exist_ok=True)
     
     def load_records(self):
         """从文件加载记录"""
@@ -24,73 +108,479 @@ class AccountModel:
             return []
     
     def save_records(self):
-        """保存记录到文件"""
+        """保存记录到文件（先写临时文件再原子替换，避免写到一半时损坏数据）"""
+        temp_file = f"{self.data_file}.tmp"
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.records, f, ensure_ascii=False, indent=2, default=str)
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                # 隔离的记录原样写回，便于手工修复
+                json.dump(self.records + self.quarantined_records, f, ensure_ascii=False, indent=2, default=str)
+            os.replace(temp_file, self.data_file)
+            self._dirty = False
             return True
         except Exception as e:
             print(f"保存记录时出错: {e}")
             return False
     
-    def add_record(self, amount, record_type, date, description=''):
-        """添加一条收支记录"""
+    def flush(self):
+        """如有未保存的修改则写入文件"""
+        if not self._dirty:
+            return True
+        return self.save_records()
+    
+    @contextmanager
+    def batch(self):
+        """批量操作上下文：期间的新增、删除不逐条写文件，退出时只保存一次
+
+        可以嵌套使用，只有最外层退出时才写入文件；保存结果可通过 flush() 确认。
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush()
+    
+    def add_listener(self, callback):
+        """注册记录变化监听器
+        
+        callback(event, record) 在记录变化后同步调用，event 取值：
+        'add'（新增记录）、'delete'（删除记录）、'reset'（记录被整体替换或重新分类，record为None）
+        """
+        self._listeners.append(callback)
+    
+    def remove_listener(self, callback):
+        """移除记录变化监听器"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def _notify(self, event, record=None):
+        """通知全部监听器"""
+        for callback in list(self._listeners):
+            callback(event, record)
+    
+    def _persist(self):
+        """修改记录后保存，批量操作期间推迟到批量结束"""
+        if self._batch_depth:
+            return True
+        return self.save_records()
+    
+    def estimate_memory(self):
+        """粗略估算本账本占用的内存字节数"""
+        return LEDGER_BASE_BYTES + RECORD_BYTES * len(self.records)
+    
+    def add_record(self, amount, record_type, date, description='', category=None):
+        """添加一条收支记录，未指定分类时根据描述自动分类"""
+        amount_cents = to_cents(amount)
+        if category is not None and not isinstance(category, str):
+            raise ValueError(f"无效的分类: {category}")
         record = {
             'id': self._generate_id(),
-            'amount': float(amount),
+            'amount': from_cents(amount_cents),
+            'amount_cents': amount_cents,  # 内部以分为单位存储，避免浮点累积误差
             'type': record_type,  # 'income' 或 'expense'
             'date': date,
             'description': description,
+            'category': category or self.classifier.classify(description),
             'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
+        # 先建索引再加入记录列表，索引失败时记录不会留在账本中
+        self._index_record(record)
         self.records.append(record)
-        return self.save_records(), record
+        self._mark_changed()
+        self._notify('add', record)
+        return self._persist(), record
     
     def delete_record(self, record_id, delete_reason=''):
         """删除一条收支记录"""
-        for i, record in enumerate(self.records):
-            if record['id'] == record_id:
+        record = self._id_index.get(record_id)
+        if record is None:
+            return False, None
+        
+        for i, candidate in enumerate(self.records):
+            if candidate is record:
                 deleted_record = self.records.pop(i)
-                # 保存删除原因（可以用于恢复或记录）
-                deleted_record['deleted_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                deleted_record['delete_reason'] = delete_reason
-                return self.save_records(), deleted_record
-        return False, None
+                break
+        self._unindex_record(deleted_record)
+        # 保存删除原因（可以用于恢复或记录）
+        deleted_record['deleted_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        deleted_record['delete_reason'] = delete_reason
+        self._mark_changed()
+        self._notify('delete', deleted_record)
+        return self._persist(), deleted_record
     
     def get_all_records(self):
         """获取所有记录"""
         return self.records
     
+    def get_record(self, record_id):
+        """根据ID获取单条记录，不存在时返回None"""
+        return self._id_index.get(record_id)
+    
+    def get_record_cents(self, record):
+        """获取记录以分为单位的金额"""
+        cents = record.get('amount_cents')
+        if cents is None:
+            cents = to_cents(record['amount'])
+        return cents
+    
+    def get_record_arrays(self):
+        """按日期顺序返回记录的列式numpy数组，供向量化计算使用
+        
+        Returns:
+            字典：id、day（自1970-01-01起的天数）、amount_cents（int64，分）、
+            is_income、is_expense（布尔数组）、category（分类）、description（描述）（object数组）；
+            记录变化前重复调用返回同一份缓存
+        """
+        if self._arrays is None:
+            self._arrays = self._build_arrays(self._date_keys)
+        elif self._pending_adds or self._pending_deletes:
+            self._arrays = self._merge_pending_arrays()
+        return self._arrays
+    
+    def _build_arrays(self, date_keys):
+        """由按 (日期, ID) 排序的键列表构建列式数组"""
+        records = [self._id_index[record_id] for _, record_id in date_keys]
+        count = len(records)
+        types = np.array([r['type'] for r in records], dtype=object)
+        return {
+            'id': np.fromiter((r['id'] for r in records), dtype=np.int64, count=count),
+            'day': np.array([key for key, _ in date_keys], dtype='datetime64[D]').astype(np.int64),
+            'amount_cents': np.fromiter((self.get_record_cents(r) for r in records), dtype=np.int64, count=count),
+            'is_income': types == 'income',
+            'is_expense': types == 'expense',
+            'category': np.array([r['category'] for r in records], dtype=object),
+            'description': np.array([r.get('description', '') for r in records], dtype=object),
+        }
+    
+    def _merge_pending_arrays(self):
+        """把上次构建后的增删合并进列式数组：删除用掩码过滤，新增记录只为其自身构建数组后合并，
+        只有新增记录插到已有记录之前时才重新排序，耗时与记录总数成线性的部分全部是向量化运算"""
+        arrays = self._arrays
+        if self._pending_deletes:
+            keep = ~np.isin(arrays['id'], np.fromiter(self._pending_deletes, dtype=np.int64))
+            arrays = {name: column[keep] for name, column in arrays.items()}
+        if self._pending_adds:
+            tail = self._build_arrays(sorted((self._date_key(r['date']), r['id']) for r in self._pending_adds.values()))
+            in_order = (len(arrays['day']) == 0 or
+                        (tail['day'][0], tail['id'][0]) > (arrays['day'][-1], arrays['id'][-1]))
+            arrays = {name: np.concatenate((column, tail[name])) for name, column in arrays.items()}
+            if not in_order:
+                order = np.lexsort((arrays['id'], arrays['day']))
+                arrays = {name: column[order] for name, column in arrays.items()}
+        self._pending_adds = {}
+        self._pending_deletes = set()
+        return arrays
+    
+    def get_record_category(self, record):
+        """获取记录的分类，记录中没有分类字段时现场分类"""
+        category = record.get('category')
+        if category is None:
+            category = self.classifier.classify(record.get('description', ''))
+        return category
+    
+    def get_records_by_category(self, category):
+        """通过分类索引获取某一分类的记录（按ID排序）"""
+        ids = self._category_index.get(category, ())
+        return [self._id_index[record_id] for record_id in sorted(ids)]
+    
+    def get_category_totals(self, records=None):
+        """按 (类型, 分类) 汇总金额"""
+        if records is None:
+            records = self.records
+        
+        totals = {}
+        for r in records:
+            key = (r['type'], self.get_record_category(r))
+            totals[key] = totals.get(key, 0) + self.get_record_cents(r)
+        return {key: from_cents(cents) for key, cents in totals.items()}
+    
+    def reclassify_records(self, categories=None):
+        """更换分类体系后重新分类全部记录并保存"""
+        if categories is not None:
+            self.classifier = CategoryClassifier(categories)
+        for r in self.records:
+            r['category'] = self.classifier.classify(r.get('description', ''))
+        self._rebuild_indexes()
+        self._mark_changed()
+        self._notify('reset')
+        return self.save_records()
+    
     def get_records_by_date_range(self, start_date=None, end_date=None):
-        """根据日期范围获取记录"""
-        filtered_records = self.records.copy()
+        """根据日期范围获取记录（按日期排序）"""
+        return list(self.iter_records({'start_date': start_date, 'end_date': end_date}))
+    
+    def iter_records(self, filters=None, order='date'):
+        """按索引顺序逐条产出记录，不复制记录列表
+        
+        Args:
+            filters: 可选的过滤条件字典，支持 start_date、end_date（'YYYY-MM-DD'）、
+                type（'income' 或 'expense'）、category、keyword（匹配描述）
+                和 search（界面搜索框，匹配描述、分类名称、金额、日期、创建时间及“收入”/“支出”）
+            order: 'date'、'-date'、'id'、'-id'，或 None 表示插入顺序
+            
+        Yields:
+            内存中的记录字典本身（调用方不应修改）
+        """
+        if order is None:
+            predicate = self._build_filter(filters)
+            return (r for r in self.records if predicate(r))
+        return self._iter_ordered(order, filters)
+    
+    def get_records_page(self, cursor=None, limit=20, order_by='date', filters=None):
+        """基于游标的分页查询
+        
+        Args:
+            cursor: 上一页返回的 next_cursor，None 表示第一页
+            limit: 每页记录数
+            order_by: 'date'、'-date'、'id' 或 '-id'
+            filters: 与 iter_records 相同的过滤条件
+            
+        Returns:
+            {'records': 本页记录列表, 'next_cursor': 下一页游标或None}
+        """
+        if limit <= 0:
+            raise ValueError("每页记录数必须大于0")
+        after = self._decode_cursor(cursor, order_by) if cursor else None
+        iterator = self._iter_ordered(order_by, filters, after)
         
-        if start_date:
-            start = datetime.strptime(start_date, '%Y-%m-%d')
-            filtered_records = [r for r in filtered_records if datetime.strptime(r['date'], '%Y-%m-%d') >= start]
+        page = []
+        for record in iterator:
+            if len(page) == limit:
+                # 还有下一条记录，说明存在下一页
+                return {'records': page, 'next_cursor': self._encode_cursor(page[-1], order_by)}
+            page.append(record)
+        return {'records': page, 'next_cursor': None}
+    
+    def _iter_ordered(self, order, filters=None, after=None):
+        """沿日期索引或ID索引遍历记录，after为游标位置（不含）"""
+        if order not in _CURSOR_ORDERS:
+            raise ValueError(f"不支持的排序方式: {order}")
+        filters = filters or {}
+        start_date = filters.get('start_date')
+        end_date = filters.get('end_date')
+        predicate = self._build_filter(filters, with_dates=order in ('id', '-id'))
+        descending = order.startswith('-')
+        
+        if order in ('date', '-date'):
+            keys = self._date_keys
+            lo = 0
+            hi = len(keys)
+            if start_date:
+                lo = bisect.bisect_left(keys, (self._parse_query_date(start_date),))
+            if end_date:
+                hi = bisect.bisect_right(keys, (self._parse_query_date(end_date), math.inf))
+            if after is not None:
+                if descending:
+                    hi = min(hi, bisect.bisect_left(keys, after))
+                else:
+                    lo = max(lo, bisect.bisect_right(keys, after))
+            positions = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+            for i in positions:
+                record = self._id_index[keys[i][1]]
+                if predicate(record):
+                    yield record
+        else:
+            keys = self._id_keys
+            lo = 0
+            hi = len(keys)
+            if after is not None:
+                if descending:
+                    hi = bisect.bisect_left(keys, after)
+                else:
+                    lo = bisect.bisect_right(keys, after)
+            positions = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+            for i in positions:
+                record = self._id_index[keys[i]]
+                if predicate(record):
+                    yield record
+    
+    def _build_filter(self, filters, with_dates=True):
+        """把过滤条件编译成单条记录的判断函数"""
+        filters = filters or {}
+        start = filters.get('start_date')
+        end = filters.get('end_date')
+        start = self._parse_query_date(start) if start and with_dates else None
+        end = self._parse_query_date(end) if end and with_dates else None
+        record_type = filters.get('type')
+        category = filters.get('category')
+        keyword = filters.get('keyword')
+        keyword = keyword.lower().strip() if keyword else None
+        search = filters.get('search')
+        search = search.lower().strip() if search else None
+        get_label = self.classifier.get_label
         
-        if end_date:
-            end = datetime.strptime(end_date, '%Y-%m-%d')
-            filtered_records = [r for r in filtered_records if datetime.strptime(r['date'], '%Y-%m-%d') <= end]
+        def predicate(record):
+            if start or end:
+                date_key = self._date_key(record['date'])
+                if start and date_key < start:
+                    return False
+                if end and date_key > end:
+                    return False
+            if record_type and record['type'] != record_type:
+                return False
+            if category and record.get('category') != category:
+                return False
+            if keyword and keyword not in str(record['description']).lower():
+                return False
+            if search and not (search in str(record['description']).lower() or
+                               search in get_label(record.get('category')) or
+                               search in str(record['amount']) or
+                               search in record['date'] or
+                               search in record['created_at'] or
+                               (record['type'] == 'income' and '收入' in search) or
+                               (record['type'] == 'expense' and '支出' in search)):
+                return False
+            return True
         
-        return filtered_records
+        return predicate
+    
+    def _encode_cursor(self, record, order_by):
+        """根据本页最后一条记录生成游标"""
+        if order_by in ('date', '-date'):
+            return f"{order_by}|{self._date_key(record['date'])}|{record['id']}"
+        return f"{order_by}|{record['id']}"
+    
+    def _decode_cursor(self, cursor, order_by):
+        """解析游标为索引键"""
+        parts = str(cursor).split('|')
+        try:
+            if parts[0] != order_by:
+                raise ValueError
+            if order_by in ('date', '-date'):
+                return (parts[1], int(parts[2]))
+            return int(parts[1])
+        except (ValueError, IndexError):
+            raise ValueError(f"无效的分页游标: {cursor}")
+    
+    def _split_invalid(self, records):
+        """把记录分为可用记录和无法解析的记录（非对象、ID非整数、日期或金额无效），没有无效记录时原样返回列表"""
+        invalid = []
+        for r in records:
+            try:
+                if not isinstance(r, dict) or not isinstance(r['id'], int) or isinstance(r['id'], bool):
+                    raise ValueError("记录格式无效")
+                cents = r.get('amount_cents')
+                if cents is None:
+                    to_cents(r['amount'])
+                elif not isinstance(cents, int) or isinstance(cents, bool) or abs(cents) > MAX_CENTS:
+                    raise ValueError("金额无效")
+                if not isinstance(r['date'], str):
+                    raise ValueError("日期无效")
+            except (KeyError, TypeError, ValueError):
+                invalid.append(r)
+        bad = {id(r) for r in invalid}
+        valid = [r for r in records if id(r) not in bad] if bad else records
+        # 日期一次向量化校验，出错（含非标准写法）时才逐条规范后校验
+        try:
+            np.array([r['date'] for r in valid], dtype='datetime64[D]')
+        except ValueError:
+            for r in valid:
+                try:
+                    np.datetime64(self._date_key(r['date']), 'D')
+                except ValueError:
+                    invalid.append(r)
+        if not invalid:
+            self._quarantined_max_id = 0
+            return records, []
+        bad.update(id(r) for r in invalid)
+        self._quarantined_max_id = max((r['id'] for r in invalid if isinstance(r, dict)
+                                        and isinstance(r.get('id'), int)), default=0)
+        return [r for r in records if id(r) not in bad], [r for r in records if id(r) in bad]
+
+    def _rebuild_indexes(self):
+        """重建ID索引、日期索引和分类索引，缺少分类的记录在此补充分类"""
+        self._id_index = {r['id']: r for r in self._records}
+        self._id_keys = sorted(self._id_index)
+        self._date_keys = sorted((self._date_key(r['date']), r['id']) for r in self._records)
+        self._category_index = {}
+        self._income_cents = 0
+        self._expense_cents = 0
+        self._arrays = None
+        # 列式数组构建后的新增记录（ID -> 记录）和删除的ID，下次读取时合并
+        self._pending_adds = {}
+        self._pending_deletes = set()
+        for r in self._records:
+            if r.get('category') is None:
+                r['category'] = self.classifier.classify(r.get('description', ''))
+            if r.get('amount_cents') is None:
+                r['amount_cents'] = to_cents(r['amount'])
+            self._category_index.setdefault(r['category'], set()).add(r['id'])
+            self._add_to_totals(r, 1)
+    
+    def _mark_changed(self):
+        """记录发生变化：标记未保存并递增版本号"""
+        self._dirty = True
+        self.version = next(_version_counter)
+    
+    def _add_to_totals(self, record, sign):
+        """把记录金额计入（sign=1）或移出（sign=-1）收支累计"""
+        if record['type'] == 'income':
+            self._income_cents += sign * record['amount_cents']
+        elif record['type'] == 'expense':
+            self._expense_cents += sign * record['amount_cents']
+    
+    def _index_record(self, record):
+        """把新记录加入索引"""
+        self._id_index[record['id']] = record
+        self._category_index.setdefault(record['category'], set()).add(record['id'])
+        self._add_to_totals(record, 1)
+        if self._arrays is not None:
+            self._pending_adds[record['id']] = record
+        if not self._id_keys or record['id'] > self._id_keys[-1]:
+            self._id_keys.append(record['id'])
+        else:
+            bisect.insort(self._id_keys, record['id'])
+        bisect.insort(self._date_keys, (self._date_key(record['date']), record['id']))
+    
+    def _unindex_record(self, record):
+        """把记录从索引中移除"""
+        del self._id_index[record['id']]
+        self._category_index.get(record.get('category'), set()).discard(record['id'])
+        self._add_to_totals(record, -1)
+        if self._arrays is not None:
+            if self._pending_adds.pop(record['id'], None) is None:
+                self._pending_deletes.add(record['id'])
+        del self._id_keys[bisect.bisect_left(self._id_keys, record['id'])]
+        date_key = (self._date_key(record['date']), record['id'])
+        del self._date_keys[bisect.bisect_left(self._date_keys, date_key)]
+    
+    @staticmethod
+    def _date_key(date):
+        """把记录日期规范成可按字符串比较的 'YYYY-MM-DD'"""
+        if len(date) == 10 and date[4] == '-' and date[7] == '-':
+            return date
+        try:
+            return datetime.strptime(date, '%Y-%m-%d').strftime('%Y-%m-%d')
+        except ValueError:
+            return date
+    
+    @staticmethod
+    def _parse_query_date(date):
+        """校验查询日期并返回规范化的日期字符串"""
+        return datetime.strptime(date, '%Y-%m-%d').strftime('%Y-%m-%d')
     
     def get_incomes_and_expenses(self, records=None):
-        """获取收入和支出的汇总数据"""
+        """获取收入和支出的汇总数据（按分精确累加）"""
         if records is None:
-            records = self.records
-        
-        total_income = sum(r['amount'] for r in records if r['type'] == 'income')
-        total_expense = sum(r['amount'] for r in records if r['type'] == 'expense')
+            income_cents = self._income_cents
+            expense_cents = self._expense_cents
+        else:
+            income_cents = 0
+            expense_cents = 0
+            for r in records:
+                if r['type'] == 'income':
+                    income_cents += self.get_record_cents(r)
+                elif r['type'] == 'expense':
+                    expense_cents += self.get_record_cents(r)
         
         return {
-            'total_income': total_income,
-            'total_expense': total_expense,
-            'balance': total_income - total_expense
+            'total_income': from_cents(income_cents),
+            'total_expense': from_cents(expense_cents),
+            'balance': from_cents(income_cents - expense_cents)
         }
     
     def _generate_id(self):
-        """生成唯一ID"""
-        if not self.records:
-            return 1
-        return max(r['id'] for r in self.records) + 1
\ No newline at end of file
+        """生成唯一ID（不与隔离记录的ID重复）"""
+        last = self._id_keys[-1] if self._id_keys else 0
+        return max(last, self._quarantined_max_id) + 1
\ No newline at end of file
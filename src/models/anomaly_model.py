@@ -0,0 +1,265 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from src.models.account_model import day_number
+
+# 正态分布下标准差与平均绝对偏差之比（sqrt(π/2)）
+ABS_DEVIATION_SCALE = 1.2533
+
+def _observe(state, x, learning_rate):
+    """用一个新样本更新 [加权均值, 加权平均绝对偏差, 样本数] 估计（单条记录的O(1)更新）"""
+    mean, spread, count = state
+    rate = max(learning_rate, 1 / (count + 1))
+    state[0] = mean + rate * (x - mean)
+    if count:
+        state[1] = spread + rate * (abs(x - mean) - spread)
+    state[2] = count + 1
+
+def linear_scan(a, b):
+    """求解一阶线性递推 y[t] = a[t]·y[t-1] + b[t]（y[-1]=0）
+
+    按倍增步长合并相邻区间的递推系数，log2(n) 轮向量化运算即可得到全部结果；
+    a[t]=0 的位置相当于从该处重新开始。
+    """
+    a = np.array(a, dtype=float)
+    b = np.array(b, dtype=float)
+    shift = 1
+    while shift < len(a):
+        b[shift:] = b[shift:] + a[shift:] * b[:-shift]
+        a[shift:] = a[shift:] * a[:-shift]
+        shift *= 2
+    return b
+
+def grouped_ewm(codes, values, learning_rate, groups=None):
+    """对多组按时间排列的样本同时计算指数加权均值和平均绝对偏差（与 _observe 逐条更新的结果一致）
+
+    Args:
+        codes: 每个样本的组号
+        values: 样本值，组内按时间先后排列
+        groups: 组数，默认为最大组号加1
+
+    Returns:
+        ((每个样本计入之前的均值, 偏差, 样本数), (各组最终的均值, 偏差, 样本数))，
+        前者与输入顺序一致
+    """
+    if groups is None:
+        groups = int(codes.max()) + 1 if len(codes) else 0
+    lengths = np.bincount(codes, minlength=groups)
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    x = values[order]
+    rank = np.arange(len(x)) - (np.cumsum(lengths) - lengths)[sorted_codes]
+    # 组内前几个样本使用 1/(n+1) 的步长（即普通平均），首个样本处递推自动重新开始
+    rate = np.maximum(learning_rate, 1 / (rank + 1))
+    mean = linear_scan(1 - rate, rate * x)
+    prior_mean = np.zeros_like(mean)
+    prior_mean[1:] = mean[:-1]
+    prior_mean[rank == 0] = 0
+    later = rank > 0
+    spread = linear_scan(np.where(later, 1 - rate, 0), np.where(later, rate * np.abs(x - prior_mean), 0))
+    prior_spread = np.zeros_like(spread)
+    prior_spread[1:] = spread[:-1]
+    prior_spread[rank == 0] = 0
+
+    prior = [np.empty_like(prior_mean), np.empty_like(prior_spread), np.empty_like(rank)]
+    for target, source in zip(prior, (prior_mean, prior_spread, rank)):
+        target[order] = source
+    last = np.cumsum(lengths) - 1
+    present = lengths > 0
+    final_mean = np.zeros(groups)
+    final_spread = np.zeros(groups)
+    final_mean[present] = mean[last[present]]
+    final_spread[present] = spread[last[present]]
+    return tuple(prior), (final_mean, final_spread, lengths)
+
+class AnomalyDetector:
+    """支出异常检测
+
+    在对数金额上为每个分类维护单笔支出的指数加权均值（EWMA）和平均绝对偏差估计，
+    为每个星期几维护每日支出合计的估计。对数尺度上的均值对应金额的加权几何平均，
+    作为该组的基准金额，不易被个别大额支出拉高。每个样本在计入估计之前按
+    Z分数 (对数金额 - 均值) / (1.2533·平均绝对偏差) 及其相对基准金额的倍数打分，
+    Z分数或倍数超过阈值（且该组已有足够样本）即标记为异常。
+
+    全部历史一次性向量化计算（线性递推用倍增扫描求解，全部分组同时处理），之后新增记录只需O(1)更新；
+    日合计在出现更晚日期的记录时结算前一天。删除记录、补录更早日期的记录或记录被整体替换后，
+    下次查询时重新计算。
+    """
+
+    def __init__(self, account_model, learning_rate=0.05, min_samples=5, z_threshold=3.5,
+                 ratio_threshold=5.0, min_scale=0.1):
+        """
+        Args:
+            account_model: 账本模型
+            learning_rate: 指数加权的学习率（样本数较少时自动使用更大的步长）
+            min_samples: 组内样本数少于该值时不标记异常
+            z_threshold: Z分数阈值
+            ratio_threshold: 相对基准金额的倍数阈值
+            min_scale: 对数尺度上平均绝对偏差的下限，避免金额完全相同时尺度为0
+        """
+        self.account_model = account_model
+        self.learning_rate = learning_rate
+        self.min_samples = min_samples
+        self.z_threshold = z_threshold
+        self.ratio_threshold = ratio_threshold
+        self.min_scale = min_scale
+        self.stale = True
+
+    def rebuild(self):
+        """对全部历史记录向量化计算估计和分数"""
+        arrays = self.account_model.get_record_arrays()
+        expense = np.flatnonzero(arrays['is_expense'])
+        ids = arrays['id'][expense]
+        days = arrays['day'][expense]
+        log_amounts = np.log(np.maximum(arrays['amount_cents'][expense], 1))
+
+        # 单笔支出：按分类分组
+        categories = arrays['category'][expense]
+        codes, names = pd.factorize(categories)
+        prior, final = grouped_ewm(codes, log_amounts, self.learning_rate)
+        self._category_state = {name: [float(final[0][i]), float(final[1][i]), int(final[2][i])]
+                                for i, name in enumerate(names)}
+        order = np.argsort(ids)
+        scores = self._scores(log_amounts, *prior)
+        self._record_ids = ids[order]
+        self._record_scores = {key: value[order] for key, value in scores.items()}
+        self._record_categories = categories[order]
+        self._record_days = days[order]
+        self._new_records = {}
+
+        # 每日支出合计：按星期几分组；最后一天尚未结算，只用之前的估计打分、不计入估计
+        unique_days, day_codes = np.unique(days, return_inverse=True)
+        totals = np.bincount(day_codes, weights=arrays['amount_cents'][expense]).astype(np.int64)
+        log_totals = np.log(np.maximum(totals, 1))
+        weekdays = (unique_days + 3) % 7
+        closed = max(len(unique_days) - 1, 0)
+        prior, final = grouped_ewm(weekdays[:closed], log_totals[:closed], self.learning_rate, groups=7)
+        self._day_state = {weekday: [float(final[0][weekday]), float(final[1][weekday]), int(final[2][weekday])]
+                           for weekday in range(7)}
+        self._closed_days = unique_days[:closed]
+        self._day_totals = totals[:closed]
+        self._day_scores = self._scores(log_totals[:closed], *prior)
+        self._new_days = {}
+        self._open_day = int(unique_days[-1]) if len(unique_days) else None
+        self._open_total = int(totals[-1]) if len(unique_days) else 0
+        self.stale = False
+
+    def _scores(self, x, mean, spread, count):
+        """向量化计算分数，返回各字段的数组"""
+        deviation = x - mean
+        z = deviation / (ABS_DEVIATION_SCALE * np.maximum(spread, self.min_scale))
+        ratio = np.exp(deviation)
+        flagged = (count >= self.min_samples) & ((z >= self.z_threshold) | (ratio >= self.ratio_threshold))
+        return {'score': z, 'ratio': ratio, 'baseline': np.exp(mean) / 100, 'samples': count, 'flagged': flagged}
+
+    def _score_one(self, x, state):
+        """用当前估计为单个样本打分"""
+        mean, spread, count = state
+        z = (x - mean) / (ABS_DEVIATION_SCALE * max(spread, self.min_scale))
+        ratio = math.exp(x - mean)
+        flagged = count >= self.min_samples and (z >= self.z_threshold or ratio >= self.ratio_threshold)
+        return {'score': z, 'ratio': ratio, 'baseline': math.exp(mean) / 100, 'samples': count, 'flagged': flagged}
+
+    def on_records_changed(self, event, record):
+        """记录变化时增量更新；无法增量更新时标记为过期"""
+        if self.stale:
+            return
+        if event != 'add' or record is None:
+            self.stale = True
+            return
+        if record.get('type') != 'expense':
+            return
+        try:
+            day = day_number(record['date'])
+        except ValueError:
+            self.stale = True
+            return
+        if self._open_day is not None and day < self._open_day:
+            # 补录更早的日期会改变已结算的日合计，下次查询时重新计算
+            self.stale = True
+            return
+
+        cents = self.account_model.get_record_cents(record)
+        x = math.log(max(cents, 1))
+        category = self.account_model.get_record_category(record)
+        state = self._category_state.setdefault(category, [0.0, 0.0, 0])
+        self._new_records[record['id']] = dict(self._score_one(x, state), category=category, day=day)
+        _observe(state, x, self.learning_rate)
+
+        if self._open_day is not None and day > self._open_day:
+            # 出现更晚的日期，结算前一天：先打分，再计入对应星期几的估计
+            closed_x = math.log(max(self._open_total, 1))
+            weekday_state = self._day_state[(self._open_day + 3) % 7]
+            self._new_days[self._open_day] = dict(self._score_one(closed_x, weekday_state), total=self._open_total)
+            _observe(weekday_state, closed_x, self.learning_rate)
+            self._open_total = 0
+        self._open_day = day
+        self._open_total += cents
+
+    def record_score(self, record_id):
+        """返回一条支出记录的异常分数字典，不是支出记录时返回None"""
+        if record_id in self._new_records:
+            return self._format_record(record_id, self._new_records[record_id])
+        index = np.searchsorted(self._record_ids, record_id)
+        if index >= len(self._record_ids) or self._record_ids[index] != record_id:
+            return None
+        entry = {key: values[index].item() for key, values in self._record_scores.items()}
+        entry.update(category=self._record_categories[index], day=int(self._record_days[index]))
+        return self._format_record(record_id, entry)
+
+    def day_score(self, day):
+        """返回某天（自1970-01-01起的天数）支出合计的异常分数字典，当天没有支出时返回None"""
+        if day == self._open_day:
+            x = math.log(max(self._open_total, 1))
+            entry = dict(self._score_one(x, self._day_state[(day + 3) % 7]), total=self._open_total)
+            return self._format_day(day, entry)
+        if day in self._new_days:
+            return self._format_day(day, self._new_days[day])
+        index = np.searchsorted(self._closed_days, day)
+        if index >= len(self._closed_days) or self._closed_days[index] != day:
+            return None
+        entry = {key: values[index].item() for key, values in self._day_scores.items()}
+        entry['total'] = int(self._day_totals[index])
+        return self._format_day(day, entry)
+
+    def anomalies(self, limit=None):
+        """返回被标记为异常的支出记录和日期，各自按分数从高到低排列"""
+        record_ids = self._record_ids[self._record_scores['flagged']].tolist()
+        record_ids += [record_id for record_id, entry in self._new_records.items() if entry['flagged']]
+        days = self._closed_days[self._day_scores['flagged']].tolist()
+        days += [day for day, entry in self._new_days.items() if entry['flagged']]
+        if self._open_day is not None:
+            days.append(self._open_day)
+        transactions = sorted((self.record_score(record_id) for record_id in record_ids),
+                              key=lambda entry: entry['score'], reverse=True)
+        day_entries = sorted((entry for entry in map(self.day_score, days) if entry['flagged']),
+                             key=lambda entry: entry['score'], reverse=True)
+        return {'transactions': transactions[:limit], 'days': day_entries[:limit]}
+
+    def _format_record(self, record_id, entry):
+        record = self.account_model.get_record(record_id)
+        return {
+            'id': record_id,
+            'date': str(np.datetime64(entry['day'], 'D')),
+            'category': entry['category'],
+            'amount': self.account_model.get_record_cents(record) / 100 if record is not None else None,
+            'baseline': entry['baseline'],
+            'ratio': entry['ratio'],
+            'score': entry['score'],
+            'samples': entry['samples'],
+            'flagged': bool(entry['flagged']),
+        }
+
+    @staticmethod
+    def _format_day(day, entry):
+        return {
+            'date': str(np.datetime64(day, 'D')),
+            'total': entry['total'] / 100,
+            'baseline': entry['baseline'],
+            'ratio': entry['ratio'],
+            'score': entry['score'],
+            'samples': entry['samples'],
+            'flagged': bool(entry['flagged']),
+        }
@@ -0,0 +1,132 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.models.account_model import AccountModel
+from src.models.forecast_engines import get_forecast_engine
+from src.models.prediction_model import PredictionModel
+
+def rolling_origins(length, horizon, min_train=60, step=7):
+    """滚动预测起点（即训练天数）列表，每个起点之后都有完整的horizon天真实值"""
+    return list(range(max(min_train, 2), length - horizon + 1, step))
+
+def load_ledger_series(data_file):
+    """读取账本文件，返回 (首日, 形状为(2, 天数)的收入/支出逐日序列)，没有记录时返回None"""
+    daily = PredictionModel(AccountModel(data_file)).get_daily_series()
+    if daily is None:
+        return None
+    first_day, income, expense = daily
+    return first_day, np.stack([income, expense])
+
+def _run_folds(task):
+    """执行一组回测折（在子进程中运行），返回 (预测误差, 真实值, 每折拟合耗时秒数, 每折外推耗时秒数)
+
+    收入、支出两条序列一起拟合（fit_many）再一起外推（predict_fitted），两步分别计时。
+    """
+    engine_name, series, first_day, origins, horizon = task
+    engine = get_forecast_engine(engine_name)
+    errors = np.empty((len(origins), len(series), horizon))
+    actuals = np.empty_like(errors)
+    fit_latencies, predict_latencies = [], []
+    for i, origin in enumerate(origins):
+        start = time.perf_counter()
+        fitted = engine.fit_many(series[:, :origin], first_day)
+        fitted_at = time.perf_counter()
+        predictions = engine.predict_fitted(fitted, horizon)
+        fit_latencies.append(fitted_at - start)
+        predict_latencies.append(time.perf_counter() - fitted_at)
+        actuals[i] = series[:, origin:origin + horizon]
+        errors[i] = np.maximum(predictions, 0) - actuals[i]
+    return errors, actuals, fit_latencies, predict_latencies
+
+def _latency_summary(seconds):
+    """耗时（秒）列表 -> 毫秒为单位的均值、分位数和最大值"""
+    latency = np.asarray(seconds) * 1000
+    return {
+        'mean': float(latency.mean()),
+        'p50': float(np.percentile(latency, 50)),
+        'p95': float(np.percentile(latency, 95)),
+        'max': float(latency.max()),
+    }
+
+def _summarize(ledger, engine_name, days, errors, actuals, fit_latencies, predict_latencies):
+    """汇总一个账本、一个引擎的回测结果"""
+    result = {'ledger': ledger, 'engine': engine_name, 'days': days, 'folds': len(fit_latencies)}
+    if not fit_latencies:
+        result.update({'mae': None, 'mape': None, 'fit_latency_ms': None, 'predict_latency_ms': None,
+                       'latency_ms': None})
+        return result
+    absolute = np.abs(errors)
+    # 每日金额经常为0，MAPE只统计真实值大于0的点，没有这样的点时为None
+    positive = actuals > 0
+    counts = positive.sum(axis=0)
+    ratios = np.divide(absolute, actuals, out=np.zeros_like(absolute), where=positive).sum(axis=0)
+    mape = [[float(r / c) if c else None for r, c in zip(row_r, row_c)] for row_r, row_c in zip(ratios, counts)]
+    mae = absolute.mean(axis=0)
+    result.update({
+        'mae': {'income': mae[0].tolist(), 'expense': mae[1].tolist()},
+        'mape': {'income': mape[0], 'expense': mape[1]},
+        'fit_latency_ms': _latency_summary(fit_latencies),
+        'predict_latency_ms': _latency_summary(predict_latencies),
+        'latency_ms': _latency_summary(np.add(fit_latencies, predict_latencies)),
+    })
+    return result
+
+def run_backtest(ledgers, engines=('numpy',), horizon=30, min_train=60, step=7, max_workers=None,
+                 folds_per_task=8):
+    """对一个或多个账本做滚动起点回测
+
+    每个起点只用此前的逐日数据预测接下来horizon天，与真实值比较得到每个预测步长的
+    MAE/MAPE（收入、支出分别统计），并分别记录每次拟合和外推的耗时（latency_ms 为两者之和）。
+    各折按 folds_per_task 分组分发到进程池中并行执行。
+
+    Args:
+        ledgers: 账本名 -> 数据文件 的字典，或数据文件路径列表（以文件名为账本名）
+        engines: 要比较的预测引擎名称
+        horizon: 预测天数
+        min_train: 第一个起点的训练天数
+        step: 相邻起点间隔的天数
+        max_workers: 进程数，为1时在当前进程中顺序执行
+
+    Returns:
+        结果字典列表，每个 (账本, 引擎) 一项
+    """
+    if horizon <= 0 or step <= 0:
+        raise ValueError("预测天数和起点间隔必须大于0")
+    if not isinstance(ledgers, dict):
+        ledgers = {os.path.splitext(os.path.basename(path))[0]: path for path in ledgers}
+    for engine_name in engines:
+        get_forecast_engine(engine_name)
+
+    tasks, owners, jobs = [], [], []
+    for ledger, data_file in ledgers.items():
+        loaded = load_ledger_series(data_file)
+        first_day, series = loaded if loaded is not None else (0, np.zeros((2, 0)))
+        origins = rolling_origins(series.shape[1], horizon, min_train, step)
+        for engine_name in engines:
+            jobs.append((ledger, engine_name, series.shape[1]))
+            for i in range(0, len(origins), folds_per_task):
+                tasks.append((engine_name, series, first_day, origins[i:i + folds_per_task], horizon))
+                owners.append(len(jobs) - 1)
+
+    if max_workers == 1 or len(tasks) <= 1:
+        outputs = list(map(_run_folds, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            outputs = list(executor.map(_run_folds, tasks))
+
+    results = []
+    for index, (ledger, engine_name, days) in enumerate(jobs):
+        parts = [output for owner, output in zip(owners, outputs) if owner == index]
+        if parts:
+            errors = np.concatenate([part[0] for part in parts])
+            actuals = np.concatenate([part[1] for part in parts])
+            fit_latencies = [value for part in parts for value in part[2]]
+            predict_latencies = [value for part in parts for value in part[3]]
+        else:
+            errors = actuals = np.empty((0, 2, horizon))
+            fit_latencies, predict_latencies = [], []
+        results.append(_summarize(ledger, engine_name, days, errors, actuals, fit_latencies, predict_latencies))
+    return results
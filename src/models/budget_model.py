@@ -0,0 +1,280 @@
+import json
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+from src.models.account_model import day_number, to_cents
+
+# 默认的预算规则文件
+DEFAULT_BUDGET_RULES_FILE = 'data/budget_rules.json'
+
+def period_key(period, date):
+    """记录日期所属统计周期的键：'day'、'week'（周一日期）、'month'（YYYY-MM）或 'year'（YYYY）"""
+    if period == 'month':
+        return date[:7]
+    if period == 'year':
+        return date[:4]
+    if period == 'day':
+        return date[:10]
+    if period == 'week':
+        day = day_number(date)
+        # 1970-01-01 是星期四
+        monday = day - (day + 3) % 7
+        return str(np.datetime64(monday, 'D'))
+    raise ValueError(f"不支持的统计周期: {period}，可选: day、week、month、year")
+
+PERIOD_LABELS = {'day': '当日', 'week': '本周', 'month': '本月', 'year': '本年'}
+
+class CategoryLimitRule:
+    """周期内某分类（或全部分类）的收支合计超过上限时报警
+
+    例如 {"type": "category_limit", "category": "food", "limit": 2000, "period": "month"}
+    表示 "本月餐饮支出超过2000元"。
+    """
+
+    kind = 'category_limit'
+
+    def __init__(self, name, limit, category=None, period='month', record_type='expense'):
+        if record_type not in ('income', 'expense'):
+            raise ValueError(f"无效的记录类型: {record_type}")
+        period_key(period, '1970-01-01')
+        self.name = name
+        self.limit_cents = to_cents(limit)
+        if self.limit_cents <= 0:
+            raise ValueError("预算上限必须大于0")
+        self.category = category
+        self.period = period
+        self.record_type = record_type
+
+    def exceeded(self, total_cents):
+        """周期合计（分）是否超过上限"""
+        return total_cents > self.limit_cents
+
+    def describe(self, period, total_cents, get_label):
+        """生成报警文字"""
+        scope = get_label(self.category) if self.category else ''
+        type_label = '收入' if self.record_type == 'income' else '支出'
+        return (f"{PERIOD_LABELS[self.period]}（{period}）{scope}{type_label} {total_cents / 100:.2f} 元，"
+                f"超过预算 {self.limit_cents / 100:.2f} 元")
+
+class BalanceForecastRule:
+    """按当前余额加上预测的逐日净收支，未来days天内余额低于threshold时报警"""
+
+    kind = 'balance_forecast'
+
+    def __init__(self, name, days=30, threshold=0):
+        if int(days) <= 0:
+            raise ValueError("预测天数必须大于0")
+        self.name = name
+        self.days = int(days)
+        self.threshold = float(threshold)
+
+    def evaluate(self, account_model, prediction_model):
+        """返回 (余额最先低于阈值的天数, 当天预计余额)，不会低于阈值或数据不足时返回None"""
+        prediction = prediction_model.predict_future(self.days)
+        if prediction is None:
+            return None
+        balance = account_model.get_incomes_and_expenses()['balance']
+        projected = balance + np.cumsum(prediction['net_prediction'])
+        below = np.flatnonzero(projected < self.threshold)
+        if len(below) == 0:
+            return None
+        return int(below[0]) + 1, float(projected[below[0]])
+
+    def describe(self, result):
+        """生成报警文字"""
+        days, balance = result
+        return f"预计 {days} 天后余额降至 {balance:.2f} 元，低于 {self.threshold:.2f} 元"
+
+# 规则类型 -> 规则类
+BUDGET_RULES = {
+    CategoryLimitRule.kind: CategoryLimitRule,
+    BalanceForecastRule.kind: BalanceForecastRule,
+}
+
+def rule_from_dict(config, index=0):
+    """根据配置字典创建规则，未指定名称时自动命名"""
+    config = dict(config)
+    kind = config.pop('type', CategoryLimitRule.kind)
+    rule_class = BUDGET_RULES.get(kind)
+    if rule_class is None:
+        raise ValueError(f"未知的预算规则类型: {kind}，可选: {', '.join(BUDGET_RULES)}")
+    name = config.pop('name', None) or f"{kind}_{index + 1}"
+    try:
+        return rule_class(name, **config)
+    except TypeError as e:
+        raise ValueError(f"预算规则 {name} 的参数无效: {e}")
+
+def load_budget_rules(path=DEFAULT_BUDGET_RULES_FILE):
+    """从JSON文件加载规则配置列表，文件不存在时返回空列表"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class BudgetEngine:
+    """随记录变化增量评估的预算规则引擎
+
+    添加规则时按 (记录类型, 分类) 编入索引，并只为规则用到的统计周期维护分类合计；
+    每新增或删除一条记录只更新该记录所属分类（及"全部分类"）的合计，
+    只重新判断这些合计相关的规则，耗时与历史记录数无关。
+    余额预测规则基于增量维护的趋势预测，每次变化后重新判断。
+
+    规则从未超限变为超限时产生 'triggered' 事件，恢复时产生 'resolved' 事件，
+    事件会通知通过 add_alert_listener 注册的回调，并保留在 events 中。
+    """
+
+    # 保留的最近事件数
+    MAX_EVENTS = 200
+
+    def __init__(self, account_model, prediction_model=None, rules=()):
+        self.account_model = account_model
+        self.prediction_model = prediction_model
+        self.rules = []
+        self._rule_index = {}
+        # (记录类型, 分类或None) -> 规则列表 / 需要维护合计的统计周期
+        self._rules_by_key = {}
+        self._periods_by_key = {}
+        self._forecast_rules = []
+        # (统计周期, 周期键, 记录类型, 分类或None) -> 合计（分）
+        self._totals = {}
+        # (规则名, 周期键) -> 当前生效的报警
+        self._active = {}
+        self.events = deque(maxlen=self.MAX_EVENTS)
+        self._alert_listeners = []
+        for rule in rules:
+            self.add_rule(rule, evaluate=False)
+        self.rebuild()
+        account_model.add_listener(self._on_records_changed)
+
+    def add_rule(self, rule, evaluate=True):
+        """添加规则（规则对象或配置字典），规则名称不能重复"""
+        if isinstance(rule, dict):
+            rule = rule_from_dict(rule, len(self.rules))
+        if rule.name in self._rule_index:
+            raise ValueError(f"预算规则名称重复: {rule.name}")
+        if isinstance(rule, BalanceForecastRule) and self.prediction_model is None:
+            raise ValueError("余额预测规则需要提供预测模型")
+        self.rules.append(rule)
+        self._rule_index[rule.name] = rule
+        if isinstance(rule, BalanceForecastRule):
+            self._forecast_rules.append(rule)
+        else:
+            key = (rule.record_type, rule.category)
+            self._rules_by_key.setdefault(key, []).append(rule)
+            self._periods_by_key.setdefault(key, set()).add(rule.period)
+        if evaluate:
+            self.rebuild()
+        return rule
+
+    def detach(self):
+        """停止跟随账本变化（账本关闭后调用，使引擎和账本可以被回收）"""
+        self.account_model.remove_listener(self._on_records_changed)
+
+    def add_alert_listener(self, callback):
+        """注册报警回调，callback(event) 中 event 为报警字典"""
+        self._alert_listeners.append(callback)
+
+    def remove_alert_listener(self, callback):
+        """移除报警回调"""
+        if callback in self._alert_listeners:
+            self._alert_listeners.remove(callback)
+
+    def active_alerts(self, today=None):
+        """当前生效的报警列表；指定today（'YYYY-MM-DD'）时只返回其所在周期的分类报警及余额报警"""
+        alerts = list(self._active.values())
+        if today is not None:
+            alerts = [alert for alert in alerts
+                      if alert['period'] is None or alert['period'] == period_key(alert['period_type'], today)]
+        return alerts
+
+    def rebuild(self):
+        """一次遍历全部记录重建合计，并重新判断全部规则"""
+        self._totals = {}
+        for record in self.account_model.get_all_records():
+            self._add_to_totals(record, 1)
+        checked = set()
+        for total_key in self._totals:
+            for rule in self._rules_by_key[(total_key[2], total_key[3])]:
+                if rule.period == total_key[0]:
+                    checked.add((rule.name, total_key[1]))
+                    self._check_limit(rule, total_key)
+        # 对应合计已不存在（如记录被整体替换）的报警恢复
+        for rule_name, key in list(self._active):
+            if key is not None and (rule_name, key) not in checked:
+                self._transition(self._rule_index[rule_name], key, None)
+        self._check_forecasts()
+
+    def _on_records_changed(self, event, record):
+        """记录变化时只更新受影响的合计和规则"""
+        if event == 'reset' or record is None:
+            self.rebuild()
+            return
+        sign = 1 if event == 'add' else -1
+        for total_key in self._add_to_totals(record, sign):
+            for rule in self._rules_by_key[(total_key[2], total_key[3])]:
+                if rule.period == total_key[0]:
+                    self._check_limit(rule, total_key)
+        self._check_forecasts()
+
+    def _add_to_totals(self, record, sign):
+        """把记录计入相关合计，返回更新过的合计键"""
+        if not self._periods_by_key:
+            return []
+        record_type = record.get('type')
+        category = self.account_model.get_record_category(record)
+        cents = self.account_model.get_record_cents(record) * sign
+        updated = []
+        for key_category in {category, None}:
+            periods = self._periods_by_key.get((record_type, key_category))
+            if not periods:
+                continue
+            for period in periods:
+                total_key = (period, period_key(period, record['date']), record_type, key_category)
+                self._totals[total_key] = self._totals.get(total_key, 0) + cents
+                updated.append(total_key)
+        return updated
+
+    def _check_limit(self, rule, total_key):
+        """判断一条分类预算规则在某个周期是否超限"""
+        period, key = total_key[0], total_key[1]
+        total = self._totals.get(total_key, 0)
+        get_label = self.account_model.classifier.get_label
+        alert = None
+        if rule.exceeded(total):
+            alert = {'rule': rule.name, 'type': rule.kind, 'period_type': period, 'period': key,
+                     'value': total / 100, 'limit': rule.limit_cents / 100,
+                     'message': rule.describe(key, total, get_label)}
+        self._transition(rule, key, alert)
+
+    def _check_forecasts(self):
+        """判断全部余额预测规则"""
+        for rule in self._forecast_rules:
+            result = rule.evaluate(self.account_model, self.prediction_model)
+            alert = None
+            if result is not None:
+                alert = {'rule': rule.name, 'type': rule.kind, 'period_type': None, 'period': None,
+                         'value': result[1], 'limit': rule.threshold, 'days': result[0],
+                         'message': rule.describe(result)}
+            self._transition(rule, None, alert)
+
+    def _transition(self, rule, key, alert):
+        """根据新的判断结果更新报警状态，状态改变时产生事件"""
+        state_key = (rule.name, key)
+        previous = self._active.get(state_key)
+        if alert is not None:
+            self._active[state_key] = alert
+            if previous is None:
+                self._emit(dict(alert, event='triggered'))
+        elif previous is not None:
+            del self._active[state_key]
+            self._emit(dict(previous, event='resolved'))
+
+    def _emit(self, event):
+        """记录事件并通知报警回调"""
+        event['time'] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
+        self.events.append(event)
+        for callback in list(self._alert_listeners):
+            callback(event)
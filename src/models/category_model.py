@@ -0,0 +1,128 @@
+import json
+from collections import deque
+
+# 默认分类体系：分类 -> 关键词列表
+# 分类的先后顺序即优先级，一条描述同时命中多个分类时取靠前的分类
+DEFAULT_CATEGORIES = {
+    'food': ['food', '餐饮', '吃饭', '食品', '超市', '早餐', '午餐', '晚餐', '夜宵', '外卖',
+             '水果', '零食', '饮料', '咖啡', '奶茶', '买菜', '聚餐', 'restaurant', 'grocery',
+             'breakfast', 'lunch', 'dinner', 'snack', 'coffee'],
+    'housing': ['房租', '租金', '房贷', '物业', '住房', 'rent', 'mortgage'],
+    'utilities': ['水费', '电费', '燃气', '煤气', '暖气', '水电', 'utility', 'electricity'],
+    'transport': ['交通', '地铁', '公交', '打车', '出租车', '滴滴', '加油', '停车', '高铁',
+                  '火车', '机票', 'taxi', 'uber', 'metro', 'bus', 'fuel', 'parking'],
+    'communication': ['话费', '流量', '宽带', '手机费', 'phone bill', 'internet'],
+    'shopping': ['购物', '衣服', '服装', '鞋', '淘宝', '京东', '日用品', 'shopping', 'clothes'],
+    'entertainment': ['娱乐', '电影', '游戏', '旅游', '旅行', 'ktv', '健身', 'movie', 'game',
+                      'travel'],
+    'medical': ['医疗', '医院', '药', '看病', '体检', 'medical', 'hospital', 'pharmacy'],
+    'education': ['教育', '学费', '培训', '书', '课程', 'tuition', 'course', 'book'],
+    'salary': ['工资', '薪水', '薪资', '奖金', '年终奖', 'salary', 'wage', 'payroll', 'bonus'],
+    'investment': ['理财', '利息', '分红', '股票', '基金', 'interest', 'dividend', 'stock'],
+    'gift': ['红包', '礼金', '礼物', 'gift'],
+}
+
+# 各分类的中文名称，用于界面展示和搜索
+CATEGORY_LABELS = {
+    'food': '餐饮',
+    'housing': '住房',
+    'utilities': '水电燃气',
+    'transport': '交通',
+    'communication': '通讯',
+    'shopping': '购物',
+    'entertainment': '娱乐',
+    'medical': '医疗',
+    'education': '教育',
+    'salary': '工资',
+    'investment': '理财',
+    'gift': '礼金',
+    'other': '其他',
+}
+
+# 未命中任何关键词时使用的分类
+DEFAULT_CATEGORY = 'other'
+
+class CategoryClassifier:
+    """基于Aho–Corasick自动机的交易描述分类器
+
+    所有分类的关键词编译进同一个自动机，对每条描述只需扫描一遍即可得到分类。
+    """
+
+    def __init__(self, categories=None, default_category=DEFAULT_CATEGORY):
+        self.categories = dict(categories if categories is not None else DEFAULT_CATEGORIES)
+        self.default_category = default_category
+        self._category_order = list(self.categories)
+        self._build_automaton()
+
+    @classmethod
+    def from_file(cls, path, default_category=DEFAULT_CATEGORY):
+        """从JSON文件（分类 -> 关键词列表）加载分类体系"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), default_category)
+
+    def _build_automaton(self):
+        """构建goto表、失败指针和每个状态的最优输出"""
+        # 每个状态：子节点字典；输出为命中分类的最小优先级（None表示无输出）
+        self._goto = [{}]
+        self._output = [None]
+
+        for priority, category in enumerate(self._category_order):
+            for keyword in self.categories[category]:
+                keyword = keyword.lower()
+                if not keyword:
+                    continue
+                state = 0
+                for char in keyword:
+                    next_state = self._goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(self._goto)
+                        self._goto[state][char] = next_state
+                        self._goto.append({})
+                        self._output.append(None)
+                    state = next_state
+                if self._output[state] is None or priority < self._output[state]:
+                    self._output[state] = priority
+
+        # 广度优先计算失败指针，并把失败链上的输出合并到当前状态
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail_target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail_target if fail_target != next_state else 0
+                inherited = self._output[self._fail[next_state]]
+                if inherited is not None and (self._output[next_state] is None or inherited < self._output[next_state]):
+                    self._output[next_state] = inherited
+
+    def classify(self, text):
+        """扫描一遍文本，返回优先级最高的命中分类"""
+        if not text:
+            return self.default_category
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        best = None
+        state = 0
+        for char in str(text).lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            priority = output[state]
+            if priority is not None and (best is None or priority < best):
+                best = priority
+                if best == 0:
+                    break
+
+        if best is None:
+            return self.default_category
+        return self._category_order[best]
+
+    def get_label(self, category):
+        """获取分类的展示名称"""
+        return CATEGORY_LABELS.get(category, category)
@@ -0,0 +1,204 @@
+import numpy as np
+
+class NumpyLinearEngine:
+    """闭式最小二乘线性趋势预测（纯numpy实现，默认引擎）
+
+    以序列位置 0..n-1 为自变量拟合 y = a + b·x，再外推 days_ahead 个位置。
+    """
+
+    name = 'numpy'
+
+    def forecast(self, values, days_ahead):
+        """返回未来 days_ahead 个位置的预测值（未截断负值）"""
+        y = np.asarray(values, dtype=float)
+        n = len(y)
+        if n == 0:
+            raise ValueError("没有可用于拟合的数据")
+        x = np.arange(n, dtype=float)
+        # 中心化后计算斜率，数值上比直接用原始和更稳定
+        x_mean = (n - 1) / 2
+        y_mean = y.mean()
+        sxx = ((x - x_mean) ** 2).sum()
+        slope = ((x - x_mean) * (y - y_mean)).sum() / sxx if sxx > 0 else 0.0
+        intercept = y_mean - slope * x_mean
+        return intercept + slope * np.arange(n, n + days_ahead, dtype=float)
+
+    def forecast_many(self, series, days_ahead, first_day=0):
+        """同时预测多条等长序列，series形状为 (序列数, 天数)
+
+        全部序列共用同一设计矩阵，以矩阵为右端项做一次最小二乘求解得到每条序列的截距和斜率；
+        结果与逐条调用 forecast 一致。first_day 仅为与季节性引擎保持相同接口。
+        """
+        return self.predict_fitted(self.fit_many(series, first_day), days_ahead)
+
+    def fit_many(self, series, first_day=0):
+        """拟合多条等长序列，返回供 predict_fitted 使用的拟合结果（序列长度及截距、斜率）"""
+        series = np.asarray(series, dtype=float)
+        length = series.shape[1]
+        if length == 0:
+            raise ValueError("没有可用于拟合的数据")
+        # 自变量中心化后截距即为均值，数值上更稳定
+        x = np.arange(length, dtype=float) - (length - 1) / 2
+        design = np.stack([np.ones(length), x], axis=1)
+        return length, np.linalg.lstsq(design, series.T, rcond=None)[0]
+
+    def predict_fitted(self, fitted, days_ahead):
+        """由 fit_many 的拟合结果外推 days_ahead 天，返回形状 (序列数, days_ahead)"""
+        length, coefficients = fitted
+        future_x = np.arange(length, length + days_ahead, dtype=float) - (length - 1) / 2
+        return coefficients[0][:, None] + coefficients[1][:, None] * future_x
+
+class SklearnLinearEngine:
+    """基于 sklearn LinearRegression 的线性趋势预测（可选引擎）
+
+    sklearn 只在首次预测时导入，不影响程序启动时间。
+    """
+
+    name = 'sklearn'
+
+    def forecast(self, values, days_ahead):
+        """返回未来 days_ahead 个位置的预测值（未截断负值）"""
+        from sklearn.linear_model import LinearRegression
+
+        y = np.asarray(values, dtype=float)
+        X = np.arange(len(y)).reshape(-1, 1)
+        model = LinearRegression()
+        model.fit(X, y)
+        future_X = np.arange(len(y), len(y) + days_ahead).reshape(-1, 1)
+        return model.predict(future_X)
+
+    def forecast_many(self, series, days_ahead, first_day=0):
+        """同时预测多条等长序列，series形状为 (序列数, 天数)，各序列作为多输出回归一次拟合"""
+        return self.predict_fitted(self.fit_many(series, first_day), days_ahead)
+
+    def fit_many(self, series, first_day=0):
+        """拟合多条等长序列，返回 (序列数, 序列长度, 拟合好的模型)"""
+        from sklearn.linear_model import LinearRegression
+
+        series = np.asarray(series, dtype=float)
+        length = series.shape[1]
+        model = LinearRegression()
+        model.fit(np.arange(length).reshape(-1, 1), series.T)
+        return len(series), length, model
+
+    def predict_fitted(self, fitted, days_ahead):
+        """由 fit_many 的拟合结果外推 days_ahead 天，返回形状 (序列数, days_ahead)"""
+        count, length, model = fitted
+        future_X = np.arange(length, length + days_ahead).reshape(-1, 1)
+        return model.predict(future_X).T.reshape(count, days_ahead)
+
+def _calendar_indices(first_day, length):
+    """返回从first_day起length天的星期序号（周一为0）和日序号（每月1日为0）"""
+    days = np.arange(first_day, first_day + length, dtype=np.int64)
+    # 1970-01-01 是星期四
+    weekday = (days + 3) % 7
+    dates = days.astype('datetime64[D]')
+    day_of_month = (dates - dates.astype('datetime64[M]').astype('datetime64[D]')).astype(np.int64)
+    return weekday, day_of_month
+
+class HoltWintersEngine:
+    """加性Holt-Winters预测（水平 + 趋势 + 周季节 + 月内日季节），纯numpy实现
+
+    输入需为连续日历日的逐日序列（没有记录的日期为0），first_day 为第一天
+    （自1970-01-01起的天数），用于确定星期和每月几号；房租、工资等按月到账、
+    买菜等按周发生的收支分别由月内日季节项和周季节项刻画。
+
+    采用误差修正形式的递推：
+        e = y - (l + b + w[星期] + m[日])
+        l ← l + b + αe，b ← b + βe，w[星期] ← w[星期] + γe，m[日] ← m[日] + δe
+    平滑参数在网格上选取一步预测误差平方和最小的一组。递推在时间上天然是串行的，
+    因此按天循环，但每一步同时计算全部序列和全部参数组合（向量化在序列×参数维度上）。
+    """
+
+    name = 'holt_winters'
+    # 需要连续日历日序列，而不是按有记录日期排列的序列
+    uses_calendar = True
+
+    def __init__(self, alphas=(0.05, 0.2, 0.5), betas=(0.0, 0.01), gammas=(0.05, 0.2), deltas=(0.05, 0.2)):
+        grid = np.array(np.meshgrid(alphas, betas, gammas, deltas, indexing='ij')).reshape(4, -1)
+        self._alpha, self._beta, self._gamma, self._delta = grid
+
+    def forecast(self, values, days_ahead, first_day=0):
+        """返回未来 days_ahead 天的预测值（未截断负值）"""
+        return self.forecast_many(np.asarray(values, dtype=float)[None, :], days_ahead, first_day)[0]
+
+    def forecast_many(self, series, days_ahead, first_day=0):
+        """同时预测多条起止日期相同的逐日序列，series形状为 (序列数, 天数)"""
+        return self.predict_fitted(self.fit_many(series, first_day), days_ahead)
+
+    def fit_many(self, series, first_day=0):
+        """递推拟合多条起止日期相同的逐日序列，返回各序列最优参数组合下的末状态，供 predict_fitted 使用"""
+        series = np.asarray(series, dtype=float)
+        count, length = series.shape
+        if length == 0:
+            raise ValueError("没有可用于拟合的数据")
+        past_weekday, past_day = _calendar_indices(first_day, length)
+
+        # 初始值：水平取均值，季节项取按星期/日分组的均值偏差，趋势为0
+        level0 = series.mean(axis=1)
+        weekly0 = self._group_means(series - level0[:, None], past_weekday, 7)
+        monthly0 = self._group_means(series - level0[:, None] - weekly0[:, past_weekday], past_day, 31)
+
+        # 展开为 序列×参数组合 条并行的递推
+        params = len(self._alpha)
+        lanes = count * params
+        alpha, beta, gamma, delta = (np.tile(p, count) for p in (self._alpha, self._beta, self._gamma, self._delta))
+        level = np.repeat(level0, params)
+        trend = np.zeros(lanes)
+        weekly = np.repeat(weekly0, params, axis=0).T.copy()   # 形状 (7, 并行数)，按行取值更快
+        monthly = np.repeat(monthly0, params, axis=0).T.copy()  # 形状 (31, 并行数)
+        # 前一周作为预热期，不计入参数选择的误差；误差平方和在递推中累加，不保存逐日误差
+        burn_in = min(7, length - 1)
+        sse = np.zeros(lanes)
+
+        for t in range(length):
+            w = past_weekday[t]
+            d = past_day[t]
+            # 每步只展开当天的观测值，避免保存 (并行数, 天数) 的展开序列
+            error = np.repeat(series[:, t], params) - (level + trend + weekly[w] + monthly[d])
+            if t >= burn_in:
+                sse += error ** 2
+            level += trend + alpha * error
+            trend += beta * error
+            weekly[w] += gamma * error
+            monthly[d] += delta * error
+
+        sse = sse.reshape(count, params)
+        best = np.arange(count) * params + sse.argmin(axis=1)
+
+        return {'next_day': first_day + length, 'level': level[best], 'trend': trend[best],
+                'weekly': weekly[:, best], 'monthly': monthly[:, best]}
+
+    def predict_fitted(self, fitted, days_ahead):
+        """由 fit_many 的末状态外推 days_ahead 天，返回形状 (序列数, days_ahead)"""
+        steps = np.arange(1, days_ahead + 1)
+        future_weekday, future_day = _calendar_indices(fitted['next_day'], days_ahead)
+        return (fitted['level'][:, None] + fitted['trend'][:, None] * steps
+                + fitted['weekly'][future_weekday].T + fitted['monthly'][future_day].T)
+
+    @staticmethod
+    def _group_means(values, groups, size):
+        """按组计算每行的均值（没有样本的组为0），返回形状 (行数, size)"""
+        counts = np.bincount(groups, minlength=size)
+        sums = np.stack([np.bincount(groups, weights=row, minlength=size) for row in values])
+        return np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+# 引擎名称 -> 引擎类
+FORECAST_ENGINES = {
+    NumpyLinearEngine.name: NumpyLinearEngine,
+    SklearnLinearEngine.name: SklearnLinearEngine,
+    HoltWintersEngine.name: HoltWintersEngine,
+}
+
+DEFAULT_ENGINE = NumpyLinearEngine.name
+
+def get_forecast_engine(engine=None):
+    """根据名称创建预测引擎，也可以直接传入引擎实例"""
+    if engine is None:
+        engine = DEFAULT_ENGINE
+    if not isinstance(engine, str):
+        return engine
+    engine_class = FORECAST_ENGINES.get(engine)
+    if engine_class is None:
+        raise ValueError(f"未知的预测引擎: {engine}，可选: {', '.join(FORECAST_ENGINES)}")
+    return engine_class()
@@ -0,0 +1,192 @@
+import numpy as np
+
+from src.models.account_model import from_cents
+
+def month_index(month_key):
+    """把 'YYYY-MM' 转换为自公元0年起的月序号，相邻月份相差1"""
+    return int(month_key[:4]) * 12 + int(month_key[5:7]) - 1
+
+def month_key(index):
+    """month_index 的逆运算"""
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+def regression_slope(x, y):
+    """y 对 x 的最小二乘斜率，样本少于2个或x没有变化时返回0"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) < 2:
+        return 0.0
+    dx = x - x.mean()
+    sxx = float((dx * dx).sum())
+    if sxx <= 0:
+        return 0.0
+    return float((dx * (y - y.mean())).sum() / sxx)
+
+def _ratio(numerator, denominator):
+    """逐元素相除，分母不大于0的位置为None"""
+    valid = denominator > 0
+    values = np.divide(numerator, denominator, out=np.zeros_like(numerator), where=valid)
+    return [float(v) if ok else None for v, ok in zip(values, valid)]
+
+def indicator_series(first_month, income, expense, food, windows=(1, 3, 6, 12)):
+    """由连续月份的收入、支出、食品支出序列计算各滚动窗口的指标序列
+
+    每个窗口长度w都只做一次前缀和，窗口合计为前缀和之差，不逐窗口重新扫描：
+    恩格尔系数 = 窗口内食品支出/支出，APC = 窗口内支出/收入，
+    MPC = 窗口内各月支出对收入的回归斜率（由 Σx、Σy、Σx²、Σxy 的前缀和得到，w<2时为None）。
+
+    Args:
+        first_month: 第一个月的月序号（见 month_index）
+        income, expense, food: 各月金额（元），没有记录的月份为0
+        windows: 滚动窗口的月数
+
+    Returns:
+        {'months': [...], 'income': [...], 'expense': [...],
+         'windows': {w: {'months': 窗口结束月份, 'engel_coefficient': [...],
+                         'avg_propensity_consumption': [...], 'marginal_propensity_consumption': [...]}}}
+        无法计算的值为None
+    """
+    income = np.asarray(income, dtype=float)
+    expense = np.asarray(expense, dtype=float)
+    food = np.asarray(food, dtype=float)
+    count = len(income)
+    months = [month_key(first_month + i) for i in range(count)]
+
+    # 回归斜率与平移无关，先减去整体均值以减小前缀和相减时的舍入误差
+    x = income - income.mean() if count else income
+    y = expense - expense.mean() if count else expense
+    prefix = {name: np.concatenate(([0.0], np.cumsum(values))) for name, values in (
+        ('income', income), ('expense', expense), ('food', food),
+        ('x', x), ('y', y), ('xx', x * x), ('xy', x * y))}
+
+    series = {}
+    for window in windows:
+        window = int(window)
+        if window <= 0:
+            raise ValueError("滚动窗口的月数必须大于0")
+        if window > count:
+            series[window] = {'months': [], 'engel_coefficient': [], 'avg_propensity_consumption': [],
+                              'marginal_propensity_consumption': []}
+            continue
+        sums = {name: values[window:] - values[:-window] for name, values in prefix.items()}
+        if window >= 2:
+            sxx = window * sums['xx'] - sums['x'] ** 2
+            sxy = window * sums['xy'] - sums['x'] * sums['y']
+            # x在窗口内几乎不变时斜率没有意义
+            sxx[sxx <= 1e-9 * np.maximum(window * sums['xx'], 1.0)] = 0
+            mpc = _ratio(sxy, sxx)
+        else:
+            mpc = [None] * (count - window + 1)
+        series[window] = {
+            'months': months[window - 1:],
+            'engel_coefficient': _ratio(sums['food'], sums['expense']),
+            'avg_propensity_consumption': _ratio(sums['expense'], sums['income']),
+            'marginal_propensity_consumption': mpc,
+        }
+    return {'months': months, 'income': income.tolist(), 'expense': expense.tolist(), 'windows': series}
+
+class IndicatorAccumulator:
+    """可增量更新的经济指标累加器
+
+    只需遍历一次记录即可得到计算恩格尔系数、APC、MPC所需的全部量：
+    收入、支出、食品支出总额（分）以及按月（YYYY-MM）的收入/支出/食品支出合计。
+    此后每新增或删除一条记录只需O(1)更新，取指标只需O(月数)。
+    """
+
+    def __init__(self, get_cents, get_category):
+        """
+        Args:
+            get_cents: 返回记录以分为单位金额的函数
+            get_category: 返回记录分类的函数
+        """
+        self._get_cents = get_cents
+        self._get_category = get_category
+        self.count = 0
+        self.income_cents = 0
+        self.expense_cents = 0
+        self.food_cents = 0
+        # 月份 -> [收入（分）, 支出（分）, 食品支出（分）, 记录数]
+        self.monthly = {}
+
+    def rebuild(self, records):
+        """清空后一次遍历累加全部记录"""
+        self.count = self.income_cents = self.expense_cents = self.food_cents = 0
+        self.monthly = {}
+        for record in records:
+            self.add(record)
+        return self
+
+    def add(self, record, sign=1):
+        """累加一条记录，sign为-1时表示删除"""
+        cents = self._get_cents(record) * sign
+        record_type = record['type']
+        self.count += sign
+        is_food = False
+        if record_type == 'income':
+            self.income_cents += cents
+        elif record_type == 'expense':
+            self.expense_cents += cents
+            is_food = self._get_category(record) == 'food'
+            if is_food:
+                self.food_cents += cents
+
+        key = record['date'][:7]  # YYYY-MM
+        bucket = self.monthly.get(key)
+        if bucket is None:
+            bucket = self.monthly[key] = [0, 0, 0, 0]
+        # 月度合计中非收入记录均计为支出
+        bucket[0 if record_type == 'income' else 1] += cents
+        if is_food:
+            bucket[2] += cents
+        bucket[3] += sign
+        if bucket[3] <= 0:
+            del self.monthly[key]
+
+    def remove(self, record):
+        """减去一条已删除的记录"""
+        self.add(record, -1)
+
+    def indicators(self):
+        """返回恩格尔系数、APC、MPC，没有记录时返回None"""
+        if self.count <= 0:
+            return None
+        total_income = from_cents(self.income_cents)
+        total_expense = from_cents(self.expense_cents)
+
+        # 平均消费倾向 APC = 消费/收入
+        apc = total_expense / total_income if total_income > 0 else 0
+        # 恩格尔系数（食品支出占总支出的比例）
+        engel_coefficient = self.food_cents / 100 / total_expense if total_expense > 0 else 0
+
+        # 边际消费倾向：各月支出对各月收入的回归斜率（没有记录的月份按0计入）
+        mpc = 0
+        monthly = self.monthly_arrays()
+        if monthly is not None:
+            _, income, expense, _ = monthly
+            mpc = regression_slope(income, expense)
+
+        return {
+            'engel_coefficient': engel_coefficient,
+            'avg_propensity_consumption': apc,
+            'marginal_propensity_consumption': mpc
+        }
+
+    def monthly_arrays(self):
+        """返回 (首月序号, 收入, 支出, 食品支出)，金额单位为元，按连续月份排列，
+        没有记录的月份为0；没有记录时返回None"""
+        if not self.monthly:
+            return None
+        indices = {month_index(key): bucket for key, bucket in self.monthly.items()}
+        first_month = min(indices)
+        totals = np.zeros((3, max(indices) - first_month + 1), dtype=np.int64)
+        for index, bucket in indices.items():
+            totals[:, index - first_month] = bucket[:3]
+        income, expense, food = totals / 100
+        return first_month, income, expense, food
+
+    def series(self, windows=(1, 3, 6, 12)):
+        """返回按月及各滚动窗口的指标序列（见 indicator_series），没有记录时返回None"""
+        monthly = self.monthly_arrays()
+        if monthly is None:
+            return None
+        return indicator_series(*monthly, windows=windows)
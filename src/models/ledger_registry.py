@@ -0,0 +1,191 @@
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+from src.models.account_model import AccountModel
+from src.models.prediction_model import PredictionModel
+
+# 默认账本名称及其数据文件（兼容单账本时代的数据位置）
+DEFAULT_LEDGER = 'default'
+DEFAULT_LEDGER_FILE = 'data/account_records.json'
+
+class LedgerRegistry:
+    """多账本注册表
+
+    按账本名称映射数据文件，首次使用时才加载 AccountModel/PredictionModel，
+    并在内存预算内按LRU淘汰最久未使用的账本，淘汰前先把未保存的修改写入文件。
+    """
+
+    def __init__(self, ledger_dir='data/ledgers', ledgers=None, memory_budget=256 * 1024 * 1024,
+                 max_open=None):
+        """
+        Args:
+            ledger_dir: 未显式注册的账本默认存放目录，文件名为 '<账本名>.json'
+            ledgers: 可选的 账本名 -> 数据文件 映射
+            memory_budget: 已打开账本的估算内存上限（字节）
+            max_open: 可选的同时打开账本数量上限
+        """
+        self.ledger_dir = ledger_dir
+        self.memory_budget = memory_budget
+        self.max_open = max_open
+        self._paths = {DEFAULT_LEDGER: DEFAULT_LEDGER_FILE}
+        self._paths.update(ledgers or {})
+        # 已打开的账本，按最近使用顺序排列（末尾为最近使用）
+        self._open = OrderedDict()
+        self._lock = threading.RLock()
+        # 每个账本一把锁，供并发访问同一账本的调用方串行化操作；只弱引用，
+        # 没有调用方持有或等待时自动释放，账本被淘汰或只被访问过一次的名称不会一直占用
+        self._ledger_locks = weakref.WeakValueDictionary()
+        # 正在从文件加载的账本 -> 加载完成事件，加载在注册表锁之外进行
+        self._loading = {}
+        self._eviction_listeners = []
+        self.stats = {'loads': 0, 'hits': 0, 'evictions': 0}
+
+    def register(self, name, data_file):
+        """注册账本名称与数据文件的映射"""
+        self._validate_name(name)
+        if name in self._open and self._paths.get(name) != data_file:
+            self.evict(name)
+        with self._lock:
+            self._paths[name] = data_file
+
+    def add_eviction_listener(self, callback):
+        """注册账本淘汰监听器，callback(name, account_model) 在账本被淘汰后、持有该账本锁时调用"""
+        self._eviction_listeners.append(callback)
+
+    def remove_eviction_listener(self, callback):
+        """移除账本淘汰监听器"""
+        if callback in self._eviction_listeners:
+            self._eviction_listeners.remove(callback)
+
+    def get_data_file(self, name):
+        """获取账本对应的数据文件路径"""
+        self._validate_name(name)
+        return self._paths.get(name, os.path.join(self.ledger_dir, f"{name}.json"))
+
+    def list_ledgers(self):
+        """列出已注册及账本目录中存在的全部账本名称（不加载账本）"""
+        names = set(self._paths)
+        if os.path.isdir(self.ledger_dir):
+            for file_name in os.listdir(self.ledger_dir):
+                if file_name.endswith('.json'):
+                    names.add(file_name[:-len('.json')])
+        return sorted(names)
+
+    def get(self, name=DEFAULT_LEDGER):
+        """获取账本的 (AccountModel, PredictionModel)，必要时加载并淘汰冷账本
+
+        加载在注册表锁之外进行，大账本冷加载时不阻塞其他账本；
+        同一账本同时被多个调用方请求时只加载一次，其余调用方等待加载完成。
+        """
+        while True:
+            with self._lock:
+                models = self._open.get(name)
+                if models is not None:
+                    self._open.move_to_end(name)
+                    self.stats['hits'] += 1
+                    return models
+                loading = self._loading.get(name)
+                if loading is None:
+                    data_file = self.get_data_file(name)
+                    loading = self._loading[name] = threading.Event()
+                    break
+            # 等待其他调用方加载完成后重新查找（加载失败时由本调用方重新加载）
+            loading.wait()
+
+        try:
+            account_model = AccountModel(data_file)
+            models = (account_model, PredictionModel(account_model))
+            with self._lock:
+                self._open[name] = models
+                self.stats['loads'] += 1
+        finally:
+            with self._lock:
+                del self._loading[name]
+            loading.set()
+        # 调用方可能正持有本账本的锁，淘汰须在释放注册表锁之后进行
+        self._enforce_budget(keep=name)
+        return models
+
+    def get_account_model(self, name=DEFAULT_LEDGER):
+        """获取账本的 AccountModel"""
+        return self.get(name)[0]
+
+    def get_prediction_model(self, name=DEFAULT_LEDGER):
+        """获取账本的 PredictionModel"""
+        return self.get(name)[1]
+
+    def lock_for(self, name):
+        """获取账本的操作锁（调用方持有或等待期间始终是同一把锁），非法账本名称抛出ValueError且不创建锁"""
+        self._validate_name(name)
+        with self._lock:
+            lock = self._ledger_locks.get(name)
+            if lock is None:
+                lock = self._ledger_locks[name] = threading.RLock()
+            return lock
+
+    def memory_usage(self):
+        """已打开账本的估算内存总量（字节）"""
+        with self._lock:
+            return sum(account_model.estimate_memory() for account_model, _ in self._open.values())
+
+    def evict(self, name, blocking=True):
+        """保存并关闭指定账本，保存失败或（blocking为False时）账本正被使用时保留在内存中并返回False"""
+        with self._lock:
+            models = self._open.get(name)
+            if models is None:
+                return True
+            lock = self.lock_for(name)
+        # 持有注册表锁时不等待账本锁：持有账本锁的调用方会再获取注册表锁，两者互相等待会死锁
+        if not lock.acquire(blocking=blocking):
+            return False
+        try:
+            if not models[0].flush():
+                return False
+            with self._lock:
+                if self._open.get(name) is not models:
+                    return True
+                del self._open[name]
+                self.stats['evictions'] += 1
+            for callback in list(self._eviction_listeners):
+                callback(name, models[0])
+            return True
+        finally:
+            lock.release()
+
+    def flush_all(self):
+        """把所有已打开账本的未保存修改写入文件"""
+        with self._lock:
+            results = [account_model.flush() for account_model, _ in self._open.values()]
+            return all(results)
+
+    def close(self):
+        """保存并关闭所有账本"""
+        for name in list(self._open):
+            self.evict(name)
+        return not self._open
+
+    def _enforce_budget(self, keep=None):
+        """按LRU顺序淘汰账本，直到满足数量上限和内存预算；正被其他调用方使用的账本暂不淘汰"""
+        with self._lock:
+            usage = self.memory_usage()
+            candidates = [(name, models[0].estimate_memory()) for name, models in self._open.items() if name != keep]
+        for name, freed in candidates:
+            over_count = self.max_open is not None and len(self._open) > self.max_open
+            if not over_count and usage <= self.memory_budget:
+                break
+            if self.evict(name, blocking=False):
+                usage -= freed
+
+    @staticmethod
+    def _validate_name(name):
+        """账本名称不能为空，也不能包含路径分隔符"""
+        if not name or not isinstance(name, str) or '/' in name or '\\' in name or name in ('.', '..'):
+            raise ValueError(f"无效的账本名称: {name}")
+
+    def __len__(self):
+        return len(self._open)
+
+    def __contains__(self, name):
+        return name in self._open
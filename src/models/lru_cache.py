@@ -0,0 +1,119 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+def estimate_size(value):
+    """粗略估算对象占用的字节数（递归计算字典、列表、元组及numpy数组）"""
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + (0 if value.base is None else value.nbytes)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+class LRUCache:
+    """线程安全的LRU缓存
+
+    可同时限制条目数量、估算总字节数及存活时间（TTL），超出条目或字节上限时
+    淘汰最久未使用的条目，过期条目在访问时删除。命中、未命中、淘汰和过期次数
+    记录在 stats() 中，便于调整缓存参数。
+    """
+
+    def __init__(self, max_entries=128, max_bytes=None, ttl=None, size_of=estimate_size, clock=time.monotonic):
+        """
+        Args:
+            max_entries: 条目数量上限
+            max_bytes: 可选的总字节数上限，按 size_of 估算每个值的大小
+            ttl: 可选的存活秒数，超过后条目失效
+            size_of: 估算值大小的函数
+            clock: 返回当前秒数的函数（测试时可替换）
+        """
+        if max_entries <= 0:
+            raise ValueError("缓存条目上限必须大于0")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("缓存字节上限必须大于0")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("缓存存活时间必须大于0")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._size_of = size_of
+        self._clock = clock
+        # 键 -> (值, 估算字节数, 过期时间)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key, default=None):
+        """读取缓存，命中时把条目移到最近使用的位置"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return default
+            if entry[2] is not None and self._clock() >= entry[2]:
+                self._remove(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """写入缓存，必要时淘汰最久未使用的条目；单个值超过字节上限时不缓存"""
+        size = self._size_of(value) if self.max_bytes is not None else 0
+        expires_at = self._clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or \
+                    (self.max_bytes is not None and self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats['evictions'] += 1
+
+    def discard(self, predicate):
+        """删除键满足条件的全部条目，返回删除数量"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """返回命中、未命中、淘汰、过期次数及当前条目数和估算字节数"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            return stats
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[2] is None or self._clock() < entry[2])
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -1,46 +1,176 @@
 import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from sklearn.linear_model import LinearRegression
+
+from src.models.account_model import day_number
+from src.models.anomaly_model import AnomalyDetector
+from src.models.forecast_engines import NumpyLinearEngine, get_forecast_engine
+from src.models.indicator_model import IndicatorAccumulator
+from src.models.lru_cache import LRUCache
+from src.models.recurrence_model import detect_recurring, project_schedules
+from src.models.trend_model import IncrementalTrend
+
+def _simulate_paths(task):
+    """按历史残差有放回抽样生成模拟路径（可在子进程中运行）
+    
+    task 为 (点预测 (2, 天数), 历史残差 (2, 历史天数), 路径数, 随机种子)，
+    同一条路径的同一天收入和支出抽取同一历史日期的残差，保留两者的相关性。
+    返回形状 (2, 路径数, 天数) 的收入/支出路径，金额不小于0。
+    """
+    point, residuals, samples, seed = task
+    rng = np.random.default_rng(seed)
+    index = rng.integers(0, residuals.shape[1], size=(samples, point.shape[1]))
+    return np.maximum(point[:, None, :] + residuals[:, index], 0)
+
+# 结果缓存未命中的标记（缓存的结果本身可能是None）
+_MISSING = object()
 
 class PredictionModel:
-    def __init__(self, account_model):
+    # 缓存的每日收支序列组数上限
+    SERIES_CACHE_ENTRIES = 32
+    # 预测结果缓存的默认条目上限、估算字节上限和存活秒数（None表示不过期）
+    RESULT_CACHE_ENTRIES = 256
+    RESULT_CACHE_BYTES = 16 * 1024 * 1024
+    RESULT_CACHE_TTL = None
+    # 收支分量投射时计算各分类金额占比的最近天数
+    SHARE_WINDOW_DAYS = 90
+    
+    def __init__(self, account_model, forgetting_factor=1.0, engine=None,
+                 result_cache_entries=None, result_cache_bytes=None, result_cache_ttl=None):
         self.account_model = account_model
+        # 按给定记录拟合时使用的预测引擎，默认为闭式numpy最小二乘，可选 'sklearn'
+        self.engine = get_forecast_engine(engine)
+        # 按 (账本版本号, 记录指纹) 缓存整理好的每日收支序列
+        self._series_cache = LRUCache(self.SERIES_CACHE_ENTRIES)
+        # 按 (方法, 参数..., 账本版本号) 缓存预测结果，记录变化后版本号改变，旧结果自然失效
+        self.result_cache = LRUCache(
+            result_cache_entries or self.RESULT_CACHE_ENTRIES,
+            max_bytes=result_cache_bytes or self.RESULT_CACHE_BYTES,
+            ttl=result_cache_ttl if result_cache_ttl is not None else self.RESULT_CACHE_TTL,
+        )
+        # 全部记录的收入/支出增量趋势，首次预测时构建，之后随记录变化增量更新
+        self.forgetting_factor = forgetting_factor
+        self._trends = None
+        # 全部记录的经济指标累加器，首次计算时构建，之后随记录变化增量更新
+        self._indicators = None
+        # 支出异常检测器，首次查询时对全部历史计算，之后随新增记录增量更新
+        self.anomaly_detector = AnomalyDetector(account_model)
+        account_model.add_listener(self._on_records_changed)
+    
+    def cache_stats(self):
+        """返回预测结果缓存的命中、未命中、淘汰、过期次数及当前条目数和估算字节数"""
+        return self.result_cache.stats()
+    
+    def _cached_result(self, key, compute):
+        """在预测结果缓存中查找 key（自动追加账本版本号），未命中时调用compute计算并缓存"""
+        key = key + (self.account_model.version,)
+        result = self.result_cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = compute()
+            self.result_cache.put(key, result)
+        return result
     
     def prepare_data_for_prediction(self, records=None):
-        """准备预测数据"""
-        if records is None:
-            records = self.account_model.get_all_records()
-        
-        if not records:
-            return None, None
-        
-        # 转换为DataFrame进行处理
-        df = pd.DataFrame(records)
-        df['date'] = pd.to_datetime(df['date'])
-        df['day_of_year'] = df['date'].dt.dayofyear
+        """准备预测数据
         
-        # 按日期分组，计算每日收支
-        daily_income = df[df['type'] == 'income'].groupby('date')['amount'].sum().reset_index()
-        daily_expense = df[df['type'] == 'expense'].groupby('date')['amount'].sum().reset_index()
-        
-        # 确保有数据用于预测
-        if len(daily_income) < 2 or len(daily_expense) < 2:
-            return None, None
-        
-        return daily_income, daily_expense
+        按日历日整理每日收入和支出：覆盖记录的首尾日期，没有记录的日期金额为0，
+        相邻两行正好相隔一天。收入或支出有记录的日期少于2天时返回 (None, None)。
+        结果按账本版本号和记录指纹缓存，返回的DataFrame会被复用，调用方不应原地修改。
+        """
+        key = ('frames',) + self._series_key(records)
+        cached = self._series_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        series, first_day = self._calendar_series(records)
+        if series is None or not self._has_enough_days(series):
+            frames = (None, None)
+        else:
+            days = np.arange(first_day, first_day + len(series['income'])).astype('datetime64[D]')
+            dates = pd.to_datetime(days)
+            frames = tuple(pd.DataFrame({'date': dates, 'amount': series[record_type] / 100})
+                           for record_type in ('income', 'expense'))
+        self._series_cache.put(key, frames)
+        return frames
     
-    def predict_future(self, days_ahead=30, records=None):
-        """预测未来的收支情况"""
-        daily_income, daily_expense = self.prepare_data_for_prediction(records)
+    def get_daily_series(self, records=None):
+        """返回逐日收支序列 (首日, 收入数组, 支出数组)，金额单位为元
         
-        if daily_income is None or daily_expense is None:
+        首日为自1970-01-01起的天数，数组按日历日连续排列，没有记录的日期为0；
+        没有收支记录时返回None。
+        """
+        series, first_day = self._calendar_series(records)
+        if series is None:
             return None
-        
-        # 预测收入
-        income_prediction = self._predict_using_regression(daily_income, days_ahead)
-        # 预测支出
-        expense_prediction = self._predict_using_regression(daily_expense, days_ahead)
+        return first_day, series['income'] / 100, series['expense'] / 100
+    
+    def _series_key(self, records):
+        """计算每日收支序列的缓存键"""
+        version = self.account_model.version
+        if records is None:
+            return version, None
+        # 自定义记录集按参与计算的字段生成指纹，同一账本版本下内容相同的记录集共用缓存
+        get_cents = self.account_model.get_record_cents
+        fingerprint = hash(tuple((r.get('id'), r.get('date'), r.get('type'), get_cents(r)) for r in records))
+        return version, len(records), fingerprint
+    
+    @staticmethod
+    def _has_enough_days(series):
+        """收入和支出都至少有2个有记录的日期"""
+        return np.count_nonzero(series['income_count']) >= 2 and np.count_nonzero(series['expense_count']) >= 2
+    
+    def predict_future(self, days_ahead=30, records=None, engine=None, recurring=False):
+        """预测未来的收支情况
+        
+        engine 可按次指定预测引擎（名称或实例），默认使用模型的引擎。
+        numpy线性引擎在未指定records时使用增量维护的趋势统计量（按 forgetting_factor 衰减旧数据），
+        耗时与历史长度无关；指定records或使用其他引擎（如 'sklearn'、自定义引擎实例）时按记录重新拟合，
+        不使用 forgetting_factor；季节性引擎（如 'holt_winters'）基于连续日历日序列预测。
+        recurring 为True时先识别工资、房租等周期性收支（见 get_recurring_schedules），
+        引擎只拟合其余记录，周期性收支按计划日期和金额原样叠加到预测中（只支持全部记录）。
+        未指定records时结果按账本版本号缓存，返回的字典会被复用，调用方不应原地修改。
+        """
+        if recurring:
+            if records is not None:
+                raise ValueError("按周期性收支计划预测只支持全部记录")
+            engine_key = self.engine if engine is None else engine
+            return self._cached_result(('future_recurring', days_ahead, engine_key),
+                                       lambda: self._predict_with_recurring(days_ahead, engine))
+        if records is None:
+            # 全部记录的预测只取决于账本版本和引擎，重复查询直接返回缓存结果
+            engine_key = self.engine if engine is None else engine
+            return self._cached_result(('future', days_ahead, engine_key),
+                                       lambda: self._predict_future(days_ahead, None, engine))
+        return self._predict_future(days_ahead, records, engine)
+    
+    def _predict_future(self, days_ahead, records, engine):
+        """不经结果缓存的预测"""
+        engine = self.engine if engine is None else get_forecast_engine(engine)
+        if getattr(engine, 'uses_calendar', False):
+            series, first_day = self._calendar_series(records)
+            if series is None or not self._has_enough_days(series):
+                return None
+            forecasts = engine.forecast_many(np.stack([series['income'], series['expense']]) / 100,
+                                             days_ahead, first_day)
+            income_prediction, expense_prediction = np.maximum(forecasts, 0).tolist()
+        elif records is None and type(engine) is NumpyLinearEngine:
+            # 只有默认的numpy线性引擎由增量趋势统计量代替（两者拟合同一条直线），其余引擎按请求原样使用
+            trends = self._get_trends()
+            if len(trends['active']['income']) < 2 or len(trends['active']['expense']) < 2:
+                return None
+            income_prediction = self._forecast_trend(trends['income'], days_ahead)
+            expense_prediction = self._forecast_trend(trends['expense'], days_ahead)
+        else:
+            daily_income, daily_expense = self.prepare_data_for_prediction(records)
+            
+            if daily_income is None or daily_expense is None:
+                return None
+            
+            # 预测收入
+            income_prediction = self._predict_using_regression(daily_income, days_ahead, engine)
+            # 预测支出
+            expense_prediction = self._predict_using_regression(daily_expense, days_ahead, engine)
         
         return {
             'income_prediction': income_prediction,
@@ -48,6 +178,278 @@ class PredictionModel:
             'net_prediction': [i - e for i, e in zip(income_prediction, expense_prediction)]
         }
         
+    def _predict_with_recurring(self, days_ahead, engine):
+        """周期性收支按计划投射、其余收支由引擎拟合的预测"""
+        fitted = self._residual_forecast(days_ahead, engine)
+        if fitted is None:
+            return None
+        schedules, _, forecasts, start_day = fitted
+        projected = np.stack(project_schedules(schedules, start_day, days_ahead))
+        income_prediction, expense_prediction = (forecasts + projected).tolist()
+        return {
+            'income_prediction': income_prediction,
+            'expense_prediction': expense_prediction,
+            'net_prediction': [i - e for i, e in zip(income_prediction, expense_prediction)],
+            'recurring_income': projected[0].tolist(),
+            'recurring_expense': projected[1].tolist(),
+        }
+    
+    def _residual_forecast(self, days_ahead, engine):
+        """识别周期性收支后用引擎拟合其余收支
+        
+        Returns:
+            (计划列表, 属于计划的记录掩码, 其余收支的逐日预测 (2, 天数)（元，不小于0）, 预测首日)；
+            数据不足时返回None
+        """
+        engine = self.engine if engine is None else get_forecast_engine(engine)
+        series, first_day = self._calendar_series()
+        if series is None or not self._has_enough_days(series):
+            return None
+        schedules, mask = self._recurring_detection()
+        
+        # 从逐日序列中扣除周期性收支，引擎只拟合剩余部分
+        arrays = self.account_model.get_record_arrays()
+        length = len(series['income'])
+        days = arrays['day'][mask]
+        type_codes = np.where(arrays['is_income'][mask], 0, np.where(arrays['is_expense'][mask], 1, -1))
+        recurring_series = self._bin_daily(days - first_day, arrays['amount_cents'][mask], type_codes, length)
+        residual = np.stack([series['income'] - recurring_series['income'],
+                             series['expense'] - recurring_series['expense']]) / 100
+        if getattr(engine, 'uses_calendar', False):
+            forecasts = engine.forecast_many(residual, days_ahead, first_day)
+        else:
+            forecasts = np.stack([engine.forecast(row, days_ahead) for row in residual])
+        return schedules, mask, np.maximum(forecasts, 0), first_day + length
+    
+    def project_cash_flows(self, days_ahead=90, engine=None):
+        """把未来每日收支拆分为若干分量，供情景模拟（见 scenario_model）按分类、计划调整
+        
+        每个生效中的周期性收支计划是一个分量，按计划日期和金额投射；
+        其余收支的预测按最近 SHARE_WINDOW_DAYS 天各 (类型, 分类) 的金额占比拆分，
+        该区间没有记录时按全部历史的占比。各类型分量之和等于 predict_future(recurring=True) 的预测。
+        结果按账本版本号缓存，返回的字典会被复用，调用方不应原地修改。
+        
+        Returns:
+            {'start_date': 预测首日, 'components': [{'type', 'category', 'label', 'recurring'}, ...],
+             'flows': (分量数, 天数) 的每日金额矩阵（元，均为正数，收支方向见 type）}；
+            数据不足时返回None
+        """
+        engine_key = self.engine if engine is None else engine
+        return self._cached_result(('cash_flows', days_ahead, engine_key),
+                                   lambda: self._project_cash_flows(days_ahead, engine))
+    
+    def _project_cash_flows(self, days_ahead, engine):
+        """不经结果缓存的收支分量投射"""
+        fitted = self._residual_forecast(days_ahead, engine)
+        if fitted is None:
+            return None
+        schedules, mask, forecasts, start_day = fitted
+        components = []
+        rows = []
+        classify = self.account_model.classifier.classify
+        for schedule in schedules:
+            if not schedule['active']:
+                continue
+            income, expense = project_schedules([schedule], start_day, days_ahead)
+            components.append({'type': schedule['type'], 'category': classify(schedule['description']),
+                               'label': schedule['description'], 'recurring': True})
+            rows.append(expense if schedule['type'] == 'expense' else income)
+        
+        # 其余收支按最近一段时间各分类的金额占比拆分
+        arrays = self.account_model.get_record_arrays()
+        for type_index, record_type in enumerate(('income', 'expense')):
+            selected = arrays[f'is_{record_type}'] & ~mask
+            recent = selected & (arrays['day'] >= start_day - self.SHARE_WINDOW_DAYS)
+            if recent.any():
+                selected = recent
+            if not selected.any():
+                continue
+            totals = pd.Series(arrays['amount_cents'][selected]).groupby(arrays['category'][selected]).sum()
+            totals = totals[totals > 0]
+            for category, total in totals.items():
+                components.append({'type': record_type, 'category': category, 'label': category, 'recurring': False})
+                rows.append(forecasts[type_index] * (total / totals.sum()))
+        
+        flows = np.array(rows) if rows else np.zeros((0, days_ahead))
+        return {'start_date': str(np.datetime64(start_day, 'D')), 'components': components, 'flows': flows}
+    
+    def get_recurring_schedules(self, active_only=False):
+        """返回识别出的周期性收支计划（见 recurrence_model.detect_recurring），结果按账本版本号缓存
+        
+        Args:
+            active_only: 为True时只返回仍在生效（最近一次发生距今不超过1.5个周期）的计划
+        """
+        schedules, _ = self._recurring_detection()
+        return [dict(schedule) for schedule in schedules if schedule['active'] or not active_only]
+    
+    def _recurring_detection(self):
+        """对全部记录识别周期性收支，返回 (计划列表, 按日期排列的记录中属于计划的掩码)"""
+        def detect():
+            arrays = self.account_model.get_record_arrays()
+            valid = arrays['is_income'] | arrays['is_expense']
+            schedules, mask = detect_recurring(arrays['day'][valid], arrays['amount_cents'][valid],
+                                               arrays['is_expense'][valid], arrays['description'][valid])
+            full_mask = np.zeros(len(valid), dtype=bool)
+            full_mask[valid] = mask
+            return schedules, full_mask
+        return self._cached_result(('recurring',), detect)
+    
+    def _get_trends(self):
+        """获取全部记录的收入/支出趋势，必要时从逐日序列重建
+        
+        返回字典：'income'、'expense' 为覆盖相同日历区间的 IncrementalTrend，
+        'active' 为各类型 有记录的日期 -> 记录数。
+        """
+        if self._trends is None:
+            trends = {'active': {}}
+            series, first_day = self._calendar_series()
+            for record_type in ('income', 'expense'):
+                trend = IncrementalTrend(self.forgetting_factor)
+                active = {}
+                if series is not None:
+                    trend.rebuild(first_day, series[record_type])
+                    counts = series[f'{record_type}_count']
+                    offsets = np.flatnonzero(counts)
+                    active = dict(zip((offsets + first_day).tolist(), counts[offsets].tolist()))
+                trends[record_type] = trend
+                trends['active'][record_type] = active
+            self._trends = trends
+        return self._trends
+    
+    def _on_records_changed(self, event, record):
+        """记录变化时增量更新趋势统计量和经济指标"""
+        self._update_indicators(event, record)
+        self._update_trends(event, record)
+        self.anomaly_detector.on_records_changed(event, record)
+    
+    def _update_indicators(self, event, record):
+        """增量更新经济指标累加器"""
+        if self._indicators is None:
+            return
+        if event == 'add':
+            self._indicators.add(record)
+        elif event == 'delete':
+            self._indicators.remove(record)
+        else:
+            self._indicators = None
+    
+    def _update_trends(self, event, record):
+        """增量更新趋势统计量"""
+        if self._trends is None:
+            return
+        record_type = record.get('type') if record is not None else None
+        if event == 'reset' or record_type not in ('income', 'expense'):
+            self._trends = None
+            return
+        try:
+            day = day_number(record['date'])
+        except ValueError:
+            # 无法增量更新（如日期格式异常）时，下次预测重新构建
+            self._trends = None
+            return
+        
+        cents = self.account_model.get_record_cents(record)
+        trend = self._trends[record_type]
+        active = self._trends['active'][record_type]
+        if event == 'add':
+            # 收入和支出始终覆盖相同的日历区间
+            self._trends['income'].extend_to(day)
+            self._trends['expense'].extend_to(day)
+            trend.update(day, cents)
+            active[day] = active.get(day, 0) + 1
+            return
+        
+        count = active.get(day, 0) - 1
+        if count < 0:
+            self._trends = None
+            return
+        if count:
+            active[day] = count
+        else:
+            del active[day]
+            # 区间首尾日期不再有任何记录时区间会收缩，下次预测重新构建
+            if day in (trend.first_day, trend.last_day) and \
+                    not any(day in days for days in self._trends['active'].values()):
+                self._trends = None
+                return
+        trend.update(day, -cents)
+    
+    @staticmethod
+    def _forecast_trend(trend, days_ahead):
+        """用趋势预测未来每日金额（元），预测值不小于0"""
+        return [max(0, cents / 100) for cents in trend.forecast(days_ahead)]
+    
+    def predict_intervals(self, days_ahead=30, records=None, samples=2000, quantiles=(0.1, 0.5, 0.9),
+                          seed=None, chunk_size=None, max_workers=None, point=None):
+        """用历史残差自助抽样（bootstrap）给出收入、支出和净收支的预测区间
+        
+        在逐日序列上拟合线性趋势，把每天的拟合残差作为误差分布，
+        一次向量化运算生成全部模拟路径，再取各分位数。
+        给出point时以该点预测为中心，误差分布取逐日收支与其均值之差，
+        用于给按日均值外推的预测（如 predict_future_by_time_range）配上对应的区间。
+        
+        Args:
+            days_ahead: 预测天数
+            records: 可选的记录集，默认使用全部记录
+            samples: 模拟路径数
+            quantiles: 要计算的分位数，默认 P10/P50/P90
+            seed: 随机种子，相同种子和chunk_size得到相同结果
+            chunk_size: 路径数很大时每块的路径数，各块使用由seed派生的独立随机流
+            max_workers: 分块时的进程数，为1时在当前进程中顺序计算
+            point: 可选的 (每日收入预测, 每日支出预测)，各含days_ahead个值
+            
+        Returns:
+            字典：'income'、'expense'、'net' 为每天各分位数的列表（键为 'p10' 等），
+            'total' 为整个预测期累计金额的分位数；数据不足时返回None
+        """
+        if days_ahead <= 0 or samples <= 0:
+            raise ValueError("预测天数和模拟路径数必须大于0")
+        series, _ = self._calendar_series(records)
+        if series is None or not self._has_enough_days(series):
+            return None
+        
+        history = np.stack([series['income'], series['expense']]) / 100
+        if point is not None:
+            point = np.asarray(point, dtype=float)
+            if point.shape != (2, days_ahead):
+                raise ValueError("点预测必须包含收入和支出各预测天数个值")
+            residuals = history - history.mean(axis=1, keepdims=True)
+        else:
+            # 拟合线性趋势，得到点预测和历史残差
+            length = history.shape[1]
+            x = np.arange(length, dtype=float)
+            x_centered = x - (length - 1) / 2
+            mean = history.mean(axis=1)
+            slope = (history - mean[:, None]) @ x_centered / (x_centered @ x_centered)
+            intercept = mean - slope * (length - 1) / 2
+            residuals = history - (intercept[:, None] + slope[:, None] * x)
+            point = intercept[:, None] + slope[:, None] * np.arange(length, length + days_ahead)
+        
+        if chunk_size is None or samples <= chunk_size:
+            paths = _simulate_paths((point, residuals, samples, seed))
+        else:
+            sizes = [chunk_size] * (samples // chunk_size)
+            if samples % chunk_size:
+                sizes.append(samples % chunk_size)
+            seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+            tasks = [(point, residuals, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+            if max_workers == 1:
+                chunks = list(map(_simulate_paths, tasks))
+            else:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    chunks = list(executor.map(_simulate_paths, tasks))
+            paths = np.concatenate(chunks, axis=1)
+        
+        paths = {'income': paths[0], 'expense': paths[1], 'net': paths[0] - paths[1]}
+        labels = [f"p{round(q * 100)}" for q in quantiles]
+        result = {'quantiles': list(quantiles), 'samples': samples, 'total': {}}
+        for name, values in paths.items():
+            daily = np.quantile(values, quantiles, axis=0)
+            total = np.quantile(values.sum(axis=1), quantiles)
+            result[name] = {label: row.tolist() for label, row in zip(labels, daily)}
+            result['total'][name] = {label: float(value) for label, value in zip(labels, total)}
+        return result
+    
     def predict_future_by_time_range(self, start_date_str, end_date_str, days_ahead=30):
         """根据指定时间区间的历史数据预测未来收支情况
         
@@ -58,40 +460,53 @@ class PredictionModel:
             
         Returns:
             包含预测结果的字典，或None（如果没有足够的数据）
+        
+        结果按 (开始日期, 结束日期, 预测天数, 账本版本号) 缓存，重复查询直接返回，
+        返回的字典会被复用，调用方不应原地修改。
         """
-        # 获取所有记录
-        all_records = self.account_model.get_all_records()
+        return self._cached_result(
+            ('time_range', start_date_str, end_date_str, days_ahead),
+            lambda: self._predict_by_time_range(start_date_str, end_date_str, days_ahead))
+    
+    def _predict_by_time_range(self, start_date_str, end_date_str, days_ahead):
+        """不经结果缓存的按时间区间预测"""
+        # 按日期排序的列式数组，区间筛选只需两次二分查找
+        arrays = self.account_model.get_record_arrays()
         
-        if not all_records:
+        if len(arrays['day']) == 0:
             return None
         
-        # 筛选指定时间区间内的记录
+        # 筛选指定时间区间内的记录（记录日期按当天零点比较）
         start_date = pd.to_datetime(start_date_str)
         end_date = pd.to_datetime(end_date_str)
+        epoch = pd.Timestamp('1970-01-01')
+        first_day = (start_date.ceil('D') - epoch).days
+        last_day = (end_date.floor('D') - epoch).days
+        lo = np.searchsorted(arrays['day'], first_day, side='left')
+        hi = np.searchsorted(arrays['day'], last_day, side='right')
         
-        filtered_records = []
-        for record in all_records:
-            record_date = pd.to_datetime(record['date'])
-            if start_date <= record_date <= end_date:
-                filtered_records.append(record)
-        
-        if not filtered_records:
+        if lo >= hi:
             return None
         
         # 计算时间区间内的平均收入和支出
-        income_records = [r for r in filtered_records if r['type'] == 'income']
-        expense_records = [r for r in filtered_records if r['type'] == 'expense']
+        cents = arrays['amount_cents'][lo:hi]
+        is_income = arrays['is_income'][lo:hi]
+        is_expense = arrays['is_expense'][lo:hi]
+        income_count = int(is_income.sum())
+        expense_count = int(is_expense.sum())
         
-        if not income_records or not expense_records:
+        if not income_count or not expense_count:
             return None
         
-        avg_income = sum(r['amount'] for r in income_records) / len(income_records)
-        avg_expense = sum(r['amount'] for r in expense_records) / len(expense_records)
+        income_cents = int(cents[is_income].sum())
+        expense_cents = int(cents[is_expense].sum())
+        avg_income = income_cents / 100 / income_count
+        avg_expense = expense_cents / 100 / expense_count
         
         # 计算日均收入和支出
         date_range_days = (end_date - start_date).days + 1
-        daily_avg_income = sum(r['amount'] for r in income_records) / date_range_days
-        daily_avg_expense = sum(r['amount'] for r in expense_records) / date_range_days
+        daily_avg_income = income_cents / 100 / date_range_days
+        daily_avg_expense = expense_cents / 100 / date_range_days
         
         # 生成未来预测
         future_income_prediction = [daily_avg_income] * days_ahead
@@ -109,96 +524,329 @@ class PredictionModel:
             'net_prediction': [i - e for i, e in zip(future_income_prediction, future_expense_prediction)]
         }
     
-    def _predict_using_regression(self, daily_data, days_ahead):
+    def predict_many(self, windows, horizons=30):
+        """批量预测多个时间窗口
+        
+        只构建一次覆盖全部窗口的逐日收支序列，用前缀和得到每个窗口的统计量，
+        再把所有窗口的线性趋势（以窗口内日历日为自变量）放在一次批量矩阵求解中拟合。
+        
+        Args:
+            windows: [(开始日期, 结束日期), ...]，格式 'YYYY-MM-DD'，包含两端
+            horizons: 预测天数，整数或整数列表；每个窗口都给出全部预测天数的结果
+            
+        Returns:
+            与windows一一对应的列表，窗口内缺少收入或支出记录时对应元素为None
+        """
+        if isinstance(horizons, int):
+            horizons = [horizons]
+        horizons = [int(h) for h in horizons]
+        if not horizons or min(horizons) <= 0:
+            raise ValueError("预测天数必须大于0")
+        if not windows:
+            return []
+        
+        starts = np.array([day_number(start) for start, _ in windows], dtype=np.int64)
+        ends = np.array([day_number(end) for _, end in windows], dtype=np.int64)
+        if np.any(ends < starts):
+            raise ValueError("结束日期不能早于开始日期")
+        
+        first_day = int(starts.min())
+        series = self._dense_daily_series(first_day, int(ends.max()))
+        # 窗口在逐日序列中的半开区间 [a, b)
+        a = starts - first_day
+        b = ends - first_day + 1
+        n = (b - a).astype(float)
+        t = np.arange(len(series['income']), dtype=float)
+        
+        totals, counts, matrices, targets = {}, {}, [], []
+        for record_type in ('income', 'expense'):
+            y = series[record_type]
+            cum_y = np.concatenate(([0], np.cumsum(y)))
+            cum_ty = np.concatenate(([0.0], np.cumsum(t * y)))
+            cum_count = np.concatenate(([0], np.cumsum(series[f'{record_type}_count'])))
+            totals[record_type] = cum_y[b] - cum_y[a]
+            counts[record_type] = cum_count[b] - cum_count[a]
+            # 窗口内自变量 x = t - a 的充分统计量
+            sy = totals[record_type].astype(float)
+            sxy = (cum_ty[b] - cum_ty[a]) - a * sy
+            sx = n * (n - 1) / 2
+            sxx = (n - 1) * n * (2 * n - 1) / 6
+            matrix = np.stack([np.stack([n, sx], axis=-1), np.stack([sx, sxx], axis=-1)], axis=-2)
+            target = np.stack([sy, sxy], axis=-1)
+            # 只有一天的窗口没有趋势，按当天金额预测
+            single = n == 1
+            matrix[single] = np.eye(2)
+            target[single, 1] = 0
+            matrices.append(matrix)
+            targets.append(target)
+        
+        # 全部窗口、收入和支出一次求解：每行得到 (截距, 斜率)
+        solution = np.linalg.solve(np.concatenate(matrices), np.concatenate(targets)[..., None])[..., 0]
+        max_horizon = max(horizons)
+        future_x = n[:, None] + np.arange(max_horizon)
+        forecasts = {}
+        for i, record_type in enumerate(('income', 'expense')):
+            coefficients = solution[i * len(windows):(i + 1) * len(windows)]
+            forecasts[record_type] = np.maximum(coefficients[:, :1] + coefficients[:, 1:] * future_x, 0) / 100
+        
+        results = []
+        for i, (start_date, end_date) in enumerate(windows):
+            income_count = int(counts['income'][i])
+            expense_count = int(counts['expense'][i])
+            if not income_count or not expense_count:
+                results.append(None)
+                continue
+            income_total = int(totals['income'][i]) / 100
+            expense_total = int(totals['expense'][i]) / 100
+            predictions = {}
+            for horizon in horizons:
+                income_prediction = forecasts['income'][i, :horizon].tolist()
+                expense_prediction = forecasts['expense'][i, :horizon].tolist()
+                predictions[horizon] = {
+                    'income_prediction': income_prediction,
+                    'expense_prediction': expense_prediction,
+                    'net_prediction': [inc - exp for inc, exp in zip(income_prediction, expense_prediction)]
+                }
+            results.append({
+                'period_start_date': start_date,
+                'period_end_date': end_date,
+                'period_avg_income': income_total / income_count,
+                'period_avg_expense': expense_total / expense_count,
+                'period_daily_avg_income': income_total / n[i],
+                'period_daily_avg_expense': expense_total / n[i],
+                'predictions': predictions
+            })
+        return results
+    
+    def get_category_series(self, records=None):
+        """按 (类型, 分类) 整理逐日金额矩阵
+        
+        全部收支记录按 (类型, 分类) 编号后，一次 np.add.at 把金额累加到 (分类数, 天数) 矩阵，
+        列覆盖记录的首尾日期，没有记录的日期为0。结果按账本版本号和记录指纹缓存，调用方不应原地修改。
+        
+        Returns:
+            ([(类型, 分类), ...]（收入在前，各类型内按分类名排序）, 首日, (分类数, 天数) 的金额矩阵（分，int64））；
+            没有收支记录时返回None
+        """
+        key = ('category_series',) + self._series_key(records)
+        cached = self._series_cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        if records is None:
+            arrays = self.account_model.get_record_arrays()
+            valid = arrays['is_income'] | arrays['is_expense']
+            days = arrays['day'][valid]
+            cents = arrays['amount_cents'][valid]
+            is_expense = arrays['is_expense'][valid]
+            categories = arrays['category'][valid]
+        else:
+            records = [r for r in records if r.get('type') in ('income', 'expense')]
+            days = np.array([day_number(r['date']) for r in records], dtype=np.int64)
+            cents = np.array([self.account_model.get_record_cents(r) for r in records], dtype=np.int64)
+            is_expense = np.array([r['type'] == 'expense' for r in records], dtype=bool)
+            categories = np.array([self.account_model.get_record_category(r) for r in records], dtype=object)
+        
+        result = None
+        if len(days):
+            category_codes, names = pd.factorize(categories)
+            # (分类, 类型) 编码为整数，出现过的编码按顺序压缩为行号（计数代替排序）
+            pair_codes = category_codes * 2 + is_expense
+            present = np.bincount(pair_codes, minlength=2 * len(names)) > 0
+            pairs = np.flatnonzero(present)
+            rows = (np.cumsum(present) - 1)[pair_codes]
+            keys = [('expense' if pair % 2 else 'income', names[pair // 2]) for pair in pairs.tolist()]
+            # 收入在前，各类型内按分类名排序
+            order = sorted(range(len(keys)), key=lambda i: (keys[i][0] != 'income', keys[i][1]))
+            rank = np.empty(len(keys), dtype=np.int64)
+            rank[order] = np.arange(len(keys))
+            first_day = int(days.min())
+            matrix = np.zeros((len(keys), int(days.max()) - first_day + 1), dtype=np.int64)
+            np.add.at(matrix, (rank[rows], days - first_day), cents)
+            result = [keys[i] for i in order], first_day, matrix
+        self._series_cache.put(key, result)
+        return result
+    
+    def predict_by_category(self, days_ahead=30, records=None, engine=None):
+        """按 (类型, 分类) 分别预测未来每日金额
+        
+        在 get_category_series 的矩阵上一次拟合全部分类：线性引擎对所有行共用设计矩阵做一次批量最小二乘，
+        季节性引擎在序列维度上向量化递推，耗时与只预测收入、支出两条序列相当。
+        未指定records时结果按账本版本号缓存，返回的字典会被复用，调用方不应原地修改。
+        
+        Returns:
+            {'start_date': 预测首日, 'categories': [{'type', 'category', 'label', 'history_total',
+             'prediction': 每日预测（元，不小于0）, 'total': 预测期合计}, ...],
+             'income_prediction', 'expense_prediction': 各分类预测按类型相加}；没有收支记录时返回None
+        """
+        if records is None:
+            engine_key = self.engine if engine is None else engine
+            return self._cached_result(('by_category', days_ahead, engine_key),
+                                       lambda: self._predict_by_category(days_ahead, None, engine))
+        return self._predict_by_category(days_ahead, records, engine)
+    
+    def _predict_by_category(self, days_ahead, records, engine):
+        """不经结果缓存的分类预测"""
+        engine = self.engine if engine is None else get_forecast_engine(engine)
+        series = self.get_category_series(records)
+        if series is None:
+            return None
+        keys, first_day, matrix = series
+        values = matrix / 100
+        if hasattr(engine, 'forecast_many'):
+            forecasts = engine.forecast_many(values, days_ahead, first_day)
+        else:
+            forecasts = np.stack([engine.forecast(row, days_ahead) for row in values])
+        forecasts = np.maximum(forecasts, 0)
+        
+        get_label = self.account_model.classifier.get_label
+        is_income = np.array([record_type == 'income' for record_type, _ in keys])
+        categories = [{'type': record_type, 'category': category, 'label': get_label(category),
+                       'history_total': float(total), 'prediction': prediction.tolist(), 'total': float(prediction.sum())}
+                      for (record_type, category), total, prediction in zip(keys, values.sum(axis=1), forecasts)]
+        return {
+            'start_date': str(np.datetime64(first_day + matrix.shape[1], 'D')),
+            'categories': categories,
+            'income_prediction': forecasts[is_income].sum(axis=0).tolist(),
+            'expense_prediction': forecasts[~is_income].sum(axis=0).tolist(),
+        }
+    
+    def _calendar_series(self, records=None):
+        """返回覆盖收支记录首尾日期的逐日收支序列及首日，没有记录时返回 (None, None)"""
+        if records is None:
+            arrays = self.account_model.get_record_arrays()
+            days = arrays['day'][arrays['is_income'] | arrays['is_expense']]
+            if len(days) == 0:
+                return None, None
+            first_day = int(days[0])
+            return self._dense_daily_series(first_day, int(days[-1])), first_day
+        
+        key = ('calendar',) + self._series_key(records)
+        cached = self._series_cache.get(key)
+        if cached is not None:
+            return cached
+        records = [r for r in records if r.get('type') in ('income', 'expense')]
+        if not records:
+            return None, None
+        days = np.array([day_number(r['date']) for r in records], dtype=np.int64)
+        cents = np.array([self.account_model.get_record_cents(r) for r in records], dtype=np.int64)
+        type_codes = np.array([r['type'] == 'expense' for r in records], dtype=np.int64)
+        first_day = int(days.min())
+        series = self._bin_daily(days - first_day, cents, type_codes, int(days.max()) - first_day + 1)
+        self._series_cache.put(key, (series, first_day))
+        return series, first_day
+    
+    def _dense_daily_series(self, first_day, last_day):
+        """返回 [first_day, last_day] 内每个日历日的收支合计（分）及记录数，没有记录的日期为0
+        
+        日期为自1970-01-01起的天数；结果按账本版本号缓存。
+        """
+        key = ('dense', self.account_model.version, first_day, last_day)
+        series = self._series_cache.get(key)
+        if series is not None:
+            return series
+        arrays = self.account_model.get_record_arrays()
+        lo = np.searchsorted(arrays['day'], first_day, side='left')
+        hi = np.searchsorted(arrays['day'], last_day, side='right')
+        # 收入为0、支出为1，其他类型为-1
+        type_codes = np.where(arrays['is_income'][lo:hi], 0, np.where(arrays['is_expense'][lo:hi], 1, -1))
+        series = self._bin_daily(arrays['day'][lo:hi] - first_day, arrays['amount_cents'][lo:hi], type_codes,
+                                 last_day - first_day + 1)
+        self._series_cache.put(key, series)
+        return series
+    
+    @staticmethod
+    def _bin_daily(offsets, cents, type_codes, length):
+        """以 日期偏移×2+类型 为下标，一次bincount得到逐日收入和支出合计（分）及记录数
+        
+        type_codes 中收入为0、支出为1，其他值不参与汇总。
+        """
+        valid = (type_codes == 0) | (type_codes == 1)
+        index = offsets[valid] * 2 + type_codes[valid]
+        # bincount的权重为float64，单日合计在2^53分以内时仍然精确
+        totals = np.bincount(index, weights=cents[valid], minlength=2 * length).reshape(length, 2)
+        counts = np.bincount(index, minlength=2 * length).reshape(length, 2)
+        return {
+            'income': totals[:, 0].astype(np.int64),
+            'expense': totals[:, 1].astype(np.int64),
+            'income_count': counts[:, 0],
+            'expense_count': counts[:, 1],
+        }
+    
+    def _predict_using_regression(self, daily_data, days_ahead, engine=None):
         """使用线性回归进行预测"""
         try:
-            # 准备特征和目标变量
-            X = np.array(range(len(daily_data))).reshape(-1, 1)
-            y = daily_data['amount'].values
-            
-            # 训练模型
-            model = LinearRegression()
-            model.fit(X, y)
-            
-            # 预测未来
-            future_X = np.array(range(len(daily_data), len(daily_data) + days_ahead)).reshape(-1, 1)
-            predictions = model.predict(future_X)
+            predictions = (engine or self.engine).forecast(daily_data['amount'].values, days_ahead)
             
             # 确保预测值非负
-            predictions = [max(0, p) for p in predictions]
-            
-            return predictions
+            return np.maximum(predictions, 0).tolist()
         except Exception as e:
             print(f"预测时出错: {e}")
             # 返回简单的平均值作为备选方案
             avg_amount = daily_data['amount'].mean()
             return [avg_amount] * days_ahead
     
+    def get_anomalies(self, limit=None):
+        """返回被标记为异常的支出记录和日期
+        
+        Returns:
+            {'transactions': [...], 'days': [...]}，各项包含金额、组内基准金额 baseline、
+            相对基准金额的倍数 ratio 和Z分数 score，按分数从高到低排列
+        """
+        return self._get_anomaly_detector().anomalies(limit)
+    
+    def get_record_anomaly(self, record_id):
+        """返回一条支出记录的异常分数（记录计入估计之前打分），不是支出记录时返回None"""
+        return self._get_anomaly_detector().record_score(record_id)
+    
+    def get_day_anomaly(self, date):
+        """返回某天（'YYYY-MM-DD'）支出合计的异常分数，当天没有支出时返回None"""
+        return self._get_anomaly_detector().day_score(day_number(date))
+    
+    def _get_anomaly_detector(self):
+        """获取异常检测器，过期时先重新计算"""
+        if self.anomaly_detector.stale:
+            self.anomaly_detector.rebuild()
+        return self.anomaly_detector
+    
     def calculate_economic_indicators(self, records=None):
-        """计算经济指标：恩格尔系数、APC、MPC"""
-        if records is None:
-            records = self.account_model.get_all_records()
+        """计算经济指标：恩格尔系数、APC、MPC
         
-        if not records:
-            return None
+        未指定records时使用随记录增删增量维护的累加器，耗时只与月数有关；
+        指定records时一次遍历给定记录重新累加。
+        MPC为各月支出对各月收入的回归斜率（没有记录的月份按0计入）。
+        """
+        return self._indicator_accumulator(records).indicators()
+    
+    def get_indicator_series(self, windows=(1, 3, 6, 12), records=None):
+        """按月及滚动窗口的经济指标时间序列
         
-        # 计算总收入和总支出
-        summary = self.account_model.get_incomes_and_expenses(records)
-        total_income = summary['total_income']
-        total_expense = summary['total_expense']
-        
-        # 计算恩格尔系数（食品支出占总支出的比例）
-        # 这里简单模拟，实际应用中需要更精确的分类
-        food_expense = sum(r['amount'] for r in records 
-                          if r['type'] == 'expense' and 
-                          any(keyword in r['description'].lower() for keyword in ['food', '餐饮', '吃饭', '食品', '超市']))
-        
-        # 平均消费倾向 APC = 消费/收入
-        apc = total_expense / total_income if total_income > 0 else 0
-        
-        # 恩格尔系数
-        engel_coefficient = food_expense / total_expense if total_expense > 0 else 0
-        
-        # 简化的边际消费倾向计算
-        # 按时间排序记录
-        sorted_records = sorted(records, key=lambda x: x['date'])
-        
-        # 按月分组计算
-        monthly_data = {}
-        for record in sorted_records:
-            month_key = record['date'][:7]  # YYYY-MM
-            if month_key not in monthly_data:
-                monthly_data[month_key] = {'income': 0, 'expense': 0}
-            if record['type'] == 'income':
-                monthly_data[month_key]['income'] += record['amount']
-            else:
-                monthly_data[month_key]['expense'] += record['amount']
-        
-        # 计算MPC（简化版）
-        mpc = 0
-        if len(monthly_data) > 1:
-            # 计算收入变化和支出变化
-            months = sorted(monthly_data.keys())
-            income_changes = []
-            expense_changes = []
-            
-            for i in range(1, len(months)):
-                income_change = monthly_data[months[i]]['income'] - monthly_data[months[i-1]]['income']
-                expense_change = monthly_data[months[i]]['expense'] - monthly_data[months[i-1]]['expense']
-                
-                if income_change > 0:  # 只有收入增加时才计算
-                    income_changes.append(income_change)
-                    expense_changes.append(expense_change)
-            
-            if income_changes:
-                # MPC = 支出变化/收入变化
-                mpc = sum(expense_changes) / sum(income_changes) if sum(income_changes) > 0 else 0
+        由按月汇总的收入、支出、食品支出数组一次性计算（前缀和相减得到各窗口合计），
+        窗口长度为1时即逐月指标；MPC为窗口内各月支出对收入的回归斜率。
         
-        return {
-            'engel_coefficient': engel_coefficient,
-            'avg_propensity_consumption': apc,
-            'marginal_propensity_consumption': mpc
-        }
+        Args:
+            windows: 滚动窗口的月数
+            records: 可选的记录集，默认使用全部记录
+            
+        Returns:
+            见 indicator_model.indicator_series，没有记录时返回None
+        """
+        windows = tuple(int(window) for window in windows)
+        if records is None:
+            return self._cached_result(('indicator_series', windows),
+                                       lambda: self._indicator_accumulator().series(windows))
+        return self._indicator_accumulator(records).series(windows)
+    
+    def _indicator_accumulator(self, records=None):
+        """未指定records时返回增量维护的全部记录累加器，否则对给定记录新建一个"""
+        if records is not None:
+            return self._new_indicator_accumulator().rebuild(records)
+        if self._indicators is None:
+            self._indicators = self._new_indicator_accumulator().rebuild(self.account_model.get_all_records())
+        return self._indicators
+    
+    def _new_indicator_accumulator(self):
+        """创建使用本账本金额和分类规则的经济指标累加器"""
+        return IndicatorAccumulator(self.account_model.get_record_cents, self.account_model.get_record_category)
     
     def get_economic_profile(self, records=None):
         """获取用户经济水平画像"""
@@ -0,0 +1,142 @@
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.models.account_model import AccountModel
+from src.models.prediction_model import PredictionModel
+
+# 参与人群分位统计的经济指标
+COHORT_INDICATORS = ('engel_coefficient', 'avg_propensity_consumption', 'marginal_propensity_consumption')
+COHORT_PERCENTILES = (10, 25, 50, 75, 90)
+
+# 每个工作进程复用的 (AccountModel, PredictionModel)，分类器等只构建一次
+_worker_models = None
+
+def collect_ledger_files(paths):
+    """把目录、通配符和文件路径展开为去重后的账本数据文件列表"""
+    files = []
+    seen = set()
+    for path in paths:
+        if os.path.isdir(path):
+            matches = [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith('.json')]
+        elif glob.has_magic(path):
+            matches = sorted(glob.glob(path))
+        else:
+            matches = [path]
+        for match in matches:
+            if match not in seen:
+                seen.add(match)
+                files.append(match)
+    return files
+
+def _load_ledger(data_file):
+    """在当前进程复用的模型中加载账本，返回 (AccountModel, PredictionModel)"""
+    global _worker_models
+    if _worker_models is None:
+        account_model = AccountModel(data_file)
+        _worker_models = (account_model, PredictionModel(account_model))
+    else:
+        account_model = _worker_models[0]
+        account_model.data_file = data_file
+        # 整体替换记录会通知预测模型重建增量统计量
+        account_model.records = account_model.load_records()
+    return _worker_models
+
+def _profile_files(data_files):
+    """计算一组账本的经济画像（在子进程中运行），单个账本出错时记录错误并继续处理其余账本"""
+    results = []
+    for data_file in data_files:
+        ledger = os.path.splitext(os.path.basename(data_file))[0]
+        try:
+            account_model, prediction_model = _load_ledger(data_file)
+            results.append({
+                'ledger': ledger,
+                'file': data_file,
+                'records': len(account_model.records),
+                'profile': prediction_model.get_economic_profile(),
+            })
+        except Exception as e:
+            results.append({'ledger': ledger, 'file': data_file, 'error': f"{type(e).__name__}: {e}"})
+    return results
+
+def cohort_statistics(values):
+    """计算人群分位统计
+
+    Args:
+        values: 指标名 -> [(账本文件, 指标值), ...]
+
+    Returns:
+        (各指标的分位数 {'p10': ..., ...}, 各账本在人群中的百分位排名 {账本文件: {指标名: 0~100}})
+    """
+    percentiles = {}
+    ranks = {}
+    for name, pairs in values.items():
+        if not pairs:
+            percentiles[name] = None
+            continue
+        data = np.array([value for _, value in pairs], dtype=float)
+        percentiles[name] = {f'p{p}': float(v) for p, v in zip(COHORT_PERCENTILES, np.percentile(data, COHORT_PERCENTILES))}
+        # 百分位排名：人群中指标值不高于该账本的比例
+        ordered = np.sort(data)
+        positions = np.searchsorted(ordered, data, side='right') / len(data) * 100
+        for (data_file, _), rank in zip(pairs, positions):
+            ranks.setdefault(data_file, {})[name] = float(rank)
+    return percentiles, ranks
+
+def run_profiles(data_files, output, max_workers=None, chunk_size=16):
+    """并行计算多个账本的经济画像，逐行写入JSONL文件，并给出人群分位统计
+
+    账本按 chunk_size 分组分发到进程池，每个工作进程只导入一次依赖、
+    只构建一次模型，依次加载组内账本计算画像；结果按输入顺序边计算边写出。
+
+    Args:
+        data_files: 账本数据文件列表
+        output: JSONL输出文件路径，每行一个账本 {'ledger', 'file', 'records', 'profile'}，
+            无法处理的账本为 {'ledger', 'file', 'error'}
+        max_workers: 进程数，为1时在当前进程中顺序执行
+        chunk_size: 每个任务包含的账本数
+
+    Returns:
+        {'ledgers': 账本数, 'profiled': 成功生成画像的账本数, 'failed': 出错的账本数,
+         'percentiles': 各指标的人群分位数, 'ranks': 各账本在人群中的百分位排名}
+    """
+    if chunk_size <= 0:
+        raise ValueError("每个任务包含的账本数必须大于0")
+    chunks = [data_files[i:i + chunk_size] for i in range(0, len(data_files), chunk_size)]
+    output_dir = os.path.dirname(output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    values = {name: [] for name in COHORT_INDICATORS}
+    failed = 0
+    executor = None
+    if max_workers == 1 or len(chunks) <= 1:
+        outputs = map(_profile_files, chunks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        outputs = executor.map(_profile_files, chunks)
+    try:
+        with open(output, 'w', encoding='utf-8') as f:
+            for results in outputs:
+                for result in results:
+                    f.write(json.dumps(result, ensure_ascii=False) + '\n')
+                    if 'error' in result:
+                        failed += 1
+                    elif result['profile'] is not None:
+                        for name in COHORT_INDICATORS:
+                            values[name].append((result['file'], result['profile']['indicators'][name]))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    percentiles, ranks = cohort_statistics(values)
+    return {
+        'ledgers': len(data_files),
+        'profiled': len(values[COHORT_INDICATORS[0]]),
+        'failed': failed,
+        'percentiles': percentiles,
+        'ranks': ranks,
+    }
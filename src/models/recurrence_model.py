@@ -0,0 +1,193 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.models.account_model import day_number
+
+# 周期名 -> (自相关检查的最小滞后天数, 最大滞后天数, 名义天数)，按周期从短到长排列；
+# 允许的滞后范围覆盖节假日顺延、大小月等造成的间隔波动
+PERIODS = {
+    'weekly': (6, 8, 7),
+    'biweekly': (13, 15, 14),
+    'monthly': (27, 33, 30.44),
+    'yearly': (360, 370, 365.25),
+}
+
+# 按月推算下一次发生日期的周期 -> 间隔月数
+_MONTH_STEPS = {'monthly': 1, 'yearly': 12}
+
+# 分块计算自相关时每块矩阵的元素数上限，限制内存占用
+_CHUNK_CELLS = 1 << 22
+
+_DESCRIPTION_NOISE = re.compile(r'[\d\W_]+')
+
+def normalize_description(description):
+    """归一化描述用于分组：转小写，去掉数字、标点和空白（如 '3月房租' 与 '4月 房租' 相同）"""
+    return _DESCRIPTION_NOISE.sub('', str(description or '').lower())
+
+def autocorrelation(occurrence, max_lag):
+    """用FFT一次计算多行0/1发生序列在滞后 0..max_lag 天的自相关（两次发生相隔该天数的次数）
+
+    Args:
+        occurrence: (行数, 天数) 矩阵
+        max_lag: 最大滞后天数
+
+    Returns:
+        (行数, max_lag+1) 的整数矩阵
+    """
+    length = occurrence.shape[1]
+    # 补零到不小于 天数+max_lag 的2的幂，避免循环相关的首尾混叠
+    size = 1 << int(np.ceil(np.log2(max(length + max_lag, 2))))
+    spectrum = np.fft.rfft(occurrence, n=size, axis=1)
+    acf = np.fft.irfft(spectrum * spectrum.conj(), n=size, axis=1)[:, :max_lag + 1]
+    return np.rint(acf).astype(np.int64)
+
+def detect_recurring(days, cents, is_expense, descriptions, min_occurrences=3, band_ratio=1.5,
+                     min_regularity=0.75, max_noise=0.25):
+    """在全部记录中识别周期性收支（工资、房租、订阅等）
+
+    按 (类型, 归一化描述, 金额档位) 分组，金额档位以组内中位数为中心、相邻档位相差band_ratio倍。
+    发生日期数不少于min_occurrences的组作为候选，构建 (候选组 × 日历日) 的0/1发生矩阵，
+    用FFT对全部候选组同时计算自相关，依次检查每个周期：
+    相隔天数落在该周期范围内的次数占相邻发生次数的比例（规律性）不低于min_regularity，
+    且相隔天数短于该周期的次数所占比例（噪声）不超过max_noise，则取最短的满足条件的周期。
+
+    Args:
+        days: 记录日期（自1970-01-01起的天数）
+        cents: 记录金额（分）
+        is_expense: 是否为支出，其余按收入处理
+        descriptions: 记录描述
+
+    Returns:
+        (周期计划列表, 属于周期计划的记录的布尔掩码)；计划按周期从短到长、金额从高到低排列，
+        各含 description、type、period、interval_days、amount（中位金额，元）、
+        day_of_month（按月、按年计划最常见的几号）、occurrences、first_date、last_date、next_date、
+        active（最近一次发生距最后记录日期不超过1.5个周期）、regularity
+    """
+    days = np.asarray(days, dtype=np.int64)
+    cents = np.asarray(cents, dtype=np.int64)
+    is_expense = np.asarray(is_expense, dtype=bool)
+    mask = np.zeros(len(days), dtype=bool)
+    if len(days) == 0:
+        return [], mask
+
+    # 描述只对不同取值归一化一次
+    description_codes, unique_descriptions = pd.factorize(np.asarray(descriptions, dtype=object))
+    normalized_codes, _ = pd.factorize(np.array([normalize_description(d) for d in unique_descriptions], dtype=object))
+    base = normalized_codes[description_codes] * 2 + is_expense
+    # 金额档位：以 (类型, 描述) 组内中位数为中心按对数取整
+    positive = np.maximum(cents, 1).astype(float)
+    median = pd.Series(positive).groupby(base).transform('median').to_numpy()
+    band = np.rint(np.log(positive / median) / np.log(band_ratio)).astype(np.int64)
+    band -= band.min()
+    group_codes, _ = pd.factorize(base * (int(band.max()) + 1) + band)
+
+    first_day = int(days.min())
+    last_day = int(days.max())
+    length = last_day - first_day + 1
+    # 每组发生的不同日期数
+    day_keys = np.unique(group_codes.astype(np.int64) * length + (days - first_day))
+    occupied = np.bincount(day_keys // length)
+    candidates = np.flatnonzero(occupied >= min_occurrences)
+    if len(candidates) == 0:
+        return [], mask
+
+    max_lag = min(max(hi for _, hi, _ in PERIODS.values()), length - 1)
+    row_of = np.full(len(occupied), -1)
+    row_of[candidates] = np.arange(len(candidates))
+    keys = day_keys[row_of[day_keys // length] >= 0]
+    rows = row_of[keys // length]
+    offsets = keys % length
+    gaps = np.maximum(occupied[candidates] - 1, 1)
+
+    periods = np.full(len(candidates), -1)
+    regularity = np.zeros(len(candidates))
+    chunk = max(1, _CHUNK_CELLS // (length + max_lag))
+    for start in range(0, len(candidates), chunk):
+        stop = min(start + chunk, len(candidates))
+        # 发生日期按组号排列，同一块的候选组是连续的一段
+        lo, hi = np.searchsorted(rows, [start, stop])
+        occurrence = np.zeros((stop - start, length))
+        occurrence[rows[lo:hi] - start, offsets[lo:hi]] = 1
+        acf = autocorrelation(occurrence, max_lag)
+        cumulative = np.cumsum(acf, axis=1)
+        for index, (shortest, longest, _) in enumerate(PERIODS.values()):
+            if longest > max_lag:
+                break
+            matched = (cumulative[:, longest] - cumulative[:, shortest - 1]) / gaps[start:stop]
+            noise = (cumulative[:, shortest - 1] - acf[:, 0]) / gaps[start:stop]
+            passed = (matched >= min_regularity) & (noise <= max_noise) & (periods[start:stop] < 0)
+            periods[start:stop][passed] = index
+            regularity[start:stop][passed] = np.minimum(matched[passed], 1.0)
+
+    names = list(PERIODS)
+    order = np.argsort(group_codes, kind='stable')
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(group_codes, minlength=len(occupied)))))
+    schedules = []
+    for row in np.flatnonzero(periods >= 0):
+        group = candidates[row]
+        members = order[bounds[group]:bounds[group + 1]]
+        members = members[np.argsort(days[members], kind='stable')]
+        mask[members] = True
+        period = names[periods[row]]
+        member_days = days[members]
+        dates = member_days.astype('datetime64[D]')
+        day_of_month = (dates - dates.astype('datetime64[M]')).astype(np.int64) + 1
+        last = int(member_days[-1])
+        schedule = {
+            'description': str(descriptions[members[-1]]),
+            'type': 'expense' if is_expense[members[-1]] else 'income',
+            'period': period,
+            'interval_days': PERIODS[period][2],
+            'amount': float(np.median(cents[members])) / 100,
+            'day_of_month': int(np.bincount(day_of_month).argmax()) if period in _MONTH_STEPS else None,
+            'occurrences': len(members),
+            'first_date': str(dates[0]),
+            'last_date': str(dates[-1]),
+            'active': last_day - last <= 1.5 * PERIODS[period][1],
+            'regularity': float(regularity[row]),
+        }
+        schedule['next_date'] = str(np.datetime64(int(next_occurrences(schedule, last + 1, 1)[0]), 'D'))
+        schedules.append(schedule)
+    schedules.sort(key=lambda schedule: (schedule['interval_days'], -schedule['amount']))
+    return schedules, mask
+
+def next_occurrences(schedule, start_day, count=None, end_day=None):
+    """推算计划在 start_day 及之后的发生日期（自1970-01-01起的天数）
+
+    按周的计划从最近一次发生起每隔固定天数；按月、按年的计划落在对应月份的 day_of_month 号，
+    该月没有这一天时取月末。给出count时返回前count次，否则返回 end_day 之前（不含）的全部日期。
+    """
+    last = day_number(schedule['last_date'])
+    months = _MONTH_STEPS.get(schedule['period'])
+    if months is None:
+        step = PERIODS[schedule['period']][2]
+        first = last + step * max(1, -(-(start_day - last) // step))
+        stop = end_day if end_day is not None else first + step * count
+        return np.arange(first, stop, step, dtype=np.int64)[:count]
+
+    # 按年的计划从最近一次发生的月份起每隔12个月
+    last_month = np.datetime64(schedule['last_date'], 'M')
+    anchor_day = schedule['day_of_month']
+    # 先按天数粗略估计需要的月数，再截取
+    span = (end_day - start_day) if end_day is not None else count * months * 31
+    steps = np.arange(1, (start_day - last + span) // (28 * months) + 2)
+    month_starts = (last_month + steps * months).astype('datetime64[D]')
+    month_ends = (last_month + steps * months + 1).astype('datetime64[D]') - 1
+    occurrences = np.minimum(month_starts + (anchor_day - 1), month_ends).astype(np.int64)
+    occurrences = occurrences[occurrences >= start_day]
+    if end_day is not None:
+        occurrences = occurrences[occurrences < end_day]
+    return occurrences[:count]
+
+def project_schedules(schedules, start_day, days_ahead):
+    """把生效中的计划按发生日期投射到从start_day起的days_ahead天，返回 (每日收入, 每日支出)（元）"""
+    projected = np.zeros((2, days_ahead))
+    for schedule in schedules:
+        if not schedule['active']:
+            continue
+        occurrences = next_occurrences(schedule, start_day, end_day=start_day + days_ahead)
+        row = 1 if schedule['type'] == 'expense' else 0
+        np.add.at(projected[row], occurrences - start_day, schedule['amount'])
+    return projected[0], projected[1]
@@ -0,0 +1,129 @@
+import numpy as np
+
+# 调整项可按以下字段筛选收支分量（见 PredictionModel.project_cash_flows）
+LEVER_SELECTORS = ('type', 'category', 'label', 'recurring')
+
+# 单次模拟允许的调整项数上限（每个分量×日期的调整项组合编码为一个64位整数）
+MAX_LEVERS = 62
+
+def lever_mask(lever, components, days_ahead):
+    """返回调整项作用范围的 (分量数, 天数) 布尔矩阵
+
+    Args:
+        lever: 调整项，如 {'category': 'housing', 'start': 0, 'days': 60}；
+            type、category、label、recurring 中给出的字段都相同的分量受影响，
+            start 为从预测首日起的第几天（从0开始），days 为持续天数，默认到预测期末
+        components: 收支分量列表
+        days_ahead: 预测天数
+    """
+    selectors = {key: lever[key] for key in LEVER_SELECTORS if key in lever}
+    if not selectors:
+        raise ValueError(f"调整项需要指定 {'、'.join(LEVER_SELECTORS)} 中的至少一个")
+    try:
+        start = int(lever.get('start', 0))
+        days = lever.get('days')
+        stop = days_ahead if days is None else start + int(days)
+    except (TypeError, ValueError):
+        raise ValueError("调整项的起始天数和持续天数必须是整数")
+    if start < 0 or stop < start:
+        raise ValueError("调整项的起始天数和持续天数不能为负")
+    rows = [all(component[key] == value for key, value in selectors.items()) for component in components]
+    mask = np.zeros((len(components), days_ahead), dtype=bool)
+    mask[np.array(rows, dtype=bool), start:stop] = True
+    return mask
+
+def scenario_grid(values):
+    """由各调整项的候选倍数生成全部组合，返回 (组合数, 调整项数) 的倍数矩阵"""
+    if not values:
+        return np.ones((1, 0))
+    grids = np.meshgrid(*[np.asarray(v, dtype=float) for v in values], indexing='ij')
+    return np.stack(grids, axis=-1).reshape(-1, len(values))
+
+class ScenarioEngine:
+    """在预测现金流上批量模拟"如果……会怎样"的情景
+
+    预测的未来每日收支按分量（周期性计划、各分类）排成 (分量数, 天数) 矩阵。每个调整项
+    （如 "房租上涨10%"、"工资停发2个月"、"餐饮减少30%"）选中部分分量和日期，
+    每个情景为各调整项的倍数。受同一组调整项影响的单元格先合并为一行每日合计，
+    全部情景的倍数一次广播得到 (情景数, 组合数) 矩阵，再一次矩阵乘法得到每日净收支，
+    cumsum 得到余额曲线；耗时与情景数成线性，数千个情景只需一次运算。
+    """
+
+    def __init__(self, prediction_model, days_ahead=90, engine=None):
+        if days_ahead <= 0:
+            raise ValueError("预测天数必须大于0")
+        self.prediction_model = prediction_model
+        self.days_ahead = days_ahead
+        self.engine = engine
+
+    def baseline(self):
+        """返回基准收支分量投射（见 PredictionModel.project_cash_flows），数据不足时抛出ValueError"""
+        projection = self.prediction_model.project_cash_flows(self.days_ahead, self.engine)
+        if projection is None:
+            raise ValueError("数据量不足，无法进行情景模拟")
+        return projection
+
+    def simulate(self, levers, factors=None, balance=None):
+        """模拟一组情景
+
+        Args:
+            levers: 调整项列表（见 lever_mask），可带 name 和 factor（单一情景时的倍数）
+            factors: (情景数, 调整项数) 的倍数矩阵，默认为各调整项 factor 组成的单一情景
+            balance: 初始余额，默认为账本当前余额
+
+        Returns:
+            {'start_date': 预测首日, 'factors': 倍数矩阵, 'matched': 各调整项选中的分量数,
+             'net': (情景数, 天数) 每日净收支, 'balance': (情景数, 天数) 每日结束时余额,
+             'runway': 各情景余额首次为负是第几天（从1开始，不为负时为-1）,
+             'min_balance': 各情景最低余额, 'end_balance': 各情景期末余额}
+        """
+        if len(levers) > MAX_LEVERS:
+            raise ValueError(f"调整项不能超过 {MAX_LEVERS} 个")
+        if factors is None:
+            factors = [[lever.get('factor', 1.0) for lever in levers]]
+        try:
+            factors = np.asarray(factors, dtype=float)
+        except (TypeError, ValueError):
+            raise ValueError("调整倍数必须是数字")
+        if factors.ndim == 1:
+            factors = factors[None]
+        if factors.ndim != 2 or factors.shape[1] != len(levers):
+            raise ValueError("倍数矩阵的列数必须等于调整项数")
+        if np.any(factors < 0) or not np.all(np.isfinite(factors)):
+            raise ValueError("调整倍数必须是非负数")
+        projection = self.baseline()
+        components = projection['components']
+        signs = np.array([1.0 if component['type'] == 'income' else -1.0 for component in components])
+        signed = projection['flows'] * signs[:, None]
+        if balance is None:
+            balance = self.prediction_model.account_model.get_incomes_and_expenses()['balance']
+
+        # 每个单元格受哪些调整项影响编码为一个整数，相同编码的单元格按日合并
+        codes = np.zeros(signed.shape, dtype=np.int64)
+        matched = []
+        for index, lever in enumerate(levers):
+            mask = lever_mask(lever, components, self.days_ahead)
+            matched.append(int(mask.any(axis=1).sum()))
+            codes |= mask.astype(np.int64) << index
+        patterns, inverse = np.unique(codes, return_inverse=True)
+        days = np.broadcast_to(np.arange(self.days_ahead), signed.shape)
+        combined = np.bincount(inverse.ravel() * self.days_ahead + days.ravel(), weights=signed.ravel(),
+                               minlength=len(patterns) * self.days_ahead).reshape(len(patterns), self.days_ahead)
+
+        # (情景数, 组合数)：组合中各调整项倍数之积
+        bits = (patterns[:, None] >> np.arange(len(levers))) & 1
+        multipliers = np.where(bits[None].astype(bool), factors[:, None, :], 1.0).prod(axis=2)
+        net = multipliers @ combined
+        balances = balance + np.cumsum(net, axis=1)
+        negative = balances < 0
+        runway = np.where(negative.any(axis=1), negative.argmax(axis=1) + 1, -1)
+        return {
+            'start_date': projection['start_date'],
+            'factors': factors,
+            'matched': matched,
+            'net': net,
+            'balance': balances,
+            'runway': runway,
+            'min_balance': balances.min(axis=1),
+            'end_balance': balances[:, -1],
+        }
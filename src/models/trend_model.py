@@ -0,0 +1,106 @@
+import numpy as np
+
+class IncrementalTrend:
+    """可增量更新的线性趋势估计
+
+    以连续日历日为自变量、每日合计为样本（没有记录的日期按0计入）做最小二乘拟合，
+    只保存加权充分统计量 Σw、Σwx、Σwx²、Σwy、Σwxy：
+    修改区间内某天的合计只需O(1)，区间向前或向后延伸k天只需O(k)，
+    预测h天只需O(h)，都与历史长度无关。
+
+    forgetting_factor 为指数遗忘因子λ（0<λ≤1），距区间最后一天k天的样本权重为λ^k；
+    λ=1 时与普通最小二乘完全一致。日期均为自1970-01-01起的天数。
+    """
+
+    def __init__(self, forgetting_factor=1.0):
+        if not 0 < forgetting_factor <= 1:
+            raise ValueError("遗忘因子必须在 (0, 1] 区间内")
+        self.forgetting_factor = forgetting_factor
+        self.first_day = None
+        self.last_day = None
+        # 自变量 x = 日期 - origin，origin 在重建时固定，区间延伸时不变
+        self._origin = 0
+        self._reset_stats()
+
+    def rebuild(self, first_day, values):
+        """用从first_day开始的连续逐日合计整体重建"""
+        values = np.asarray(values, dtype=float)
+        self._reset_stats()
+        if len(values) == 0:
+            self.first_day = self.last_day = None
+            return
+        self.first_day = self._origin = int(first_day)
+        self.last_day = self.first_day + len(values) - 1
+        x = np.arange(len(values), dtype=float)
+        w = self.forgetting_factor ** (len(values) - 1 - x)
+        self._s0 = float(w.sum())
+        self._sx = float((w * x).sum())
+        self._sxx = float((w * x * x).sum())
+        self._sy = float((w * values).sum())
+        self._sxy = float((w * x * values).sum())
+
+    def extend_to(self, day):
+        """把区间延伸到包含day，新增的日期合计为0"""
+        day = int(day)
+        if self.first_day is None:
+            self.first_day = self.last_day = self._origin = day
+            self._add_zero_days(day, day)
+        elif day > self.last_day:
+            # 已有样本离最后一天更远了，权重整体乘以λ^k
+            decay = self.forgetting_factor ** (day - self.last_day)
+            self._s0 *= decay
+            self._sx *= decay
+            self._sxx *= decay
+            self._sy *= decay
+            self._sxy *= decay
+            start = self.last_day + 1
+            self.last_day = day
+            self._add_zero_days(start, day)
+        elif day < self.first_day:
+            end = self.first_day - 1
+            self.first_day = day
+            self._add_zero_days(day, end)
+
+    def update(self, day, delta):
+        """某天的合计增加delta（删除记录时取负），必要时先延伸区间"""
+        self.extend_to(day)
+        weight = self.forgetting_factor ** (self.last_day - day)
+        x = day - self._origin
+        self._sy += weight * delta
+        self._sxy += weight * x * delta
+
+    def forecast(self, horizon):
+        """预测区间最后一天之后horizon天的值"""
+        slope, intercept = self.coefficients()
+        start = (self.last_day if self.last_day is not None else self._origin - 1) + 1 - self._origin
+        return [intercept + slope * x for x in range(start, start + horizon)]
+
+    def coefficients(self):
+        """返回 (斜率, 截距)，截距对应 x=0 即 origin 当天"""
+        if self._s0 == 0:
+            return 0.0, 0.0
+        denominator = self._s0 * self._sxx - self._sx * self._sx
+        # 只有一个样本（或权重退化）时没有趋势，按均值预测
+        if abs(denominator) <= 1e-12 * max(self._s0 * self._sxx, 1.0):
+            return 0.0, self._sy / self._s0
+        slope = (self._s0 * self._sxy - self._sx * self._sy) / denominator
+        intercept = (self._sy - slope * self._sx) / self._s0
+        return slope, intercept
+
+    def _add_zero_days(self, start, end):
+        """把 [start, end] 内合计为0的日期计入 Σw、Σwx、Σwx²"""
+        days = np.arange(start, end + 1, dtype=float)
+        x = days - self._origin
+        w = self.forgetting_factor ** (self.last_day - days)
+        self._s0 += float(w.sum())
+        self._sx += float((w * x).sum())
+        self._sxx += float((w * x * x).sum())
+
+    def _reset_stats(self):
+        self._s0 = self._sx = self._sxx = self._sy = self._sxy = 0.0
+
+    def __len__(self):
+        """区间内的日历天数"""
+        if self.first_day is None:
+            return 0
+        return self.last_day - self.first_day + 1
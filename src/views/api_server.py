@@ -0,0 +1,555 @@
+import hashlib
+import json
+import math
+import os
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from src.models.account_model import to_cents
+from src.models.budget_model import BudgetEngine, rule_from_dict
+from src.models.ledger_registry import LedgerRegistry, DEFAULT_LEDGER
+from src.models.lru_cache import LRUCache
+from src.models.scenario_model import ScenarioEngine, scenario_grid
+
+class ApiError(Exception):
+    """带HTTP状态码的接口错误"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def _json_default(value):
+    """序列化numpy数组和标量"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+class ApiServer:
+    """本地HTTP/JSON接口服务
+
+    常驻内存持有各账本的模型，多个客户端并发访问时按账本加锁，
+    同一账本上的操作串行执行，不同账本之间互不阻塞。
+
+    接口（均可通过 ?ledger=<账本名> 指定账本）：
+        GET    /ledgers                 列出账本
+        GET    /records                 分页查询记录（cursor、limit、order_by及过滤条件）
+        GET    /records/<id>            获取单条记录
+        POST   /records                 新增记录
+        DELETE /records/<id>            删除记录（可带 reason）
+        GET    /summary                 收支汇总（可带 start_date、end_date）
+        GET    /predict                 收支预测（days，可带 start_date、end_date 或 engine；recurring=1 时按周期性收支计划叠加）
+        GET    /predict_by_category     按分类预测（days、engine，可带 start_date、end_date）
+        GET    /recurring               识别出的周期性收支计划（active=1 时只返回生效中的计划）
+        GET    /profile                 经济画像
+        GET    /indicators              按月及滚动窗口的经济指标序列（windows，如 1,3,6,12）
+        GET    /anomalies               支出异常（异常的单笔支出和日支出合计，可带 limit）
+        POST   /scenarios               情景模拟（调整项 levers，倍数矩阵 factors 或各调整项候选倍数 grid）
+        GET    /alerts                  预算报警（生效中的报警及最近事件，可带 today 只看当前周期）
+        POST   /batch                   批量操作（一次加锁、一次保存）
+
+    只读接口的响应按 (账本, 接口, 参数, 账本版本号) 缓存并带有ETag，
+    客户端携带 If-None-Match 且账本未变化时直接返回304。
+    """
+
+    # 单次批量请求允许的最大操作数
+    MAX_BATCH_OPERATIONS = 10000
+    # 单次情景模拟请求允许的最大情景数，以及情景数×预测天数的上限
+    MAX_SCENARIOS = 100000
+    MAX_SCENARIO_CELLS = 20_000_000
+    # 预测天数上限（约10年）和单页/单次返回条数上限
+    MAX_DAYS = 3660
+    MAX_LIMIT = 1000
+    # 请求体字节数上限
+    MAX_BODY_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, registry=None, host='127.0.0.1', port=8000, cache_entries=1024, budget_rules=None):
+        self.registry = registry if registry is not None else LedgerRegistry()
+        # 预算规则配置应用到每个账本，账本首次被访问时创建规则引擎，之后随记录变化增量评估
+        self.budget_rules = list(budget_rules or [])
+        for index, rule in enumerate(self.budget_rules):
+            rule_from_dict(rule, index)
+        self._budget_engines = {}
+        self.registry.add_eviction_listener(self._on_ledger_evicted)
+        self.host = host
+        self.port = port
+        self._httpd = None
+        self._thread = None
+        self.response_cache = LRUCache(cache_entries)
+        # ETag前缀在每次启动时随机生成，避免重启后与客户端保存的旧ETag冲突
+        self._etag_prefix = os.urandom(4).hex()
+        self._routes = {
+            ('GET', 'ledgers'): self._list_ledgers,
+            ('GET', 'records'): self._query_records,
+            ('POST', 'records'): self._add_record,
+            ('GET', 'records/<id>'): self._get_record,
+            ('DELETE', 'records/<id>'): self._delete_record,
+            ('GET', 'summary'): self._summary,
+            ('GET', 'predict'): self._predict,
+            ('GET', 'profile'): self._profile,
+            ('GET', 'predict_by_category'): self._predict_by_category,
+            ('GET', 'recurring'): self._recurring,
+            ('GET', 'indicators'): self._indicators,
+            ('GET', 'anomalies'): self._anomalies,
+            ('POST', 'scenarios'): self._scenarios,
+            ('GET', 'alerts'): self._alerts,
+            ('POST', 'batch'): self._batch,
+        }
+        # 批量请求中的操作名 -> 处理函数，沿用单条接口的语义
+        self._batch_operations = {
+            'add': self._add_record,
+            'delete': self._delete_record,
+            'get': self._get_record,
+            'query': self._query_records,
+            'summary': self._summary,
+            'predict': self._predict,
+            'profile': self._profile,
+            'predict_by_category': self._predict_by_category,
+            'recurring': self._recurring,
+            'indicators': self._indicators,
+            'anomalies': self._anomalies,
+        }
+        # 结果只取决于账本内容和请求参数、可以按版本号缓存的接口
+        self._cacheable_routes = (self._query_records, self._get_record, self._summary,
+                                  self._predict, self._predict_by_category, self._profile, self._recurring, self._indicators, self._anomalies)
+
+    def handle(self, method, path, params=None, body=None, if_none_match=None):
+        """分派一次请求，返回 (状态码, 响应体字节, 额外响应头)"""
+        params = params or {}
+        try:
+            route, record_id = self._match_route(method, path)
+            if route == self._list_ledgers:
+                return self._encode(*route(None, None, params, body, record_id))
+            ledger = params.get('ledger', DEFAULT_LEDGER)
+            with self.registry.lock_for(ledger):
+                account_model, prediction_model = self.registry.get(ledger)
+                if self.budget_rules:
+                    self._budget_engine(ledger, account_model, prediction_model)
+                if route not in self._cacheable_routes:
+                    return self._encode(*route(account_model, prediction_model, params, body, record_id))
+
+                # 账本版本号在锁内读取，保证缓存内容与版本号一致
+                key = (ledger, path, tuple(sorted(params.items())), account_model.version)
+                etag = self._make_etag(key)
+                headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+                # 具体的ETag只会在成功响应中发出，匹配即可直接返回304
+                if if_none_match and self._etag_matches(if_none_match, etag, wildcard=False):
+                    return 304, b'', headers
+
+                data = self.response_cache.get(key)
+                if data is None:
+                    status, data, _ = self._encode(*route(account_model, prediction_model, params, body, record_id))
+                    if status != 200:
+                        return status, data, {}
+                    self.response_cache.put(key, data)
+                # "*" 只在资源存在（得到成功响应）时匹配
+                if if_none_match and self._etag_matches(if_none_match, etag):
+                    return 304, b'', headers
+                return 200, data, headers
+        except ApiError as e:
+            return self._encode(e.status, {'error': e.message})
+        except ValueError as e:
+            return self._encode(400, {'error': str(e)})
+        except Exception as e:
+            return self._encode(500, {'error': f"服务器内部错误: {type(e).__name__}"})
+
+    @staticmethod
+    def _encode(status, payload):
+        """把响应数据序列化为JSON字节"""
+        data = json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+        return status, data, {}
+
+    def _make_etag(self, key):
+        """根据 (账本, 接口, 参数, 版本号) 生成ETag"""
+        digest = hashlib.sha1(repr(key[:3]).encode('utf-8')).hexdigest()[:16]
+        return f'"{self._etag_prefix}-{key[3]}-{digest}"'
+
+    @staticmethod
+    def _etag_matches(if_none_match, etag, wildcard=True):
+        """判断 If-None-Match 请求头是否包含当前ETag，wildcard为False时不把 "*" 视为匹配"""
+        candidates = [tag.strip() for tag in if_none_match.split(',')]
+        return (wildcard and '*' in candidates) or any(tag.removeprefix('W/') == etag for tag in candidates)
+
+    def _match_route(self, method, path):
+        """根据方法和路径找到处理函数"""
+        parts = [p for p in path.split('/') if p]
+        record_id = None
+        if len(parts) == 2 and parts[0] == 'records':
+            try:
+                record_id = int(parts[1])
+            except ValueError:
+                raise ApiError(404, f"找不到接口: {path}")
+            key = 'records/<id>'
+        elif len(parts) == 1:
+            key = parts[0]
+        else:
+            raise ApiError(404, f"找不到接口: {path}")
+
+        route = self._routes.get((method, key))
+        if route is None:
+            if any(k == key for _, k in self._routes):
+                raise ApiError(405, f"不支持的请求方法: {method}")
+            raise ApiError(404, f"找不到接口: {path}")
+        return route, record_id
+
+    def _list_ledgers(self, account_model, prediction_model, params, body, record_id):
+        return 200, {'ledgers': self.registry.list_ledgers()}
+
+    def _query_records(self, account_model, prediction_model, params, body, record_id):
+        filters = {key: self._str_param(params, key) for key in ('start_date', 'end_date', 'type', 'category', 'keyword')
+                   if self._str_param(params, key)}
+        page = account_model.get_records_page(
+            self._str_param(params, 'cursor') or None,
+            limit=self._int_param(params, 'limit', 50, self.MAX_LIMIT),
+            order_by=self._str_param(params, 'order_by', 'date'),
+            filters=filters)
+        return 200, page
+
+    def _get_record(self, account_model, prediction_model, params, body, record_id):
+        record = account_model.get_record(record_id)
+        if record is None:
+            raise ApiError(404, f"找不到记录: {record_id}")
+        return 200, {'record': record}
+
+    def _add_record(self, account_model, prediction_model, params, body, record_id):
+        amount, record_type, date, description, category = self._parse_record(body)
+        success, record = account_model.add_record(amount, record_type, date, description, category)
+        if not success:
+            raise ApiError(500, "记录保存失败")
+        return 201, {'record': record}
+
+    def _delete_record(self, account_model, prediction_model, params, body, record_id):
+        success, record = account_model.delete_record(record_id, self._str_param(params, 'reason', ''))
+        if record is None:
+            raise ApiError(404, f"找不到记录: {record_id}")
+        if not success:
+            raise ApiError(500, "记录保存失败")
+        return 200, {'record': record}
+
+    def _summary(self, account_model, prediction_model, params, body, record_id):
+        records = None
+        start_date = self._str_param(params, 'start_date')
+        end_date = self._str_param(params, 'end_date')
+        if start_date or end_date:
+            records = account_model.get_records_by_date_range(start_date, end_date)
+        summary = account_model.get_incomes_and_expenses(records)
+        summary['record_count'] = len(records) if records is not None else len(account_model.get_all_records())
+        return 200, summary
+
+    def _predict(self, account_model, prediction_model, params, body, record_id):
+        days_ahead = self._int_param(params, 'days', 30, self.MAX_DAYS)
+        start_date = self._str_param(params, 'start_date')
+        end_date = self._str_param(params, 'end_date')
+        if start_date and end_date:
+            prediction = prediction_model.predict_future_by_time_range(start_date, end_date, days_ahead)
+        else:
+            prediction = prediction_model.predict_future(days_ahead=days_ahead, engine=self._str_param(params, 'engine') or None,
+                                                         recurring=self._bool_param(params, 'recurring'))
+        if prediction is None:
+            raise ApiError(422, "数据量不足，无法进行预测")
+        return 200, prediction
+
+    def _predict_by_category(self, account_model, prediction_model, params, body, record_id):
+        records = None
+        start_date = self._str_param(params, 'start_date')
+        end_date = self._str_param(params, 'end_date')
+        if start_date or end_date:
+            records = account_model.get_records_by_date_range(start_date, end_date)
+        prediction = prediction_model.predict_by_category(self._int_param(params, 'days', 30, self.MAX_DAYS), records,
+                                                          engine=self._str_param(params, 'engine') or None)
+        if prediction is None:
+            raise ApiError(422, "暂无收支记录，无法按分类预测")
+        return 200, prediction
+
+    def _profile(self, account_model, prediction_model, params, body, record_id):
+        profile = prediction_model.get_economic_profile()
+        if profile is None:
+            raise ApiError(422, "暂无足够数据生成经济画像")
+        return 200, profile
+
+    def _recurring(self, account_model, prediction_model, params, body, record_id):
+        return 200, {'schedules': prediction_model.get_recurring_schedules(self._bool_param(params, 'active'))}
+
+    def _indicators(self, account_model, prediction_model, params, body, record_id):
+        windows = self._str_param(params, 'windows') or '1,3,6,12'
+        try:
+            windows = [int(window) for window in str(windows).split(',') if window.strip()]
+        except ValueError:
+            raise ValueError("参数 windows 必须是逗号分隔的整数")
+        series = prediction_model.get_indicator_series(windows)
+        if series is None:
+            raise ApiError(422, "暂无足够数据生成经济指标序列")
+        return 200, series
+
+    def _anomalies(self, account_model, prediction_model, params, body, record_id):
+        limit = self._int_param(params, 'limit', None, self.MAX_LIMIT)
+        return 200, prediction_model.get_anomalies(limit)
+
+    def _scenarios(self, account_model, prediction_model, params, body, record_id):
+        """请求体为 {"levers": [{"category": "housing", "factor": 1.1}, ...], "days": 90,
+        可选 "factors": [[...], ...] 或 "grid": [[各调整项的候选倍数], ...]、"balance"、"curves"}"""
+        if not isinstance(body, dict) or not isinstance(body.get('levers'), list):
+            raise ValueError("请求体必须包含 levers 列表")
+        levers = body['levers']
+        if not all(isinstance(lever, dict) for lever in levers):
+            raise ValueError("每个调整项必须是JSON对象")
+        factors = body.get('factors')
+        grid = body.get('grid')
+        if grid is not None:
+            if not self._is_number_rows(grid) or len(grid) != len(levers):
+                raise ValueError("grid 必须为每个调整项给出候选倍数列表")
+            # 先按组合数检查上限，再生成全部组合
+            if math.prod(len(values) for values in grid) > self.MAX_SCENARIOS:
+                raise ValueError(f"单次情景模拟不能超过 {self.MAX_SCENARIOS} 个情景")
+            factors = scenario_grid(grid)
+        elif factors is not None:
+            if not self._is_number_rows(factors):
+                raise ValueError("factors 必须是由倍数列表组成的列表")
+            if len(factors) > self.MAX_SCENARIOS:
+                raise ValueError(f"单次情景模拟不能超过 {self.MAX_SCENARIOS} 个情景")
+        days_ahead = self._int_param(body, 'days', 90, self.MAX_DAYS)
+        scenario_count = 1 if factors is None else len(factors)
+        if scenario_count * days_ahead > self.MAX_SCENARIO_CELLS:
+            raise ValueError(f"情景数×预测天数不能超过 {self.MAX_SCENARIO_CELLS}")
+        balance = body.get('balance')
+        if balance is not None:
+            try:
+                balance = float(balance)
+            except (TypeError, ValueError):
+                raise ValueError("balance 必须是数字")
+        if prediction_model.project_cash_flows(days_ahead) is None:
+            raise ApiError(422, "数据量不足，无法进行情景模拟")
+        result = ScenarioEngine(prediction_model, days_ahead).simulate(levers, factors, balance)
+        scenarios = []
+        for i, row in enumerate(result['factors']):
+            scenario = {'factors': row, 'runway': int(result['runway'][i]) if result['runway'][i] > 0 else None,
+                        'min_balance': result['min_balance'][i], 'end_balance': result['end_balance'][i]}
+            if body.get('curves'):
+                scenario['balance'] = result['balance'][i]
+            scenarios.append(scenario)
+        return 200, {'start_date': result['start_date'], 'matched': result['matched'], 'scenarios': scenarios}
+
+    def _alerts(self, account_model, prediction_model, params, body, record_id):
+        engine = self._budget_engines.get(params.get('ledger', DEFAULT_LEDGER))
+        if engine is None:
+            return 200, {'active': [], 'events': []}
+        return 200, {'active': engine.active_alerts(today=self._str_param(params, 'today') or None),
+                     'events': list(engine.events)}
+
+    def _budget_engine(self, ledger, account_model, prediction_model):
+        """获取账本的预算规则引擎，账本被淘汰后重新加载时随之重建"""
+        engine = self._budget_engines.get(ledger)
+        if engine is None or engine.account_model is not account_model:
+            engine = BudgetEngine(account_model, prediction_model, self.budget_rules)
+            self._budget_engines[ledger] = engine
+        return engine
+
+    def _on_ledger_evicted(self, ledger, account_model):
+        """账本被淘汰时丢弃其预算规则引擎，避免引擎继续持有已关闭的账本"""
+        engine = self._budget_engines.get(ledger)
+        if engine is not None and engine.account_model is account_model:
+            del self._budget_engines[ledger]
+            engine.detach()
+
+    def _batch(self, account_model, prediction_model, params, body, record_id):
+        """按顺序执行一组操作，整批只加一次锁、只保存一次文件
+
+        请求体为 {"operations": [{"op": "add", "amount": ..., "type": ..., ...},
+                                  {"op": "delete", "id": 1, "reason": ...},
+                                  {"op": "query", "limit": 10, ...}, ...]}，
+        返回与操作一一对应的结果，单个操作失败不影响其余操作。
+        """
+        operations = body.get('operations') if isinstance(body, dict) else None
+        if not isinstance(operations, list):
+            raise ValueError("请求体必须包含 operations 列表")
+        if len(operations) > self.MAX_BATCH_OPERATIONS:
+            raise ValueError(f"单次批量操作不能超过 {self.MAX_BATCH_OPERATIONS} 个")
+
+        results = []
+        with account_model.batch():
+            for operation in operations:
+                results.append(self._run_batch_operation(account_model, prediction_model, operation))
+        if not account_model.flush():
+            return 500, {'error': "记录保存失败", 'results': results}
+        return 200, {'results': results}
+
+    def _run_batch_operation(self, account_model, prediction_model, operation):
+        """执行批量请求中的一个操作，返回 {'status', 'result'} 或 {'status', 'error'}"""
+        try:
+            if not isinstance(operation, dict):
+                raise ValueError("每个操作必须是JSON对象")
+            name = operation.get('op')
+            handler = self._batch_operations.get(name)
+            if handler is None:
+                raise ValueError(f"不支持的操作: {name}")
+            record_id = operation.get('id')
+            if name in ('get', 'delete') and (not isinstance(record_id, int) or isinstance(record_id, bool)):
+                raise ValueError(f"操作 {name} 需要整数 id")
+            params = {key: value for key, value in operation.items() if key not in ('op', 'id')}
+            status, payload = handler(account_model, prediction_model, params, operation, record_id)
+            return {'status': status, 'result': payload}
+        except ApiError as e:
+            return {'status': e.status, 'error': e.message}
+        except ValueError as e:
+            return {'status': 400, 'error': str(e)}
+        except Exception as e:
+            # 单个操作的意外错误同样只记录在该操作的结果中，其余操作照常执行并返回
+            return {'status': 500, 'error': f"服务器内部错误: {type(e).__name__}"}
+
+    @staticmethod
+    def _str_param(params, name, default=None):
+        """读取字符串参数（批量请求中的参数可能是任意JSON值）"""
+        value = params.get(name)
+        if value is None:
+            return default
+        if not isinstance(value, str):
+            raise ValueError(f"参数 {name} 必须是字符串")
+        return value
+
+    @staticmethod
+    def _bool_param(params, name):
+        """读取布尔参数（1/true/yes 为真）"""
+        return str(params.get(name, '')).lower() in ('1', 'true', 'yes')
+
+    @staticmethod
+    def _int_param(params, name, default, maximum=None):
+        """读取正整数参数，给出maximum时不能超过该值"""
+        value = params.get(name)
+        if value in (None, ''):
+            return default
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"参数 {name} 必须是整数")
+        if value <= 0:
+            raise ValueError(f"参数 {name} 必须大于0")
+        if maximum is not None and value > maximum:
+            raise ValueError(f"参数 {name} 不能超过 {maximum}")
+        return value
+
+    @staticmethod
+    def _is_number_rows(value):
+        """是否为非空的数字列表组成的列表"""
+        return isinstance(value, list) and all(
+            isinstance(row, list) and row and
+            all(isinstance(x, (int, float)) and not isinstance(x, bool) for x in row) for row in value)
+
+    @staticmethod
+    def _parse_record(body):
+        """校验新增记录的请求体"""
+        if not isinstance(body, dict):
+            raise ValueError("请求体必须是JSON对象")
+        amount = body.get('amount')
+        try:
+            # 按分取整后判断，'0.001' 之类四舍五入为0分的金额同样无效
+            valid = not isinstance(amount, bool) and to_cents(amount) > 0
+        except (TypeError, ValueError):
+            valid = False
+        if not valid:
+            raise ValueError("请输入大于0的有效金额")
+        record_type = body.get('type')
+        if record_type not in ('income', 'expense'):
+            raise ValueError("类型必须是 income 或 expense")
+        date = body.get('date') or datetime.now().strftime('%Y-%m-%d')
+        try:
+            datetime.strptime(date, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            raise ValueError("日期格式不正确，请使用YYYY-MM-DD格式")
+        category = body.get('category')
+        if category is not None and (not isinstance(category, str) or not category):
+            raise ValueError("分类必须是非空字符串")
+        return amount, record_type, date, str(body.get('description', '')), category
+
+    def _create_httpd(self):
+        """创建多线程HTTP服务，端口为0时由系统分配"""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+
+    def start(self):
+        """在后台线程中启动服务，返回实际监听的端口"""
+        self._create_httpd()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.port
+
+    def serve_forever(self):
+        """在当前线程中运行服务，直到被中断"""
+        self._create_httpd()
+        print(f"接口服务已启动: http://{self.host}:{self.port}")
+        try:
+            self._httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\n正在停止接口服务...")
+        finally:
+            self._httpd.server_close()
+            self.registry.close()
+
+    def shutdown(self):
+        """停止后台服务并保存所有账本"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.registry.close()
+
+def _make_handler(api):
+    """创建绑定到指定ApiServer的请求处理类"""
+
+    class RequestHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _dispatch(self, method):
+            url = urlparse(self.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            body = None
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+            except ValueError:
+                length = -1
+            if length < 0 or length > api.MAX_BODY_BYTES:
+                # 请求体未被读取，不能继续复用该连接
+                self.close_connection = True
+                status = 400 if length < 0 else 413
+                self._send(*api._encode(status, {'error': "请求体长度无效" if length < 0 else "请求体过大"}))
+                return
+            if length:
+                try:
+                    body = json.loads(self.rfile.read(length).decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    self._send(*api._encode(400, {'error': "请求体不是有效的JSON"}))
+                    return
+            self._send(*api.handle(method, url.path, params, body, self.headers.get('If-None-Match')))
+
+        def _send(self, status, data, headers):
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if status == 304:
+                # 304响应不带响应体
+                self.end_headers()
+                return
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._dispatch('GET')
+
+        def do_POST(self):
+            self._dispatch('POST')
+
+        def do_DELETE(self):
+            self._dispatch('DELETE')
+
+        def log_message(self, format, *args):
+            # 不在终端逐条打印访问日志
+            pass
+
+    return RequestHandler
@@ -9,6 +9,9 @@ import os
 plt.rcParams['font.sans-serif'] = ['SimHei']  # 用来正常显示中文标签
 plt.rcParams['axes.unicode_minus'] = False  # 用来正常显示负号
 
+# 记录表格每页加载的条数，滚动到底部或点击“加载更多”时再加载下一页
+RECORDS_PAGE_SIZE = 200
+
 class MainView(tk.Tk):
     def __init__(self, account_model, prediction_model):
         super().__init__()
@@ -125,14 +128,20 @@ class EditView(tk.Toplevel):
         tip_label.pack(side=tk.LEFT, padx=10)
     
     def show_records(self):
-        """显示所有记录"""
+        """显示记录表格，按页加载记录"""
+        # 重新显示时先移除旧表格，避免重复堆叠
+        if getattr(self, 'records_frame', None) is not None:
+            self.records_frame.destroy()
+        
         # 创建记录显示框架
         records_frame = tk.Frame(self, bg="#f0f0f0")
         records_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        self.records_frame = records_frame
         
         # 创建表格
         columns = ("id", "amount", "type", "date", "description", "created_at")
         tree = ttk.Treeview(records_frame, columns=columns, show="headings")
+        self.records_tree = tree
         
         # 设置列标题
         tree.heading("id", text="ID")
@@ -150,16 +159,39 @@ class EditView(tk.Toplevel):
         tree.column("description", width=200)
         tree.column("created_at", width=120)
         
-        # 添加滚动条
+        # 添加滚动条，滚动到底部时自动加载下一页
         scrollbar = ttk.Scrollbar(records_frame, orient=tk.VERTICAL, command=tree.yview)
-        tree['yscrollcommand'] = scrollbar.set
         
-        # 填充数据
-        records = self.account_model.get_all_records()
-        for record in records:
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            if float(first) > 0 and float(last) >= 1.0 and self.records_cursor is not None:
+                # 推迟到滚动处理结束后再插入行
+                self.after_idle(self.load_more_records)
+        
+        tree['yscrollcommand'] = on_scroll
+        
+        # 加载更多按钮
+        self.load_more_button = tk.Button(records_frame, text="加载更多", command=self.load_more_records)
+        
+        # 布局
+        self.load_more_button.pack(side=tk.BOTTOM, pady=5)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # 填充第一页数据
+        self.records_cursor = None
+        self.load_more_records()
+    
+    def load_more_records(self):
+        """按游标加载下一页记录并追加到表格末尾"""
+        if self.records_tree.get_children() and self.records_cursor is None:
+            return
+        page = self.account_model.get_records_page(self.records_cursor, RECORDS_PAGE_SIZE, order_by='id')
+        self.records_cursor = page['next_cursor']
+        for record in page['records']:
             # 转换类型显示
             type_text = "收入" if record['type'] == 'income' else "支出"
-            tree.insert("", tk.END, values=(
+            self.records_tree.insert("", tk.END, values=(
                 record['id'],
                 record['amount'],
                 type_text,
@@ -167,10 +199,7 @@ class EditView(tk.Toplevel):
                 record['description'],
                 record['created_at']
             ))
-        
-        # 布局
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.load_more_button.config(state=tk.NORMAL if self.records_cursor is not None else tk.DISABLED)
     
     def show_add_dialog(self):
         """显示新增记录对话框"""
@@ -365,6 +394,9 @@ class PredictView(tk.Toplevel):
             messagebox.showinfo("提示", "数据量不足，无法进行预测")
             return
         
+        # 预测区间（固定随机种子，重复预测时图表保持一致）
+        intervals = self.prediction_model.predict_intervals(days_ahead=30, records=records, seed=0)
+        
         # 创建图表
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(8, 6))
         
@@ -373,6 +405,9 @@ class PredictView(tk.Toplevel):
         
         # 收入预测图
         ax1.plot(future_dates, prediction['income_prediction'], 'b-', label='预测收入')
+        if intervals:
+            ax1.fill_between(future_dates, intervals['income']['p10'], intervals['income']['p90'],
+                             color='b', alpha=0.15, label='P10-P90区间')
         ax1.set_title('未来30天收入预测')
         ax1.set_xlabel('日期')
         ax1.set_ylabel('金额')
@@ -382,6 +417,9 @@ class PredictView(tk.Toplevel):
         
         # 支出预测图
         ax2.plot(future_dates, prediction['expense_prediction'], 'r-', label='预测支出')
+        if intervals:
+            ax2.fill_between(future_dates, intervals['expense']['p10'], intervals['expense']['p90'],
+                             color='r', alpha=0.15, label='P10-P90区间')
         ax2.set_title('未来30天支出预测')
         ax2.set_xlabel('日期')
         ax2.set_ylabel('金额')
@@ -410,6 +448,12 @@ class PredictView(tk.Toplevel):
                 bg="#f0f0f0", fg="red").pack(side=tk.LEFT, padx=20)
         tk.Label(summary_frame, text=f"预测净余额: ¥{net_amount:.2f}", font=("SimHei", 12),
                 bg="#f0f0f0", fg="green" if net_amount >= 0 else "red").pack(side=tk.LEFT, padx=20)
+        
+        if intervals:
+            net_total = intervals['total']['net']
+            tk.Label(self.result_frame,
+                     text=f"净余额区间: P10 ¥{net_total['p10']:.2f} / P50 ¥{net_total['p50']:.2f} / P90 ¥{net_total['p90']:.2f}",
+                     font=("SimHei", 11), bg="#f0f0f0", fg="#7f8c8d").pack(pady=(0, 10))
 
 class ProfileView(tk.Toplevel):
     def __init__(self, parent, account_model, prediction_model):
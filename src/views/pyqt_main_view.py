@@ -5,6 +5,9 @@ from PySide6.QtCore import Qt, QDate, QSize, QTimer, QPropertyAnimation, QEasing
 from PySide6.QtGui import QFont, QColor, QPalette, QIcon, QBrush, QLinearGradient, QPainter
 import datetime
 
+# 记录表格每页加载的条数，滚动到底部或点击“加载更多”时再加载下一页
+RECORDS_PAGE_SIZE = 200
+
 # 创建渐变背景组件类
 class GradientBackgroundWidget(QWidget):
     def __init__(self, parent=None):
@@ -13,10 +16,12 @@ class GradientBackgroundWidget(QWidget):
         self.setStyleSheet("background-color: #f0f5fa;")
 
 class PyQtMainView(QMainWindow):
-    def __init__(self, account_model, prediction_model):
+    def __init__(self, account_model, prediction_model, budget_engine=None):
         super().__init__()
         self.account_model = account_model
         self.prediction_model = prediction_model
+        # 可选的预算规则引擎，报警显示在状态栏
+        self.budget_engine = budget_engine
         
         # 设置窗口标题和大小
         self.setWindowTitle("智能记账本")
@@ -69,6 +74,14 @@ class PyQtMainView(QMainWindow):
         self.statusBar().setObjectName("status_bar")
         self.statusBar().showMessage("就绪")
         
+        # 预算报警常驻显示在状态栏右侧
+        if self.budget_engine is not None:
+            self.alert_label = QLabel()
+            self.alert_label.setObjectName("alert_label")
+            self.statusBar().addPermanentWidget(self.alert_label)
+            self.budget_engine.add_alert_listener(self.on_budget_alert)
+            self.update_alert_label()
+        
         # 添加窗口出现动画
         self.setWindowOpacity(0)
         self.animation = QPropertyAnimation(self, b"windowOpacity")
@@ -83,6 +96,23 @@ class PyQtMainView(QMainWindow):
         # 创建初始化数据加载的延迟调用
         QTimer.singleShot(100, self.load_records)
     
+    def on_budget_alert(self, event):
+        """预算规则触发或恢复时刷新状态栏"""
+        if event['event'] == 'triggered':
+            self.statusBar().showMessage(f"预算提醒: {event['message']}", 10000)
+        self.update_alert_label()
+    
+    def update_alert_label(self):
+        """在状态栏显示当前周期内生效的预算报警"""
+        alerts = self.budget_engine.active_alerts(today=datetime.date.today().isoformat())
+        if not alerts:
+            self.alert_label.setText("")
+            self.alert_label.setToolTip("")
+            return
+        text = alerts[0]['message'] if len(alerts) == 1 else f"{len(alerts)} 条预算提醒: {alerts[0]['message']}"
+        self.alert_label.setText(text)
+        self.alert_label.setToolTip("\n".join(alert['message'] for alert in alerts))
+    
     def apply_styles(self):
         """应用全局样式表"""
         style_sheet = """
@@ -256,6 +286,12 @@ class PyQtMainView(QMainWindow):
             color: #666666;
         }
         
+        /* 预算报警标签样式 */
+        QLabel#alert_label {
+            color: #d32f2f;
+            font-weight: 600;
+        }
+        
         /* 统计标签样式 */
         QLabel#stat_label {
             font-size: 14px;
@@ -346,7 +382,14 @@ class PyQtMainView(QMainWindow):
         
         buttons_layout.addLayout(search_layout)
         buttons_layout.addStretch()
+        self.load_more_button = QPushButton("加载更多")
+        self.load_more_button.setObjectName("refresh_button")
+        self.load_more_button.setMinimumHeight(36)
+        self.load_more_button.setEnabled(False)
+        self.load_more_button.clicked.connect(self.load_more_records)
+        
         buttons_layout.addWidget(self.refresh_button)
+        buttons_layout.addWidget(self.load_more_button)
         buttons_layout.addWidget(self.delete_button)
         buttons_layout.setSpacing(10)
         
@@ -377,6 +420,11 @@ class PyQtMainView(QMainWindow):
         # 设置表格行高
         self.records_table.verticalHeader().setDefaultSectionSize(36)
         
+        # 分页状态：滚动到底部时自动加载下一页
+        self.records_filters = None
+        self.records_cursor = None
+        self.records_table.verticalScrollBar().valueChanged.connect(self.on_records_scrolled)
+        
         records_layout.addWidget(self.records_table)
         
         self.tab_widget.addTab(records_widget, "记账记录")
@@ -644,96 +692,28 @@ class PyQtMainView(QMainWindow):
         self.tab_widget.addTab(prediction_widget, "收支预测")
     
     def load_records(self, search_keyword=None):
-        """加载记账记录到表格，支持搜索关键词过滤"""
+        """重新加载记账记录表格的第一页，支持搜索关键词过滤，统计信息覆盖全部匹配记录"""
         try:
             # 显示加载中状态
             self.statusBar().showMessage("正在加载记录...")
             
-            records = self.account_model.get_all_records()
-            
-            # 如果提供了搜索关键词，进行过滤
-            if search_keyword:
-                filtered_records = []
-                keyword = search_keyword.lower().strip()
-                for record in records:
-                    # 在描述、金额、日期等字段中搜索关键词
-                    if (keyword in str(record['description']).lower() or
-                        keyword in str(record['amount']) or
-                        keyword in record['date'] or
-                        keyword in record['created_at'] or
-                        (record['type'] == 'income' and '收入' in keyword) or
-                        (record['type'] == 'expense' and '支出' in keyword)):
-                        filtered_records.append(record)
-                records = filtered_records
+            # 在描述、分类、金额、日期等字段中搜索关键词
+            keyword = search_keyword.strip() if isinstance(search_keyword, str) else ''
+            self.records_filters = {'search': keyword} if keyword else None
+            self.records_cursor = None
             
             # 清空表格
             self.records_table.setRowCount(0)
             
-            # 添加数据并计算统计信息
-            total_income = 0.0
-            total_expense = 0.0
-            
-            if not records:
-                self.statusBar().showMessage("暂无记录")
-                # 更新统计信息
-                self.income_label.setText(f"总收入: ¥{total_income:.2f}")
-                self.expense_label.setText(f"总支出: ¥{total_expense:.2f}")
-                self.balance_label.setText(f"余额: ¥0.00")
-                self.balance_label.setStyleSheet("color: #1976d2;")
-                return
-            
-            for record in records:
-                row_position = self.records_table.rowCount()
-                self.records_table.insertRow(row_position)
-                
-                # 类型转换为中文
-                type_text = "收入" if record['type'] == 'income' else "支出"
-                
-                # 设置行数据
-                id_item = QTableWidgetItem(str(record['id']))
-                id_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.records_table.setItem(row_position, 0, id_item)
-                
-                # 为金额设置不同的颜色
-                amount_item = QTableWidgetItem(f"¥{record['amount']:.2f}")
-                if type_text == '收入':
-                    amount_item.setForeground(QColor(76, 175, 80))  # 绿色
-                    total_income += float(record['amount'])
-                else:
-                    amount_item.setForeground(QColor(244, 67, 54))  # 红色
-                    total_expense += float(record['amount'])
-                
-                amount_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                self.records_table.setItem(row_position, 1, amount_item)
-                
-                # 为类型设置不同的颜色和背景
-                type_item = QTableWidgetItem(type_text)
-                if type_text == '收入':
-                    type_item.setForeground(QColor(76, 175, 80))
-                    type_item.setBackground(QColor(241, 248, 233))
-                else:
-                    type_item.setForeground(QColor(244, 67, 54))
-                    type_item.setBackground(QColor(253, 236, 234))
-                type_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.records_table.setItem(row_position, 2, type_item)
-                
-                # 设置其他列
-                date_item = QTableWidgetItem(record['date'])
-                date_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.records_table.setItem(row_position, 3, date_item)
-                
-                desc_item = QTableWidgetItem(record['description'])
-                desc_item.setToolTip(record['description'])  # 添加工具提示
-                self.records_table.setItem(row_position, 4, desc_item)
-                
-                time_item = QTableWidgetItem(record['created_at'])
-                time_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.records_table.setItem(row_position, 5, time_item)
-            
-            # 更新统计信息
-            balance = total_income - total_expense
-            self.income_label.setText(f"总收入: ¥{total_income:,.2f}")
-            self.expense_label.setText(f"总支出: ¥{total_expense:,.2f}")
+            # 统计信息由模型按分精确累加，无需把全部记录放进表格
+            if self.records_filters:
+                totals = self.account_model.get_incomes_and_expenses(
+                    self.account_model.iter_records(self.records_filters, order=None))
+            else:
+                totals = self.account_model.get_incomes_and_expenses()
+            balance = totals['balance']
+            self.income_label.setText(f"总收入: ¥{totals['total_income']:,.2f}")
+            self.expense_label.setText(f"总支出: ¥{totals['total_expense']:,.2f}")
             self.balance_label.setText(f"余额: ¥{balance:,.2f}")
             
             # 根据余额设置不同颜色和样式
@@ -742,12 +722,91 @@ class PyQtMainView(QMainWindow):
             else:
                 self.balance_label.setStyleSheet("color: #f44336; font-weight: 600; font-size: 16px;")
             
-            self.statusBar().showMessage(f"已加载 {len(records)} 条记录")
+            self.load_more_records()
             
         except Exception as e:
             QMessageBox.critical(self, "错误", f"加载记录失败: {str(e)}")
             self.statusBar().showMessage("加载记录失败")
     
+    def load_more_records(self):
+        """按游标加载下一页记录并追加到表格末尾"""
+        try:
+            page = self.account_model.get_records_page(self.records_cursor, RECORDS_PAGE_SIZE,
+                                                       order_by='id', filters=self.records_filters)
+            self.records_cursor = page['next_cursor']
+            self.load_more_button.setEnabled(self.records_cursor is not None)
+            
+            # 追加行时暂停排序，避免新行插入位置错乱
+            sorting = self.records_table.isSortingEnabled()
+            self.records_table.setSortingEnabled(False)
+            for record in page['records']:
+                self.append_record_row(record)
+            self.records_table.setSortingEnabled(sorting)
+            
+            loaded = self.records_table.rowCount()
+            if not loaded:
+                self.statusBar().showMessage("暂无记录")
+            elif self.records_cursor is not None:
+                self.statusBar().showMessage(f"已加载 {loaded} 条记录，滚动到底部或点击“加载更多”继续加载")
+            else:
+                self.statusBar().showMessage(f"已加载全部 {loaded} 条记录")
+            
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"加载记录失败: {str(e)}")
+            self.statusBar().showMessage("加载记录失败")
+    
+    def on_records_scrolled(self, value):
+        """表格滚动到底部且还有下一页时自动加载"""
+        if self.records_cursor is not None and value >= self.records_table.verticalScrollBar().maximum():
+            self.load_more_records()
+    
+    def append_record_row(self, record):
+        """把一条记录追加为表格的一行"""
+        row_position = self.records_table.rowCount()
+        self.records_table.insertRow(row_position)
+        
+        # 类型转换为中文
+        type_text = "收入" if record['type'] == 'income' else "支出"
+        
+        # 设置行数据
+        id_item = QTableWidgetItem(str(record['id']))
+        id_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.records_table.setItem(row_position, 0, id_item)
+        
+        # 为金额设置不同的颜色
+        amount_item = QTableWidgetItem(f"¥{record['amount']:.2f}")
+        if type_text == '收入':
+            amount_item.setForeground(QColor(76, 175, 80))  # 绿色
+        else:
+            amount_item.setForeground(QColor(244, 67, 54))  # 红色
+        
+        amount_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        self.records_table.setItem(row_position, 1, amount_item)
+        
+        # 为类型设置不同的颜色和背景
+        type_item = QTableWidgetItem(type_text)
+        if type_text == '收入':
+            type_item.setForeground(QColor(76, 175, 80))
+            type_item.setBackground(QColor(241, 248, 233))
+        else:
+            type_item.setForeground(QColor(244, 67, 54))
+            type_item.setBackground(QColor(253, 236, 234))
+        type_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.records_table.setItem(row_position, 2, type_item)
+        
+        # 设置其他列
+        date_item = QTableWidgetItem(record['date'])
+        date_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.records_table.setItem(row_position, 3, date_item)
+        
+        desc_item = QTableWidgetItem(record['description'])
+        desc_item.setToolTip(record['description'])  # 添加工具提示
+        self.records_table.setItem(row_position, 4, desc_item)
+        
+        time_item = QTableWidgetItem(record['created_at'])
+        time_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.records_table.setItem(row_position, 5, time_item)
+    
     def add_new_record(self):
         """添加新记录"""
         try:
@@ -900,6 +959,17 @@ class PyQtMainView(QMainWindow):
             prediction_text += f"预计总支出: {total_predicted_expense:.2f} 元\n"
             prediction_text += f"预计净收支: {total_predicted_net:.2f} 元\n\n"
             
+            # 以上面的日均值预测为中心、按区间内逐日收支波动自助抽样的预测区间
+            records = self.account_model.get_records_by_date_range(start_date, end_date)
+            point = (prediction['income_prediction'], prediction['expense_prediction'])
+            intervals = self.prediction_model.predict_intervals(days_ahead, records=records, seed=0, point=point)
+            if intervals:
+                prediction_text += "===== 预测区间（P10 / P50 / P90） =====\n\n"
+                for key, label in (('income', '总收入'), ('expense', '总支出'), ('net', '净收支')):
+                    total = intervals['total'][key]
+                    prediction_text += f"{label}: {total['p10']:.2f} / {total['p50']:.2f} / {total['p90']:.2f} 元\n"
+                prediction_text += "\n"
+            
             # 添加建议
             if total_predicted_net < 0:
                 prediction_text += "建议: 预计未来将出现收支不平衡，建议适当控制支出。\n"
@@ -0,0 +1,174 @@
+import pytest
+import os
+import json
+import random
+from decimal import Decimal
+import numpy as np
+from src.models.account_model import AccountModel, MAX_CENTS, to_cents, from_cents
+
+class TestAmountCents:
+    """测试金额以分为单位存储及精确汇总"""
+
+    # 长周期精确性测试的随机记录数
+    LARGE_RECORD_COUNT = 1_000_000
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        # 使用临时数据文件
+        self.temp_data_file = 'data/test_amount_cents_records.json'
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+        self.account_model = AccountModel(self.temp_data_file)
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+
+    def _generate_records(self, count, seed):
+        """生成随机记录，返回记录列表及以Decimal计算的参考收支总额"""
+        rng = np.random.default_rng(seed)
+        cents = rng.integers(1, 10_000_000, size=count)
+        is_income = rng.random(count) < 0.3
+        days = rng.integers(0, 365 * 30, size=count)
+        dates = (np.datetime64('2000-01-01') + days).astype(str)
+
+        records = []
+        income_ref = Decimal(0)
+        expense_ref = Decimal(0)
+        for i in range(count):
+            # 以两位小数的字符串形式模拟用户录入的金额
+            text = f"{cents[i] // 100}.{cents[i] % 100:02d}"
+            if is_income[i]:
+                income_ref += Decimal(text)
+            else:
+                expense_ref += Decimal(text)
+            records.append({
+                'id': i + 1,
+                'amount': float(text),
+                'type': 'income' if is_income[i] else 'expense',
+                'date': dates[i],
+                'description': '',
+                'category': 'other',
+                'created_at': '2024-01-01 00:00:00',
+            })
+        return records, income_ref, expense_ref
+
+    def test_to_cents(self):
+        """测试金额转换"""
+        assert to_cents(19.99) == 1999
+        assert to_cents('0.1') == 10
+        assert to_cents(0.1 + 0.2) == 30
+        assert to_cents(100) == 10000
+        assert to_cents(2.675) == 268
+        assert to_cents('1.005') == 101
+        assert from_cents(1999) == 19.99
+        with pytest.raises(ValueError):
+            to_cents('abc')
+        with pytest.raises(ValueError):
+            to_cents(float('nan'))
+        # 超出范围的金额（含Decimal精度以外的写法）统一抛出ValueError
+        assert to_cents(MAX_CENTS // 100) == MAX_CENTS
+        for amount in ['1e30', '1e20', '-1e20', 10 ** 20, '100000000000000000000', 1e20]:
+            with pytest.raises(ValueError):
+                to_cents(amount)
+
+    def test_add_record_stores_cents(self):
+        """测试新增记录以分为单位保存"""
+        success, record = self.account_model.add_record(19.99, 'expense', '2024-01-01', '餐饮')
+        assert success is True
+        assert record['amount_cents'] == 1999
+        assert record['amount'] == 19.99
+        with open(self.temp_data_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        assert data[0]['amount_cents'] == 1999
+        # 非字符串分类被拒绝，不留下半条记录
+        with pytest.raises(ValueError):
+            self.account_model.add_record(1, 'expense', '2024-01-01', '餐饮', ['a'])
+        assert len(self.account_model.get_all_records()) == 1
+        assert self.account_model.add_record(1, 'expense', '2024-01-01', '餐饮')[1]['id'] == 2
+
+    def test_totals_follow_add_and_delete(self):
+        """测试增删记录后汇总保持精确"""
+        for _ in range(10):
+            self.account_model.add_record(0.1, 'income', '2024-01-01', '利息')
+        _, record = self.account_model.add_record(0.2, 'expense', '2024-01-02', '零食')
+        summary = self.account_model.get_incomes_and_expenses()
+        assert summary['total_income'] == 1.0
+        assert summary['balance'] == 0.8
+        self.account_model.delete_record(record['id'])
+        assert self.account_model.get_incomes_and_expenses()['total_expense'] == 0
+
+    def test_legacy_records_without_cents(self):
+        """测试加载没有amount_cents字段的旧数据"""
+        self.account_model.records = [
+            {'id': 1, 'amount': 0.1, 'type': 'income', 'date': '2024-01-01', 'description': ''},
+            {'id': 2, 'amount': 0.2, 'type': 'income', 'date': '2024-01-02', 'description': ''},
+        ]
+        assert self.account_model.get_incomes_and_expenses()['total_income'] == 0.3
+        arrays = self.account_model.get_record_arrays()
+        assert arrays['amount_cents'].dtype == np.int64
+        assert arrays['amount_cents'].tolist() == [10, 20]
+
+    def test_invalid_legacy_records_quarantined(self):
+        """测试旧数据中无法解析的记录被隔离，账本其余记录照常使用，保存时隔离记录原样保留"""
+        records = [
+            {'id': 1, 'amount': 10, 'type': 'income', 'date': '2024-01-01', 'description': ''},
+            {'id': 2, 'amount': 'abc', 'type': 'expense', 'date': '2024-01-02', 'description': ''},
+            {'id': 3, 'amount': '1e30', 'type': 'expense', 'date': '2024-01-02', 'description': ''},
+            {'id': 4, 'amount': 5, 'type': 'expense', 'date': '2024-13-45', 'description': ''},
+            {'id': 7, 'amount': 5, 'type': 'expense', 'description': ''},
+        ]
+        with open(self.temp_data_file, 'w', encoding='utf-8') as f:
+            json.dump(records, f)
+        account_model = AccountModel(self.temp_data_file)
+        assert [r['id'] for r in account_model.get_all_records()] == [1]
+        assert [r['id'] for r in account_model.quarantined_records] == [2, 3, 4, 7]
+        assert account_model.get_record_arrays()['amount_cents'].tolist() == [1000]
+        # 新记录的ID不与隔离记录重复
+        _, record = account_model.add_record(1, 'expense', '2024-01-03', '午餐')
+        assert record['id'] == 8
+        with open(self.temp_data_file, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        assert sorted(r['id'] for r in saved) == [1, 2, 3, 4, 7, 8]
+        assert [r['amount'] for r in saved if r['id'] == 2] == ['abc']
+
+    def test_long_horizon_totals_exact(self):
+        """测试百万条随机记录的长期汇总精确到分"""
+        records, income_ref, expense_ref = self._generate_records(self.LARGE_RECORD_COUNT, seed=20240101)
+
+        # 按记录列表汇总
+        summary = self.account_model.get_incomes_and_expenses(records)
+        assert Decimal(str(summary['total_income'])) == income_ref
+        assert Decimal(str(summary['total_expense'])) == expense_ref
+
+        # 载入模型后的累计值及int64向量化汇总
+        self.account_model.records = records
+        summary = self.account_model.get_incomes_and_expenses()
+        assert Decimal(str(summary['total_income'])) == income_ref
+        assert Decimal(str(summary['total_expense'])) == expense_ref
+        assert Decimal(str(summary['balance'])) == income_ref - expense_ref
+
+        arrays = self.account_model.get_record_arrays()
+        income_cents = int(arrays['amount_cents'][arrays['is_income']].sum())
+        expense_cents = int(arrays['amount_cents'][arrays['is_expense']].sum())
+        assert Decimal(income_cents) / 100 == income_ref
+        assert Decimal(expense_cents) / 100 == expense_ref
+
+    def test_totals_exact_after_random_deletes(self):
+        """测试随机删除后累计值与参考值一致"""
+        records, _, _ = self._generate_records(20_000, seed=7)
+        self.account_model.records = records
+        rng = random.Random(7)
+        # 批量删除只在结束时保存一次
+        with self.account_model.batch():
+            for record_id in rng.sample(range(1, 20_001), 500):
+                success, record = self.account_model.delete_record(record_id)
+                assert success is True and record['id'] == record_id
+
+        remaining = self.account_model.get_all_records()
+        income_ref = sum(Decimal(f"{r['amount']:.2f}") for r in remaining if r['type'] == 'income')
+        expense_ref = sum(Decimal(f"{r['amount']:.2f}") for r in remaining if r['type'] == 'expense')
+        summary = self.account_model.get_incomes_and_expenses()
+        assert Decimal(str(summary['total_income'])) == income_ref
+        assert Decimal(str(summary['total_expense'])) == expense_ref
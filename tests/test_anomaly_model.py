@@ -0,0 +1,118 @@
+import pytest
+import os
+import numpy as np
+from src.models.account_model import AccountModel
+from src.models.anomaly_model import AnomalyDetector, _observe, grouped_ewm, linear_scan
+from src.models.prediction_model import PredictionModel
+
+class TestAnomalyDetector:
+    """测试支出异常检测"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.temp_data_file = 'data/test_anomaly_records.json'
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+        self.account_model = AccountModel(self.temp_data_file)
+        self.prediction_model = PredictionModel(self.account_model)
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+
+    def _add_daily_groceries(self, days, seed=0):
+        """从2024-01-01起每天一笔买菜支出，金额在100元左右"""
+        rng = np.random.default_rng(seed)
+        with self.account_model.batch():
+            for offset in range(days):
+                date = str(np.datetime64('2024-01-01') + offset)
+                self.account_model.add_record(round(float(rng.uniform(80, 120)), 2), 'expense', date, '买菜', 'food')
+
+    def test_linear_scan(self):
+        """测试倍增扫描与逐项递推一致"""
+        rng = np.random.default_rng(1)
+        a = rng.uniform(0, 1, size=37)
+        a[[0, 10]] = 0
+        b = rng.normal(size=37)
+        expected = []
+        y = 0.0
+        for a_t, b_t in zip(a, b):
+            y = a_t * y + b_t
+            expected.append(y)
+        assert linear_scan(a, b) == pytest.approx(expected)
+
+    def test_grouped_scan_matches_single_updates(self):
+        """测试分组向量化计算与逐条更新结果一致"""
+        rng = np.random.default_rng(1)
+        codes = rng.integers(0, 3, size=80)
+        values = rng.normal(size=80)
+        prior, final = grouped_ewm(codes, values, 0.05, groups=4)
+        states = {group: [0.0, 0.0, 0] for group in range(4)}
+        for i, (group, x) in enumerate(zip(codes, values)):
+            state = states[group]
+            assert (prior[0][i], prior[1][i], prior[2][i]) == pytest.approx(tuple(state))
+            _observe(state, x, 0.05)
+        for group in range(4):
+            assert (final[0][group], final[1][group], final[2][group]) == pytest.approx(tuple(states[group]))
+
+    def test_flags_large_transaction(self):
+        """测试远高于分类基准金额的单笔支出被标记"""
+        self._add_daily_groceries(40)
+        assert self.prediction_model.get_anomalies()['transactions'] == []
+        _, record = self.account_model.add_record(500, 'expense', '2024-02-10', '超市买菜', 'food')
+        score = self.prediction_model.get_record_anomaly(record['id'])
+        assert score['flagged'] and score['ratio'] == pytest.approx(5, rel=0.2)
+        assert score['baseline'] == pytest.approx(100, rel=0.2)
+        anomalies = self.prediction_model.get_anomalies()
+        assert [entry['id'] for entry in anomalies['transactions']] == [record['id']]
+        # 收入记录没有支出异常分数
+        _, income = self.account_model.add_record(9000, 'income', '2024-02-10', '工资')
+        assert self.prediction_model.get_record_anomaly(income['id']) is None
+
+    def test_flags_unusual_day(self):
+        """测试支出合计远高于同星期几水平的日期被标记，并在之后的日期出现时结算"""
+        self._add_daily_groceries(70)
+        self.prediction_model.get_anomalies()
+        self.account_model.add_record(3000, 'expense', '2024-03-11', '购物', 'shopping')
+        assert self.prediction_model.get_day_anomaly('2024-03-11')['flagged']
+        self.account_model.add_record(100, 'expense', '2024-03-12', '买菜', 'food')
+        days = self.prediction_model.get_anomalies()['days']
+        assert [entry['date'] for entry in days] == ['2024-03-11']
+        assert days[0]['total'] == pytest.approx(3000)
+        assert not self.prediction_model.get_day_anomaly('2024-03-12')['flagged']
+        assert self.prediction_model.get_day_anomaly('2023-01-01') is None
+
+    def test_incremental_matches_rebuild(self):
+        """测试按日期顺序增量添加的结果与整体重新计算一致"""
+        self.prediction_model.get_anomalies()
+        self._add_daily_groceries(30, seed=2)
+        self.account_model.add_record(800, 'expense', '2024-01-31', '聚餐', 'food')
+        self.account_model.add_record(60, 'expense', '2024-02-01', '地铁', 'transport')
+        detector = self.prediction_model.anomaly_detector
+        assert not detector.stale
+        fresh = AnomalyDetector(self.account_model)
+        fresh.rebuild()
+        for record in self.account_model.get_all_records():
+            assert detector.record_score(record['id']) == pytest.approx(fresh.record_score(record['id']))
+        for offset in range(32):
+            day = int(np.datetime64('2024-01-01', 'D').astype(np.int64)) + offset
+            assert detector.day_score(day) == pytest.approx(fresh.day_score(day))
+
+    def test_delete_and_backfill_trigger_rebuild(self):
+        """测试删除记录或补录更早日期后重新计算"""
+        self._add_daily_groceries(20)
+        self.prediction_model.get_anomalies()
+        detector = self.prediction_model.anomaly_detector
+        self.account_model.add_record(50, 'expense', '2024-01-05', '买菜', 'food')
+        assert detector.stale
+        self.prediction_model.get_anomalies()
+        self.account_model.delete_record(1)
+        assert detector.stale
+        assert self.prediction_model.get_record_anomaly(1) is None
+        assert not detector.stale
+
+    def test_empty_ledger(self):
+        """测试没有记录时的查询"""
+        assert self.prediction_model.get_anomalies() == {'transactions': [], 'days': []}
+        assert self.prediction_model.get_day_anomaly('2024-01-01') is None
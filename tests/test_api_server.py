@@ -0,0 +1,366 @@
+import pytest
+import os
+import json
+import shutil
+import threading
+from http.client import HTTPConnection
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+from src.models.ledger_registry import LedgerRegistry
+from src.views.api_server import ApiServer
+
+class TestApiServer:
+    """测试本地HTTP/JSON接口服务"""
+
+    def setup_method(self):
+        """每个测试方法执行前启动服务"""
+        self.ledger_dir = 'data/test_api_ledgers'
+        if os.path.exists(self.ledger_dir):
+            shutil.rmtree(self.ledger_dir)
+        registry = LedgerRegistry(ledger_dir=self.ledger_dir,
+                                  ledgers={'default': os.path.join(self.ledger_dir, 'default.json')})
+        self.server = ApiServer(registry, port=0)
+        self.base_url = f"http://127.0.0.1:{self.server.start()}"
+
+    def teardown_method(self):
+        """每个测试方法执行后停止服务并清理"""
+        self.server.shutdown()
+        if os.path.exists(self.ledger_dir):
+            shutil.rmtree(self.ledger_dir)
+
+    def _request(self, method, path, body=None):
+        """发送请求，返回 (状态码, JSON响应)"""
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = Request(self.base_url + path, data=data, method=method,
+                          headers={'Content-Type': 'application/json'})
+        try:
+            with urlopen(request) as response:
+                return response.status, json.loads(response.read().decode('utf-8'))
+        except HTTPError as e:
+            return e.code, json.loads(e.read().decode('utf-8'))
+
+    def _add_sufficient_records(self, ledger='default'):
+        """添加足够用于预测的记录"""
+        for month in range(1, 5):
+            self._request('POST', f'/records?ledger={ledger}',
+                          {'amount': 10000 + month * 500, 'type': 'income', 'date': f'2023-0{month}-01', 'description': '工资'})
+            self._request('POST', f'/records?ledger={ledger}',
+                          {'amount': 3000, 'type': 'expense', 'date': f'2023-0{month}-02', 'description': '房租'})
+            self._request('POST', f'/records?ledger={ledger}',
+                          {'amount': 1500, 'type': 'expense', 'date': f'2023-0{month}-03', 'description': '餐饮'})
+
+    def test_add_query_delete(self):
+        """测试新增、查询、删除记录"""
+        status, payload = self._request('POST', '/records',
+                                        {'amount': '19.99', 'type': 'expense', 'date': '2024-01-01', 'description': '午餐'})
+        assert status == 201
+        record = payload['record']
+        assert record['amount_cents'] == 1999
+        assert record['category'] == 'food'
+
+        status, payload = self._request('GET', f"/records/{record['id']}")
+        assert status == 200 and payload['record']['description'] == '午餐'
+
+        status, payload = self._request('GET', '/records?limit=10')
+        assert status == 200
+        assert len(payload['records']) == 1 and payload['next_cursor'] is None
+
+        status, payload = self._request('DELETE', f"/records/{record['id']}?reason=test")
+        assert status == 200 and payload['record']['delete_reason'] == 'test'
+        status, _ = self._request('DELETE', f"/records/{record['id']}")
+        assert status == 404
+
+    def test_pagination(self):
+        """测试分页游标"""
+        for day in range(1, 6):
+            self._request('POST', '/records', {'amount': day, 'type': 'expense', 'date': f'2024-01-0{day}'})
+        status, page = self._request('GET', '/records?limit=2&order_by=-date')
+        assert [r['date'] for r in page['records']] == ['2024-01-05', '2024-01-04']
+        status, page = self._request('GET', f"/records?limit=2&order_by=-date&cursor={page['next_cursor']}")
+        assert [r['date'] for r in page['records']] == ['2024-01-03', '2024-01-02']
+
+    def test_summary_predict_profile(self):
+        """测试汇总、预测和经济画像接口"""
+        status, _ = self._request('GET', '/predict')
+        assert status == 422
+
+        self._add_sufficient_records()
+        status, summary = self._request('GET', '/summary')
+        assert status == 200
+        assert summary['total_income'] == 45000
+        assert summary['total_expense'] == 18000
+        assert summary['record_count'] == 12
+
+        status, summary = self._request('GET', '/summary?start_date=2023-01-01&end_date=2023-01-31')
+        assert summary['total_income'] == 10500 and summary['record_count'] == 3
+
+        status, prediction = self._request('GET', '/predict?days=7')
+        assert status == 200 and len(prediction['income_prediction']) == 7
+
+        status, prediction = self._request('GET', '/predict?days=5&start_date=2023-01-01&end_date=2023-04-30')
+        assert status == 200 and len(prediction['expense_prediction']) == 5
+
+        status, profile = self._request('GET', '/profile')
+        assert status == 200 and 'engel_coefficient' in profile['indicators']
+
+    def test_indicator_series(self):
+        """测试经济指标序列接口"""
+        assert self._request('GET', '/indicators')[0] == 422
+        self._add_sufficient_records()
+        status, series = self._request('GET', '/indicators?windows=1,3')
+        assert status == 200
+        assert series['months'] == ['2023-01', '2023-02', '2023-03', '2023-04']
+        assert series['windows']['3']['months'] == ['2023-03', '2023-04']
+        # 各月支出不变，收入逐月增加，回归MPC为0
+        assert series['windows']['3']['marginal_propensity_consumption'] == [0.0, 0.0]
+        assert self._request('GET', '/indicators?windows=a')[0] == 400
+        assert self._request('GET', '/indicators?windows=0')[0] == 400
+
+    def test_predict_by_category(self):
+        """测试按分类预测接口"""
+        assert self._request('GET', '/predict_by_category')[0] == 422
+        self._add_sufficient_records()
+        status, prediction = self._request('GET', '/predict_by_category?days=7')
+        assert status == 200
+        assert [(c['type'], c['category']) for c in prediction['categories']] == [
+            ('income', 'salary'), ('expense', 'food'), ('expense', 'housing')]
+        assert len(prediction['expense_prediction']) == 7
+        status, subset = self._request('GET', '/predict_by_category?days=7&end_date=2023-02-28&engine=holt_winters')
+        assert status == 200
+        assert subset['start_date'] == '2023-02-04'
+
+    def test_recurring(self):
+        """测试周期性收支计划接口及按计划预测"""
+        self._add_sufficient_records()
+        status, payload = self._request('GET', '/recurring?active=1')
+        assert status == 200
+        assert [(s['description'], s['period'], s['day_of_month']) for s in payload['schedules']] == [
+            ('工资', 'monthly', 1), ('房租', 'monthly', 2), ('餐饮', 'monthly', 3)]
+        status, prediction = self._request('GET', '/predict?days=31&recurring=1')
+        assert status == 200
+        # 最后一条记录在2023-04-03，5月1日工资（中位金额）、2日房租
+        assert prediction['recurring_income'][27] == 11250
+        assert prediction['recurring_expense'][28] == 3000
+
+    def test_scenarios(self):
+        """测试情景模拟接口"""
+        levers = [{'category': 'housing', 'factor': 1.1}, {'category': 'salary', 'factor': 0, 'days': 60}]
+        assert self._request('POST', '/scenarios', {'levers': levers})[0] == 422
+        self._add_sufficient_records()
+        status, payload = self._request('POST', '/scenarios', {'levers': levers, 'days': 60, 'balance': 5000, 'curves': True})
+        assert status == 200
+        assert payload['matched'] == [1, 1]
+        scenario = payload['scenarios'][0]
+        assert len(scenario['balance']) == 60
+        # 工资停发，5月2日付房租3300、3日付餐饮1500后余额为200元，6月2日（第60天）再付房租后为负
+        assert scenario['runway'] == 60
+        status, payload = self._request('POST', '/scenarios', {'levers': levers, 'grid': [[1, 1.1], [0, 0.5, 1]]})
+        assert status == 200
+        assert [s['factors'] for s in payload['scenarios']][:2] == [[1, 0], [1, 0.5]]
+        assert 'balance' not in payload['scenarios'][0]
+        assert self._request('POST', '/scenarios', {'levers': levers, 'grid': [[1]]})[0] == 400
+        assert self._request('POST', '/scenarios', {'levers': [{'factor': 2}]})[0] == 400
+        # 类型错误的参数返回400；组合数在生成全部组合之前检查
+        for body in ({'grid': 5}, {'grid': [[1], 2]}, {'factors': 5}, {'factors': [['a', 1]]},
+                     {'balance': [1]}, {'levers': [{'category': 'food', 'start': [1]}, levers[1]]},
+                     {'levers': [{'category': 'food', 'factor': [1]}]}):
+            assert self._request('POST', '/scenarios', dict({'levers': levers}, **body))[0] == 400
+        many = [{'category': 'food'}] * 20
+        status, payload = self._request('POST', '/scenarios', {'levers': many, 'grid': [[1, 2, 3]] * 20})
+        assert status == 400 and '情景' in payload['error']
+
+    def test_anomalies(self):
+        """测试支出异常接口"""
+        assert self._request('GET', '/anomalies') == (200, {'transactions': [], 'days': []})
+        for day in range(1, 9):
+            self._request('POST', '/records', {'amount': 40, 'type': 'expense', 'date': f'2023-03-0{day}', 'description': '午餐'})
+        self._request('POST', '/records', {'amount': 800, 'type': 'expense', 'date': '2023-03-09', 'description': '聚餐'})
+        status, anomalies = self._request('GET', '/anomalies?limit=5')
+        assert status == 200
+        assert [(entry['date'], entry['amount']) for entry in anomalies['transactions']] == [('2023-03-09', 800)]
+        assert abs(anomalies['transactions'][0]['baseline'] - 40) < 1e-6
+        assert self._request('GET', '/anomalies?limit=0')[0] == 400
+
+    def test_budget_alerts(self):
+        """测试预算报警接口"""
+        self.server.shutdown()
+        self.server = ApiServer(self.server.registry, port=0,
+                                budget_rules=[{'name': 'rent', 'category': 'housing', 'limit': 5000}])
+        self.base_url = f"http://127.0.0.1:{self.server.start()}"
+        assert self._request('GET', '/alerts') == (200, {'active': [], 'events': []})
+        self._add_sufficient_records()
+        self._request('POST', '/records', {'amount': 2500, 'type': 'expense', 'date': '2023-02-20', 'description': '房租'})
+        status, alerts = self._request('GET', '/alerts')
+        assert status == 200
+        assert [(alert['rule'], alert['period'], alert['value']) for alert in alerts['active']] == [('rent', '2023-02', 5500)]
+        assert [event['event'] for event in alerts['events']] == ['triggered']
+        assert self._request('GET', '/alerts?today=2023-03-10')[1]['active'] == []
+        # 账本被淘汰时规则引擎随之释放，重新加载后按记录重建
+        account_model = self.server.registry.get_account_model('default')
+        engine = self.server._budget_engines['default']
+        assert self.server.registry.evict('default') is True
+        assert 'default' not in self.server._budget_engines
+        assert engine._on_records_changed not in account_model._listeners
+        assert len(self._request('GET', '/alerts')[1]['active']) == 1
+        assert self.server._budget_engines['default'] is not engine
+        with pytest.raises(ValueError):
+            ApiServer(self.server.registry, budget_rules=[{'type': 'unknown'}])
+
+    def test_invalid_requests(self):
+        """测试非法请求"""
+        assert self._request('POST', '/records', {'amount': -1, 'type': 'expense'})[0] == 400
+        assert self._request('POST', '/records', {'amount': 1, 'type': 'other'})[0] == 400
+        assert self._request('POST', '/records', {'amount': '1e30', 'type': 'expense'})[0] == 400
+        assert self._request('POST', '/records', {'amount': '1e20', 'type': 'expense'})[0] == 400
+        assert self._request('POST', '/records', {'amount': '0.001', 'type': 'expense'})[0] == 400
+        assert self._request('GET', f'/predict?days={10 ** 9}')[0] == 400
+        assert self._request('GET', f'/predict_by_category?days={10 ** 9}')[0] == 400
+        assert self._request('GET', f'/records?limit={10 ** 9}')[0] == 400
+        assert self._request('POST', '/scenarios', {'levers': [], 'days': 10 ** 9})[0] == 400
+        for length in ('-1', 'abc', str(10 ** 9)):
+            connection = HTTPConnection('127.0.0.1', self.server.port)
+            connection.putrequest('POST', '/records')
+            connection.putheader('Content-Length', length)
+            connection.endheaders()
+            assert connection.getresponse().status == (413 if length == str(10 ** 9) else 400)
+            connection.close()
+        assert self._request('POST', '/records', {'amount': 1, 'type': 'income', 'date': '2024/01/01'})[0] == 400
+        assert self._request('GET', '/predict?days=abc')[0] == 400
+        assert self._request('GET', '/records?cursor=bad')[0] == 400
+        assert self._request('GET', '/unknown')[0] == 404
+        assert self._request('DELETE', '/records')[0] == 405
+        assert self._request('GET', '/records?ledger=../x')[0] == 400
+        # 未预料的异常返回500而不是断开连接
+        self.server._routes[('GET', 'boom')] = lambda *args: 1 / 0
+        assert self._request('GET', '/boom') == (500, {'error': '服务器内部错误: ZeroDivisionError'})
+        # 非字符串分类被拒绝，账本不受影响
+        assert self._request('POST', '/records', {'amount': 1, 'type': 'expense', 'category': ['a']})[0] == 400
+        assert self._request('POST', '/records', {'amount': 1, 'type': 'expense', 'category': ''})[0] == 400
+        status, record = self._request('POST', '/records', {'amount': 1, 'type': 'expense', 'date': '2024-01-01'})
+        assert status == 201 and record['record']['id'] == 1
+
+    def test_multiple_ledgers(self):
+        """测试多账本隔离"""
+        self._request('POST', '/records?ledger=alice', {'amount': 100, 'type': 'income', 'date': '2024-01-01'})
+        self._request('POST', '/records?ledger=bob', {'amount': 200, 'type': 'income', 'date': '2024-01-01'})
+        assert self._request('GET', '/summary?ledger=alice')[1]['total_income'] == 100
+        assert self._request('GET', '/summary?ledger=bob')[1]['total_income'] == 200
+        assert {'alice', 'bob'} <= set(self._request('GET', '/ledgers')[1]['ledgers'])
+
+    def test_concurrent_clients(self):
+        """测试多个客户端并发新增记录"""
+        def worker(index):
+            for i in range(10):
+                self._request('POST', '/records', {'amount': 1, 'type': 'expense', 'date': '2024-01-01',
+                                                   'description': f'客户端{index}-{i}'})
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        status, summary = self._request('GET', '/summary')
+        assert summary['record_count'] == 80
+        assert summary['total_expense'] == 80
+        with open(os.path.join(self.ledger_dir, 'default.json'), 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        assert sorted(r['id'] for r in records) == list(range(1, 81))
+
+    def test_etag_not_modified(self):
+        """测试ETag缓存及账本变化后失效"""
+        self._add_sufficient_records()
+        with urlopen(self.base_url + '/summary') as response:
+            etag = response.headers['ETag']
+            first = json.loads(response.read().decode('utf-8'))
+        assert etag and response.headers['Cache-Control'] == 'no-cache'
+
+        # 账本未变化时返回304且不带响应体
+        request = Request(self.base_url + '/summary', headers={'If-None-Match': etag})
+        with pytest.raises(HTTPError) as exc_info:
+            urlopen(request)
+        assert exc_info.value.code == 304
+        assert exc_info.value.read() == b''
+
+        # 不同参数的ETag不同
+        with urlopen(self.base_url + '/summary?start_date=2023-01-01') as response:
+            assert response.headers['ETag'] != etag
+
+        # 新增记录后ETag失效，返回新的结果
+        self._request('POST', '/records', {'amount': 100, 'type': 'income', 'date': '2023-05-01'})
+        with urlopen(request) as response:
+            assert response.status == 200
+            assert response.headers['ETag'] != etag
+            second = json.loads(response.read().decode('utf-8'))
+        assert second['total_income'] == first['total_income'] + 100
+
+        # "*" 只在资源存在时返回304
+        assert self.server.handle('GET', '/records/999', if_none_match='*')[0] == 404
+        assert self.server.handle('GET', '/records/1', if_none_match='*')[0] == 304
+        assert self.server.handle('GET', '/summary', if_none_match='"other", *')[0] == 304
+
+    def test_response_cache(self):
+        """测试只读接口的响应缓存"""
+        self._add_sufficient_records()
+        status, first, headers = self.server.handle('GET', '/predict', {'days': '7'})
+        assert status == 200 and len(self.server.response_cache) == 1
+        status, second, _ = self.server.handle('GET', '/predict', {'days': '7'})
+        assert second is first
+
+        status, _, _ = self.server.handle('GET', '/predict', {'days': '7'}, if_none_match=headers['ETag'])
+        assert status == 304
+
+        # 错误响应不缓存
+        assert self.server.handle('GET', '/predict', {'days': 'abc'})[0] == 400
+        assert len(self.server.response_cache) == 1
+
+        self.server.handle('DELETE', '/records/1')
+        status, third, _ = self.server.handle('GET', '/predict', {'days': '7'})
+        assert status == 200 and third is not first
+
+    def test_batch_operations(self):
+        """测试批量操作按顺序执行且只保存一次"""
+        saves = []
+        account_model = self.server.registry.get_account_model()
+        original_save = account_model.save_records
+        account_model.save_records = lambda: saves.append(1) or original_save()
+
+        operations = [{'op': 'add', 'amount': 100 + i, 'type': 'expense', 'date': f'2024-01-{i + 1:02d}',
+                       'description': '午餐'} for i in range(20)]
+        operations += [
+            {'op': 'delete', 'id': 1, 'reason': '重复'},
+            {'op': 'delete', 'id': 999},
+            {'op': 'add', 'amount': -1, 'type': 'expense'},
+            {'op': 'get', 'id': 'abc'},
+            {'op': 'unknown'},
+            {'op': 'query', 'limit': 5, 'order_by': '-date'},
+            {'op': 'summary'},
+        ]
+        status, payload = self._request('POST', '/batch', {'operations': operations})
+        assert status == 200
+        results = payload['results']
+        assert len(results) == len(operations)
+        assert all(r['status'] == 201 for r in results[:20])
+        assert results[20]['status'] == 200 and results[20]['result']['record']['delete_reason'] == '重复'
+        assert [r['status'] for r in results[21:25]] == [404, 400, 400, 400]
+        assert [r['date'] for r in results[25]['result']['records']] == [f'2024-01-{d:02d}' for d in range(20, 15, -1)]
+        assert results[26]['result']['record_count'] == 19
+        assert len(saves) == 1
+
+        with open(os.path.join(self.ledger_dir, 'default.json'), 'r', encoding='utf-8') as f:
+            assert len(json.load(f)) == 19
+
+    def test_batch_invalid_body(self):
+        """测试非法的批量请求体"""
+        assert self._request('POST', '/batch', {'ops': []})[0] == 400
+        assert self._request('POST', '/batch', {'operations': 'add'})[0] == 400
+        assert self._request('GET', '/batch')[0] == 405
+        # 非字符串的过滤参数和意外错误都只影响该操作，其余操作照常执行并返回结果
+        self.server._batch_operations['boom'] = lambda *args: 1 / 0
+        add = {'op': 'add', 'amount': 10, 'type': 'expense', 'date': '2024-01-01'}
+        status, payload = self._request('POST', '/batch', {'operations': [
+            add, {'op': 'query', 'start_date': 20240101}, {'op': 'query', 'keyword': 5}, {'op': 'boom'}, add]})
+        assert status == 200
+        assert [r['status'] for r in payload['results']] == [201, 400, 400, 500, 201]
+        assert payload['results'][3]['error'] == '服务器内部错误: ZeroDivisionError'
+        assert self._request('GET', '/summary')[1]['record_count'] == 2
@@ -0,0 +1,95 @@
+import pytest
+import os
+import json
+import shutil
+import subprocess
+import sys
+import numpy as np
+import backtest
+from src.models.backtest import rolling_origins, run_backtest
+
+class TestBacktest:
+    """测试滚动起点回测"""
+
+    def setup_method(self):
+        """每个测试方法执行前生成测试账本"""
+        self.ledger_dir = 'data/test_backtest'
+        if os.path.exists(self.ledger_dir):
+            shutil.rmtree(self.ledger_dir)
+        os.makedirs(self.ledger_dir)
+        # 收入每天线性增长、支出每天固定，线性引擎应当完全预测准确
+        days = np.arange(120)
+        dates = (np.datetime64('2023-01-01') + days).astype(str)
+        records = []
+        for i, date in enumerate(dates):
+            records.append({'id': 2 * i + 1, 'amount': 100 + i, 'amount_cents': (100 + i) * 100,
+                            'type': 'income', 'date': str(date), 'description': '', 'category': 'other'})
+            records.append({'id': 2 * i + 2, 'amount': 50, 'amount_cents': 5000,
+                            'type': 'expense', 'date': str(date), 'description': '', 'category': 'other'})
+        self._write_ledger('linear', records)
+        self._write_ledger('short', records[:20])
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.ledger_dir):
+            shutil.rmtree(self.ledger_dir)
+
+    def _write_ledger(self, name, records):
+        with open(os.path.join(self.ledger_dir, f'{name}.json'), 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False)
+
+    def test_rolling_origins(self):
+        """测试滚动起点"""
+        assert rolling_origins(100, 10, min_train=60, step=10) == [60, 70, 80, 90]
+        assert rolling_origins(30, 10, min_train=60) == []
+
+    def test_linear_ledger_metrics(self):
+        """测试线性账本上的误差和结果结构"""
+        ledgers = {'linear': os.path.join(self.ledger_dir, 'linear.json'),
+                   'short': os.path.join(self.ledger_dir, 'short.json')}
+        results = run_backtest(ledgers, engines=('numpy', 'holt_winters'), horizon=7, min_train=30, step=10,
+                               max_workers=1)
+        assert [(r['ledger'], r['engine']) for r in results] == [
+            ('linear', 'numpy'), ('linear', 'holt_winters'), ('short', 'numpy'), ('short', 'holt_winters')]
+        linear = results[0]
+        assert linear['days'] == 120 and linear['folds'] == len(rolling_origins(120, 7, 30, 10))
+        assert len(linear['mae']['income']) == 7
+        np.testing.assert_allclose(linear['mae']['income'], 0, atol=1e-6)
+        np.testing.assert_allclose(linear['mape']['expense'], 0, atol=1e-9)
+        for key in ('fit_latency_ms', 'predict_latency_ms', 'latency_ms'):
+            assert linear[key]['max'] >= linear[key]['p50'] >= 0
+        assert results[2]['fit_latency_ms'] is None and results[2]['predict_latency_ms'] is None
+        assert results[2]['folds'] == 0 and results[2]['mae'] is None
+
+    def test_process_pool_matches_sequential(self):
+        """测试进程池并行与顺序执行结果一致"""
+        files = [os.path.join(self.ledger_dir, 'linear.json')]
+        kwargs = dict(engines=('numpy', 'holt_winters'), horizon=5, min_train=40, step=5, folds_per_task=3)
+        sequential = run_backtest(files, max_workers=1, **kwargs)
+        parallel = run_backtest(files, max_workers=2, **kwargs)
+        for a, b in zip(sequential, parallel):
+            assert a['folds'] == b['folds']
+            assert a['mae'] == b['mae']
+        with pytest.raises(ValueError):
+            run_backtest(files, engines=('unknown',))
+
+    def test_command_line_writes_json(self):
+        """测试命令行入口写出JSON结果"""
+        output = os.path.join(self.ledger_dir, 'results', 'backtest.json')
+        report = backtest.main([self.ledger_dir, '--engines', 'numpy', '--horizon', '5', '--min-train', '30',
+                                '--step', '20', '--workers', '1', '--output', output])
+        with open(output, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        assert saved['config']['horizon'] == 5
+        assert {r['ledger'] for r in saved['results']} == {'linear', 'short'}
+        assert saved['results'] == json.loads(json.dumps(report['results']))
+
+    def test_command_line_bare_file_name(self):
+        """测试在账本目录中以不带目录的文件名运行命令行"""
+        script = os.path.abspath(backtest.__file__)
+        result = subprocess.run([sys.executable, script, 'linear.json', '--engines', 'numpy', '--horizon', '5',
+                                 '--min-train', '30', '--step', '20', '--workers', '1', '--output', 'backtest.json'],
+                                cwd=self.ledger_dir, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        with open(os.path.join(self.ledger_dir, 'backtest.json'), encoding='utf-8') as f:
+            assert [r['ledger'] for r in json.load(f)['results']] == ['linear']
@@ -0,0 +1,114 @@
+import pytest
+import os
+import json
+from src.models.account_model import AccountModel
+from src.models.prediction_model import PredictionModel
+from src.models.budget_model import BudgetEngine, load_budget_rules, period_key, rule_from_dict
+
+class TestBudgetEngine:
+    """测试预算规则引擎"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.temp_data_file = 'data/test_budget_records.json'
+        self.temp_rules_file = 'data/test_budget_rules.json'
+        for path in (self.temp_data_file, self.temp_rules_file):
+            if os.path.exists(path):
+                os.remove(path)
+        self.account_model = AccountModel(self.temp_data_file)
+        self.prediction_model = PredictionModel(self.account_model)
+        self.events = []
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        for path in (self.temp_data_file, self.temp_rules_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _engine(self, rules):
+        engine = BudgetEngine(self.account_model, self.prediction_model, rules)
+        engine.add_alert_listener(self.events.append)
+        return engine
+
+    def test_period_key(self):
+        """测试统计周期的键"""
+        assert period_key('month', '2024-03-15') == '2024-03'
+        assert period_key('year', '2024-03-15') == '2024'
+        # 2024-03-15 是星期五
+        assert period_key('week', '2024-03-15') == '2024-03-11'
+        assert period_key('week', '2024-03-11') == '2024-03-11'
+        with pytest.raises(ValueError):
+            period_key('quarter', '2024-03-15')
+
+    def test_category_limit_triggers_and_resolves(self):
+        """测试分类月度预算超限报警及删除记录后恢复"""
+        engine = self._engine([{'name': 'dining', 'category': 'food', 'limit': 2000, 'period': 'month'}])
+        self.account_model.add_record(1500, 'expense', '2024-03-01', '聚餐', 'food')
+        self.account_model.add_record(800, 'expense', '2024-04-01', '聚餐', 'food')
+        self.account_model.add_record(3000, 'expense', '2024-03-02', '房租', 'housing')
+        assert self.events == []
+
+        _, record = self.account_model.add_record(600, 'expense', '2024-03-05', '外卖', 'food')
+        assert [event['event'] for event in self.events] == ['triggered']
+        alert = self.events[0]
+        assert (alert['rule'], alert['period'], alert['value'], alert['limit']) == ('dining', '2024-03', 2100, 2000)
+        assert '餐饮' in alert['message']
+        assert engine.active_alerts(today='2024-03-20') == [engine.active_alerts()[0]]
+        assert engine.active_alerts(today='2024-04-20') == []
+
+        # 同一周期内继续超限不重复报警
+        self.account_model.add_record(100, 'expense', '2024-03-06', '咖啡', 'food')
+        assert len(self.events) == 1
+        assert engine.active_alerts()[0]['value'] == 2200
+
+        self.account_model.delete_record(record['id'])
+        assert [event['event'] for event in self.events] == ['triggered', 'resolved']
+        assert engine.active_alerts() == []
+
+    def test_total_expense_rule_and_rebuild(self):
+        """测试全部分类的预算，以及创建引擎和记录整体替换时重新判断"""
+        self.account_model.add_record(900, 'expense', '2024-03-01', '房租', 'housing')
+        self.account_model.add_record(200, 'expense', '2024-03-02', '午餐', 'food')
+        engine = self._engine([{'name': 'total', 'limit': 1000, 'period': 'week'}])
+        assert [alert['period'] for alert in engine.active_alerts()] == ['2024-02-26']
+        self.account_model.records = []
+        assert engine.active_alerts() == []
+        assert [event['event'] for event in self.events] == ['resolved']
+
+    def test_balance_forecast_rule(self):
+        """测试预计余额为负的报警"""
+        engine = self._engine([{'type': 'balance_forecast', 'name': 'runway', 'days': 30}])
+        self.account_model.add_record(1000, 'income', '2024-03-01', '工资')
+        self.account_model.add_record(1000, 'income', '2024-03-02', '工资')
+        self.account_model.add_record(100, 'expense', '2024-03-01', '午餐')
+        self.account_model.add_record(100, 'expense', '2024-03-02', '午餐')
+        assert engine.active_alerts() == []
+        # 收入下降、支出上升的趋势使余额在预测期内转负
+        self.account_model.add_record(5000, 'expense', '2024-03-03', '购物')
+        alerts = engine.active_alerts()
+        assert len(alerts) == 1 and alerts[0]['rule'] == 'runway'
+        assert alerts[0]['value'] < 0 and 1 <= alerts[0]['days'] <= 30
+
+    def test_invalid_rules(self):
+        """测试非法规则配置"""
+        with pytest.raises(ValueError):
+            rule_from_dict({'type': 'unknown'})
+        with pytest.raises(ValueError):
+            rule_from_dict({'limit': 0})
+        with pytest.raises(ValueError):
+            rule_from_dict({'limit': 100, 'period': 'quarter'})
+        with pytest.raises(ValueError):
+            rule_from_dict({'limit': 100, 'unexpected': 1})
+        engine = self._engine([{'name': 'a', 'limit': 100}])
+        with pytest.raises(ValueError):
+            engine.add_rule({'name': 'a', 'limit': 200})
+        with pytest.raises(ValueError):
+            BudgetEngine(self.account_model, None, [{'type': 'balance_forecast'}])
+
+    def test_load_budget_rules(self):
+        """测试从文件加载规则"""
+        assert load_budget_rules(self.temp_rules_file) == []
+        rules = [{'name': 'dining', 'category': 'food', 'limit': 2000}]
+        with open(self.temp_rules_file, 'w', encoding='utf-8') as f:
+            json.dump(rules, f)
+        assert load_budget_rules(self.temp_rules_file) == rules
@@ -0,0 +1,98 @@
+import pytest
+import os
+import numpy as np
+from src.models.account_model import AccountModel, day_number
+from src.models.forecast_engines import HoltWintersEngine, NumpyLinearEngine, SklearnLinearEngine
+from src.models.prediction_model import PredictionModel
+
+class TestCategoryForecast:
+    """测试按分类批量预测"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.temp_data_file = 'data/test_category_forecast_records.json'
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+        self.account_model = AccountModel(self.temp_data_file)
+        self.prediction_model = PredictionModel(self.account_model)
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+
+    def _add_random_records(self, count=400, seed=0):
+        """在2024年前60天随机生成多个分类的收支记录"""
+        rng = np.random.default_rng(seed)
+        descriptions = {'expense': ['午餐', '地铁', '房租', '电影', '话费', '买衣服'], 'income': ['工资', '红包', '基金分红']}
+        with self.account_model.batch():
+            for _ in range(count):
+                record_type = 'income' if rng.random() < 0.3 else 'expense'
+                description = descriptions[record_type][rng.integers(len(descriptions[record_type]))]
+                date = str(np.datetime64('2024-01-01') + int(rng.integers(0, 60)))
+                self.account_model.add_record(round(float(rng.uniform(1, 500)), 2), record_type, date, description)
+
+    def test_engines_forecast_many(self):
+        """测试各引擎的批量预测与逐条预测一致"""
+        rng = np.random.default_rng(1)
+        series = rng.uniform(0, 100, size=(5, 40))
+        for engine in (NumpyLinearEngine(), SklearnLinearEngine()):
+            batched = engine.forecast_many(series, 10)
+            assert batched.shape == (5, 10)
+            for row, expected in zip(batched, series):
+                assert row == pytest.approx(engine.forecast(expected, 10))
+        assert NumpyLinearEngine().forecast_many(series[:, :1], 3) == pytest.approx(np.repeat(series[:, :1], 3, axis=1))
+        with pytest.raises(ValueError):
+            NumpyLinearEngine().forecast_many(np.zeros((2, 0)), 3)
+
+    def test_category_series_matrix(self):
+        """测试分类逐日矩阵与逐条累加结果一致"""
+        self._add_random_records()
+        keys, first_day, matrix = self.prediction_model.get_category_series()
+        assert keys == sorted(keys, key=lambda key: (key[0] != 'income', key[1]))
+        assert first_day == day_number('2024-01-01')
+        expected = np.zeros_like(matrix)
+        rows = {key: i for i, key in enumerate(keys)}
+        for record in self.account_model.get_all_records():
+            row = rows[(record['type'], record['category'])]
+            expected[row, day_number(record['date']) - first_day] += self.account_model.get_record_cents(record)
+        assert np.array_equal(matrix, expected)
+        assert self.prediction_model.get_category_series() is not None
+        # 指定记录集时只统计给定记录
+        subset = self.account_model.get_records_by_category('food')
+        keys, _, matrix = self.prediction_model.get_category_series(subset)
+        assert keys == [('expense', 'food')]
+        assert matrix.sum() == sum(self.account_model.get_record_cents(r) for r in subset)
+
+    def test_predict_by_category(self):
+        """测试各分类预测与逐条拟合一致，线性引擎下各分类之和等于整体序列的预测"""
+        self._add_random_records()
+        result = self.prediction_model.predict_by_category(20)
+        keys, _, matrix = self.prediction_model.get_category_series()
+        assert [(c['type'], c['category']) for c in result['categories']] == keys
+        assert result['start_date'] == str(np.datetime64(day_number('2024-01-01') + matrix.shape[1], 'D'))
+        engine = NumpyLinearEngine()
+        for category, row in zip(result['categories'], matrix):
+            assert category['prediction'] == pytest.approx(np.maximum(engine.forecast(row / 100, 20), 0).tolist())
+            assert category['history_total'] == pytest.approx(row.sum() / 100)
+        assert result['categories'][0]['label'] == self.account_model.classifier.get_label(keys[0][1])
+        # 最小二乘对y是线性的：未截断时各分类预测之和等于整体序列的预测
+        is_income = np.array([key[0] == 'income' for key in keys])
+        total = engine.forecast(matrix[~is_income].sum(axis=0) / 100, 20)
+        unclipped = engine.forecast_many(matrix[~is_income] / 100, 20).sum(axis=0)
+        assert unclipped == pytest.approx(total)
+        assert self.prediction_model.predict_by_category(20) is result
+
+    def test_predict_by_category_engines(self):
+        """测试季节性引擎和指定记录集的分类预测"""
+        self._add_random_records()
+        result = self.prediction_model.predict_by_category(14, engine='holt_winters')
+        _, first_day, matrix = self.prediction_model.get_category_series()
+        expected = np.maximum(HoltWintersEngine().forecast_many(matrix / 100, 14, first_day), 0)
+        assert np.allclose([c['prediction'] for c in result['categories']], expected)
+        assert result['expense_prediction'] == pytest.approx(
+            expected[[c['type'] == 'expense' for c in result['categories']]].sum(axis=0).tolist())
+        records = self.account_model.get_records_by_date_range('2024-01-01', '2024-01-31')
+        subset = self.prediction_model.predict_by_category(7, records=records)
+        assert subset['start_date'] <= '2024-02-01'
+        assert self.prediction_model.predict_by_category(7, records=[]) is None
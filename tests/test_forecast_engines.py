@@ -0,0 +1,159 @@
+import pytest
+import os
+import sys
+import subprocess
+import numpy as np
+import pandas as pd
+from src.models.account_model import AccountModel
+from src.models.prediction_model import PredictionModel
+from src.models.forecast_engines import (HoltWintersEngine, NumpyLinearEngine, SklearnLinearEngine,
+                                          get_forecast_engine)
+
+class TestForecastEngines:
+    """测试预测引擎及与原sklearn实现的一致性"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.temp_data_file = 'data/test_forecast_engines_records.json'
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+        self.account_model = AccountModel(self.temp_data_file)
+        self.prediction_model = PredictionModel(self.account_model)
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+
+    @staticmethod
+    def _legacy_predict(daily_data, days_ahead):
+        """原 _predict_using_regression 的sklearn实现，作为参考输出"""
+        from sklearn.linear_model import LinearRegression
+        X = np.array(range(len(daily_data))).reshape(-1, 1)
+        y = daily_data['amount'].values
+        model = LinearRegression()
+        model.fit(X, y)
+        future_X = np.array(range(len(daily_data), len(daily_data) + days_ahead)).reshape(-1, 1)
+        return [max(0, p) for p in model.predict(future_X)]
+
+    def test_parity_with_legacy_regression(self):
+        """测试numpy引擎与原实现的输出一致（含负值截断）"""
+        pytest.importorskip('sklearn')
+        rng = np.random.default_rng(35)
+        cases = [
+            rng.uniform(0, 10000, size=n).round(2) for n in (2, 3, 10, 365, 5000)
+        ]
+        # 下降趋势，外推后出现负值需要截断为0
+        cases.append(np.linspace(5000, 100, 60))
+        cases.append(np.full(20, 88.8))
+        for values in cases:
+            daily_data = pd.DataFrame({'date': pd.date_range('2020-01-01', periods=len(values)), 'amount': values})
+            for days_ahead in (1, 30, 400):
+                expected = self._legacy_predict(daily_data, days_ahead)
+                actual = self.prediction_model._predict_using_regression(daily_data, days_ahead)
+                assert len(actual) == days_ahead
+                np.testing.assert_allclose(actual, expected, rtol=1e-7, atol=1e-6)
+                assert min(actual) >= 0
+
+    def test_engines_agree(self):
+        """测试numpy引擎与sklearn引擎结果一致"""
+        pytest.importorskip('sklearn')
+        values = np.random.default_rng(1).normal(100, 30, size=500)
+        np.testing.assert_allclose(NumpyLinearEngine().forecast(values, 50),
+                                   SklearnLinearEngine().forecast(values, 50), rtol=1e-8)
+
+    def test_get_forecast_engine(self):
+        """测试按名称选择引擎"""
+        assert isinstance(get_forecast_engine(), NumpyLinearEngine)
+        assert isinstance(get_forecast_engine('sklearn'), SklearnLinearEngine)
+        engine = NumpyLinearEngine()
+        assert get_forecast_engine(engine) is engine
+        with pytest.raises(ValueError):
+            get_forecast_engine('unknown')
+        assert isinstance(PredictionModel(self.account_model, engine='sklearn').engine, SklearnLinearEngine)
+
+    def test_single_value_and_empty(self):
+        """测试单个样本按该值外推、空序列报错"""
+        assert NumpyLinearEngine().forecast([42.0], 3).tolist() == [42.0, 42.0, 42.0]
+        with pytest.raises(ValueError):
+            NumpyLinearEngine().forecast([], 3)
+
+    def test_sklearn_not_imported_by_default(self):
+        """测试默认路径不导入sklearn"""
+        code = ("import sys; from src.models.prediction_model import PredictionModel; "
+                "print('sklearn' in sys.modules)")
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        assert output.stdout.strip() == 'False'
+
+    @staticmethod
+    def _seasonal_series(first_date, length):
+        """每月1日发工资、每周六买菜的逐日序列"""
+        first_day = int(np.datetime64(first_date, 'D').astype(np.int64))
+        dates = np.arange(first_day, first_day + length).astype('datetime64[D]')
+        day_of_month = (dates - dates.astype('datetime64[M]').astype('datetime64[D]')).astype(int)
+        weekday = (np.arange(first_day, first_day + length) + 3) % 7
+        values = np.where(day_of_month == 0, 10000.0, 0.0) + np.where(weekday == 5, 300.0, 0.0) + 50
+        return first_day, values
+
+    def test_holt_winters_captures_seasonality(self):
+        """测试Holt-Winters引擎识别周和月内季节性"""
+        first_day, values = self._seasonal_series('2020-01-01', 3 * 365 + 60)
+        history, future = values[:3 * 365], values[3 * 365:]
+        forecast = HoltWintersEngine().forecast(history, 60, first_day)
+        np.testing.assert_allclose(forecast, future, atol=50)
+
+        # 直线拟合无法体现月初的工资高峰
+        linear = NumpyLinearEngine().forecast(history, 60)
+        assert np.abs(linear - future).max() > 5000
+
+    def test_holt_winters_many_series(self):
+        """测试多年序列的多条序列一次预测与逐条预测一致（耗时见 benchmark.py）"""
+        first_day, values = self._seasonal_series('2019-03-01', 4 * 365)
+        series = np.stack([values, values * 0.5 + 20])
+        engine = HoltWintersEngine()
+        many = engine.forecast_many(series, 30, first_day)
+        np.testing.assert_allclose(many[1], engine.forecast(series[1], 30, first_day))
+        assert many.shape == (2, 30)
+
+    def test_predict_future_uses_requested_engine(self, monkeypatch):
+        """测试未指定记录时按次指定的sklearn引擎和自定义引擎实例真正被调用"""
+        for day in range(1, 29):
+            self.account_model.add_record(100 + day, 'income', f'2023-01-{day:02d}', '工资')
+            self.account_model.add_record(50, 'expense', f'2023-01-{day:02d}', '午餐')
+        calls = []
+        original = SklearnLinearEngine.forecast
+
+        def spy(engine, values, days_ahead):
+            calls.append(len(values))
+            return original(engine, values, days_ahead)
+
+        monkeypatch.setattr(SklearnLinearEngine, 'forecast', spy)
+        result = self.prediction_model.predict_future(days_ahead=5, engine='sklearn')
+        assert calls == [28, 28]
+        default = self.prediction_model.predict_future(days_ahead=5)
+        assert len(calls) == 2
+        np.testing.assert_allclose(result['income_prediction'], default['income_prediction'])
+
+        class ConstantEngine:
+            def forecast(self, values, days_ahead):
+                return np.full(days_ahead, 7.0)
+
+        custom = self.prediction_model.predict_future(days_ahead=3, engine=ConstantEngine())
+        assert custom['income_prediction'] == [7.0] * 3
+
+    def test_predict_future_with_seasonal_engine(self):
+        """测试按次选择季节性引擎"""
+        for month in range(1, 7):
+            self.account_model.add_record(10000, 'income', f'2023-{month:02d}-01', '工资')
+            for day in (7, 14, 21, 28):
+                self.account_model.add_record(300, 'expense', f'2023-{month:02d}-{day:02d}', '买菜')
+        result = self.prediction_model.predict_future(days_ahead=31, engine='holt_winters')
+        assert len(result['income_prediction']) == 31
+        # 最后一条记录在2023-06-28，预测从6月29日开始，第3天为7月1日
+        assert result['income_prediction'][2] == max(result['income_prediction'])
+        assert min(result['income_prediction']) >= 0
+
+        records = self.account_model.get_records_by_date_range('2023-01-01', '2023-03-31')
+        assert self.prediction_model.predict_future(days_ahead=5, records=records, engine='holt_winters') is not None
+        with pytest.raises(ValueError):
+            self.prediction_model.predict_future(engine='unknown')
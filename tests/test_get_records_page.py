@@ -0,0 +1,119 @@
+import pytest
+import os
+from src.models.account_model import AccountModel
+
+class TestGetRecordsPage:
+    """测试AccountModel.get_records_page和iter_records函数"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        # 使用临时数据文件
+        self.temp_data_file = 'data/test_records_page_records.json'
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+        # 创建AccountModel实例
+        self.account_model = AccountModel(self.temp_data_file)
+        # 添加测试数据（日期乱序插入）
+        test_records = [
+            (1000, 'income', '2023-03-01', '工资3月'),
+            (500, 'expense', '2023-01-15', '房租1月'),
+            (200, 'expense', '2023-02-20', '餐饮2月'),
+            (1200, 'income', '2023-01-01', '工资1月'),
+            (550, 'expense', '2023-02-15', '房租2月'),
+            (250, 'expense', '2023-01-20', '餐饮1月'),
+            (1500, 'income', '2023-02-01', '工资2月'),
+        ]
+        for amount, record_type, date, description in test_records:
+            self.account_model.add_record(amount, record_type, date, description)
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+
+    def _collect_pages(self, limit, order_by='date', filters=None):
+        """依次翻页直到结束，返回每页的ID列表"""
+        pages = []
+        cursor = None
+        while True:
+            page = self.account_model.get_records_page(cursor, limit, order_by, filters)
+            pages.append([r['id'] for r in page['records']])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return pages
+
+    def test_iter_records_date_order(self):
+        """测试按日期顺序遍历"""
+        dates = [r['date'] for r in self.account_model.iter_records()]
+        assert dates == sorted(dates)
+        assert len(dates) == 7
+
+    def test_iter_records_returns_live_records(self):
+        """测试遍历返回的是原记录对象而非副本"""
+        first = next(self.account_model.iter_records(order='id'))
+        assert first is self.account_model.get_all_records()[0]
+
+    def test_iter_records_filters(self):
+        """测试过滤条件"""
+        records = list(self.account_model.iter_records(
+            {'start_date': '2023-01-10', 'end_date': '2023-02-28', 'type': 'expense'}, order='-date'))
+        assert [r['date'] for r in records] == ['2023-02-20', '2023-02-15', '2023-01-20', '2023-01-15']
+
+        records = list(self.account_model.iter_records({'keyword': '房租'}, order='id'))
+        assert [r['id'] for r in records] == [2, 5]
+
+    def test_search_filter_pages(self):
+        """测试界面搜索条件匹配多个字段并可分页"""
+        assert self._collect_pages(limit=1, order_by='id', filters={'search': '2023-02'}) == [[3], [5], [7]]
+        assert self._collect_pages(limit=2, order_by='id', filters={'search': '收入'}) == [[1, 4], [7]]
+        records = self.account_model.get_records_page(limit=10, order_by='id', filters={'search': '550'})
+        assert [r['id'] for r in records['records']] == [5]
+
+    def test_pages_cover_all_records(self):
+        """测试分页覆盖全部记录且无重复"""
+        pages = self._collect_pages(limit=3)
+        assert [len(p) for p in pages] == [3, 3, 1]
+        ids = [i for p in pages for i in p]
+        assert sorted(ids) == list(range(1, 8))
+        expected = [r['id'] for r in self.account_model.iter_records()]
+        assert ids == expected
+
+    def test_exact_multiple_has_no_empty_page(self):
+        """测试记录数为每页条数整数倍时不产生空页"""
+        self.account_model.delete_record(7)
+        pages = self._collect_pages(limit=3)
+        assert [len(p) for p in pages] == [3, 3]
+
+    def test_id_order_pages(self):
+        """测试按ID倒序分页"""
+        pages = self._collect_pages(limit=4, order_by='-id')
+        assert pages == [[7, 6, 5, 4], [3, 2, 1]]
+
+    def test_cursor_stable_after_insert(self):
+        """测试翻页过程中插入记录不影响游标位置"""
+        page = self.account_model.get_records_page(limit=3)
+        assert [r['date'] for r in page['records']] == ['2023-01-01', '2023-01-15', '2023-01-20']
+        # 在已翻过的位置之前插入一条记录
+        self.account_model.add_record(100, 'expense', '2022-12-31', '早餐')
+        next_page = self.account_model.get_records_page(page['next_cursor'], limit=3)
+        assert [r['date'] for r in next_page['records']] == ['2023-02-01', '2023-02-15', '2023-02-20']
+
+    def test_filtered_pages(self):
+        """测试带过滤条件的分页"""
+        pages = self._collect_pages(limit=2, filters={'type': 'income'})
+        assert pages == [[4, 7], [1]]
+
+    def test_invalid_cursor(self):
+        """测试非法游标"""
+        with pytest.raises(ValueError):
+            self.account_model.get_records_page('id|3', limit=3, order_by='date')
+        with pytest.raises(ValueError):
+            self.account_model.get_records_page('garbage', limit=3)
+
+    def test_indexes_follow_records_assignment(self):
+        """测试直接替换records后索引同步更新"""
+        self.account_model.records = []
+        page = self.account_model.get_records_page(limit=3)
+        assert page == {'records': [], 'next_cursor': None}
+        success, record = self.account_model.add_record(100, 'income', '2023-01-01', '红包')
+        assert record['id'] == 1
@@ -0,0 +1,90 @@
+import pytest
+import os
+import numpy as np
+from src.models.account_model import AccountModel
+from src.models.prediction_model import PredictionModel
+from src.models.trend_model import IncrementalTrend
+
+class TestIncrementalTrend:
+    """测试增量线性趋势估计"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.temp_data_file = 'data/test_incremental_trend_records.json'
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+        self.account_model = AccountModel(self.temp_data_file)
+        self.prediction_model = PredictionModel(self.account_model)
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+
+    def _reference_forecast(self, values, horizon, forgetting_factor=1.0):
+        """加权最小二乘参考实现"""
+        n = len(values)
+        x = np.arange(n)
+        weights = forgetting_factor ** (n - 1 - x)
+        slope, intercept = np.polyfit(x, values, 1, w=np.sqrt(weights))
+        return intercept + slope * np.arange(n, n + horizon)
+
+    def test_append_matches_least_squares(self):
+        """测试逐日追加后与最小二乘拟合一致"""
+        rng = np.random.default_rng(1)
+        values = rng.integers(100, 10000, size=200).astype(float)
+        for forgetting_factor in (1.0, 0.95):
+            trend = IncrementalTrend(forgetting_factor)
+            for day, value in enumerate(values):
+                trend.update(day, value)
+            np.testing.assert_allclose(trend.forecast(30), self._reference_forecast(values, 30, forgetting_factor),
+                                       rtol=1e-6)
+
+    def test_calendar_gaps_and_extension(self):
+        """测试日期间隔按0计入，以及向前、向后延伸区间"""
+        trend = IncrementalTrend(0.9)
+        trend.rebuild(100, [10.0, 0.0, 20.0, 0.0, 0.0, 40.0])
+        trend.update(102, 5.0)
+        trend.update(108, 7.0)
+        trend.update(97, 3.0)
+        trend.update(105, -40.0)
+        assert (trend.first_day, trend.last_day) == (97, 108)
+        assert len(trend) == 12
+        dense = np.zeros(12)
+        dense[[0, 3, 5, 11]] = [3.0, 10.0, 25.0, 7.0]
+        np.testing.assert_allclose(trend.forecast(5), self._reference_forecast(dense, 5, 0.9), rtol=1e-9)
+        with pytest.raises(ValueError):
+            IncrementalTrend(0)
+
+    def test_single_point_forecasts_mean(self):
+        """测试只有一个样本时按该值预测"""
+        trend = IncrementalTrend()
+        trend.update(0, 50.0)
+        assert trend.forecast(3) == [50.0, 50.0, 50.0]
+        assert IncrementalTrend().forecast(2) == [0.0, 0.0]
+
+    def test_prediction_follows_record_changes(self):
+        """测试增删记录后增量趋势与重新拟合的结果一致"""
+        for month in range(1, 7):
+            self.account_model.add_record(10000 + month * 300, 'income', f'2023-{month:02d}-01', '工资')
+            self.account_model.add_record(3000 + month * 50, 'expense', f'2023-{month:02d}-05', '房租')
+        self.prediction_model.predict_future(days_ahead=10)
+
+        # 追加最新日期、修改已有日期、在中间和最早日期之前新增记录并删除记录
+        self.account_model.add_record(800, 'expense', '2023-07-02', '餐饮')
+        self.account_model.add_record(200, 'expense', '2023-03-05', '交通')
+        self.account_model.add_record(500, 'income', '2023-02-15', '奖金')
+        self.account_model.add_record(100, 'income', '2022-12-20', '红包')
+        self.account_model.delete_record(3)
+        # 删除最后一天唯一的记录后区间收缩
+        _, record = self.account_model.add_record(900, 'expense', '2023-08-01', '旅行')
+        self.account_model.delete_record(record['id'])
+
+        incremental = self.prediction_model.predict_future(days_ahead=10)
+        refit = self.prediction_model.predict_future(days_ahead=10, records=self.account_model.get_all_records())
+        for key in ('income_prediction', 'expense_prediction', 'net_prediction'):
+            np.testing.assert_allclose(incremental[key], refit[key], rtol=1e-6, atol=1e-6)
+
+        # 整体替换记录后重新构建
+        self.account_model.records = []
+        assert self.prediction_model.predict_future() is None
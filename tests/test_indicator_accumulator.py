@@ -0,0 +1,163 @@
+import pytest
+import os
+import numpy as np
+import pandas as pd
+from src.models.account_model import AccountModel
+from src.models.indicator_model import IndicatorAccumulator, indicator_series, month_index
+from src.models.prediction_model import PredictionModel
+
+class TestIndicatorAccumulator:
+    """测试经济指标累加器及其增量更新"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.temp_data_file = 'data/test_indicator_accumulator_records.json'
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+        self.account_model = AccountModel(self.temp_data_file)
+        self.prediction_model = PredictionModel(self.account_model)
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+
+    def _reference_indicators(self, records):
+        """逐条记录计算的参考实现"""
+        if not records:
+            return None
+        get_cents = self.account_model.get_record_cents
+        summary = self.account_model.get_incomes_and_expenses(records)
+        total_income = summary['total_income']
+        total_expense = summary['total_expense']
+        food_expense = sum(get_cents(r) for r in records if r['type'] == 'expense' and
+                           self.account_model.get_record_category(r) == 'food') / 100
+        # 各月支出对收入的回归斜率，没有记录的月份按0计入
+        months = pd.period_range(min(r['date'][:7] for r in records), max(r['date'][:7] for r in records), freq='M')
+        monthly = pd.DataFrame(0.0, index=months.astype(str), columns=['income', 'expense'])
+        for record in records:
+            column = 'income' if record['type'] == 'income' else 'expense'
+            monthly.loc[record['date'][:7], column] += get_cents(record) / 100
+        mpc = 0
+        if len(monthly) > 1 and monthly['income'].nunique() > 1:
+            mpc = np.polyfit(monthly['income'], monthly['expense'], 1)[0]
+        return {
+            'engel_coefficient': food_expense / total_expense if total_expense > 0 else 0,
+            'avg_propensity_consumption': total_expense / total_income if total_income > 0 else 0,
+            'marginal_propensity_consumption': mpc
+        }
+
+    def _add_random_records(self, count, seed):
+        """添加随机记录"""
+        rng = np.random.default_rng(seed)
+        descriptions = ['午餐', '超市买菜', '地铁', '房租', '电影', '工资', '奖金']
+        with self.account_model.batch():
+            for _ in range(count):
+                day = np.datetime64('2023-01-01') + int(rng.integers(0, 365))
+                record_type = 'income' if rng.random() < 0.3 else 'expense'
+                amount = round(float(rng.uniform(1, 5000)), 2)
+                self.account_model.add_record(amount, record_type, str(day), str(rng.choice(descriptions)))
+
+    def test_matches_reference_implementation(self):
+        """测试与参考实现结果一致"""
+        self._add_random_records(500, seed=1)
+        records = self.account_model.get_all_records()
+        for subset in (None, records[::3]):
+            indicators = self.prediction_model.calculate_economic_indicators(subset)
+            for key, value in self._reference_indicators(subset or records).items():
+                assert indicators[key] == pytest.approx(value)
+
+    def test_incremental_updates_match_rebuild(self):
+        """测试增删记录后的增量结果与重新计算一致"""
+        self._add_random_records(200, seed=2)
+        self.prediction_model.calculate_economic_indicators()
+        self._add_random_records(50, seed=3)
+        for record_id in range(1, 120, 4):
+            self.account_model.delete_record(record_id)
+        records = self.account_model.get_all_records()
+        indicators = self.prediction_model.calculate_economic_indicators()
+        for key, value in self._reference_indicators(records).items():
+            assert indicators[key] == pytest.approx(value)
+
+    def test_month_removed_when_empty(self):
+        """测试某月记录全部删除后不再参与MPC计算"""
+        self.account_model.add_record(1000, 'income', '2024-01-10', '工资')
+        self.account_model.add_record(500, 'expense', '2024-01-11', '房租')
+        self.prediction_model.calculate_economic_indicators()
+        record = self.account_model.add_record(3000, 'income', '2024-02-10', '工资')[1]
+        assert self.prediction_model._indicators.monthly.keys() == {'2024-01', '2024-02'}
+        self.account_model.delete_record(record['id'])
+        assert list(self.prediction_model._indicators.monthly) == ['2024-01']
+        assert self.prediction_model.calculate_economic_indicators()['marginal_propensity_consumption'] == 0
+
+    def test_empty_records(self):
+        """测试没有记录时返回None"""
+        assert self.prediction_model.calculate_economic_indicators() is None
+        accumulator = IndicatorAccumulator(self.account_model.get_record_cents,
+                                           self.account_model.get_record_category)
+        assert accumulator.rebuild([]).indicators() is None
+
+class TestIndicatorSeries:
+    """测试按月及滚动窗口的经济指标序列"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.temp_data_file = 'data/test_indicator_series_records.json'
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+        self.account_model = AccountModel(self.temp_data_file)
+        self.prediction_model = PredictionModel(self.account_model)
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+
+    def test_rolling_windows_match_brute_force(self):
+        """测试各滚动窗口的指标与逐窗口重新计算一致"""
+        rng = np.random.default_rng(7)
+        income = rng.uniform(5000, 20000, size=30)
+        expense = 0.6 * income + rng.uniform(0, 3000, size=30)
+        food = expense * rng.uniform(0.2, 0.5, size=30)
+        result = indicator_series(month_index('2022-03'), income, expense, food, windows=(1, 3, 12))
+        assert result['months'][0] == '2022-03' and result['months'][-1] == '2024-08'
+        for window, series in result['windows'].items():
+            assert len(series['months']) == 30 - window + 1
+            for i, end in enumerate(range(window, 31)):
+                part = slice(end - window, end)
+                assert series['engel_coefficient'][i] == pytest.approx(food[part].sum() / expense[part].sum())
+                assert series['avg_propensity_consumption'][i] == pytest.approx(expense[part].sum() / income[part].sum())
+                if window == 1:
+                    assert series['marginal_propensity_consumption'][i] is None
+                else:
+                    slope = np.polyfit(income[part], expense[part], 1)[0]
+                    assert series['marginal_propensity_consumption'][i] == pytest.approx(slope)
+
+    def test_series_from_records(self):
+        """测试由记录生成的序列包含没有记录的月份，并随记录变化更新"""
+        self.account_model.add_record(8000, 'income', '2024-01-05', '工资')
+        self.account_model.add_record(1000, 'expense', '2024-01-06', '超市买菜', 'food')
+        self.account_model.add_record(9000, 'income', '2024-03-05', '工资')
+        self.account_model.add_record(2000, 'expense', '2024-03-08', '房租', 'housing')
+        series = self.prediction_model.get_indicator_series(windows=(1, 3, 6))
+        assert series['months'] == ['2024-01', '2024-02', '2024-03']
+        assert series['income'] == [8000, 0, 9000]
+        monthly = series['windows'][1]
+        assert monthly['engel_coefficient'] == [1.0, None, 0.0]
+        assert monthly['avg_propensity_consumption'] == [0.125, None, pytest.approx(2000 / 9000)]
+        assert series['windows'][3]['engel_coefficient'] == [pytest.approx(1000 / 3000)]
+        assert series['windows'][6]['months'] == []
+
+        self.account_model.add_record(500, 'expense', '2024-02-10', '午餐', 'food')
+        series = self.prediction_model.get_indicator_series(windows=(1,))
+        assert series['windows'][1]['engel_coefficient'][1] == 1.0
+
+    def test_invalid_window(self):
+        """测试非法的窗口长度"""
+        self.account_model.add_record(8000, 'income', '2024-01-05', '工资')
+        with pytest.raises(ValueError):
+            self.prediction_model.get_indicator_series(windows=(0,))
+
+    def test_empty_records(self):
+        """测试没有记录时返回None"""
+        assert self.prediction_model.get_indicator_series() is None
@@ -0,0 +1,194 @@
+import pytest
+import os
+import json
+import shutil
+import threading
+from src.models import ledger_registry
+from src.models.ledger_registry import LedgerRegistry
+from src.models.account_model import RECORD_BYTES, LEDGER_BASE_BYTES
+
+class TestLedgerRegistry:
+    """测试LedgerRegistry多账本懒加载与LRU淘汰"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        # 使用临时账本目录
+        self.ledger_dir = 'data/test_ledgers'
+        if os.path.exists(self.ledger_dir):
+            shutil.rmtree(self.ledger_dir)
+        os.makedirs(self.ledger_dir)
+        for name in ['alice', 'bob', 'carol']:
+            with open(os.path.join(self.ledger_dir, f'{name}.json'), 'w', encoding='utf-8') as f:
+                json.dump([{'id': 1, 'amount': 100.0, 'type': 'income', 'date': '2024-01-01',
+                            'description': f'{name}工资', 'created_at': '2024-01-01 00:00:00'}], f)
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.ledger_dir):
+            shutil.rmtree(self.ledger_dir)
+
+    def test_lazy_loading(self):
+        """测试账本在首次使用时才加载"""
+        registry = LedgerRegistry(ledger_dir=self.ledger_dir)
+        assert len(registry) == 0
+        assert {'alice', 'bob', 'carol', 'default'} <= set(registry.list_ledgers())
+        assert len(registry) == 0
+
+        account_model, prediction_model = registry.get('alice')
+        assert account_model.get_all_records()[0]['description'] == 'alice工资'
+        assert prediction_model.account_model is account_model
+        assert 'alice' in registry
+        # 再次获取返回同一实例
+        assert registry.get_account_model('alice') is account_model
+        assert registry.stats['loads'] == 1
+        assert registry.stats['hits'] == 1
+
+    def test_lru_eviction_by_count(self):
+        """测试超过数量上限时淘汰最久未使用的账本"""
+        registry = LedgerRegistry(ledger_dir=self.ledger_dir, max_open=2)
+        registry.get('alice')
+        registry.get('bob')
+        registry.get('alice')
+        registry.get('carol')
+        assert 'bob' not in registry
+        assert 'alice' in registry and 'carol' in registry
+        assert registry.stats['evictions'] == 1
+
+    def test_eviction_by_memory_budget(self):
+        """测试按内存预算淘汰"""
+        per_ledger = LEDGER_BASE_BYTES + RECORD_BYTES
+        registry = LedgerRegistry(ledger_dir=self.ledger_dir, memory_budget=per_ledger * 2)
+        for name in ['alice', 'bob', 'carol']:
+            registry.get(name)
+        assert len(registry) == 2
+        assert 'alice' not in registry
+        assert registry.memory_usage() <= per_ledger * 2
+
+    def test_eviction_flushes_unsaved_changes(self):
+        """测试淘汰前把未保存的修改写入文件"""
+        registry = LedgerRegistry(ledger_dir=self.ledger_dir, max_open=1)
+        account_model = registry.get_account_model('alice')
+        account_model.records = account_model.get_all_records() + [
+            {'id': 2, 'amount': 50.0, 'type': 'expense', 'date': '2024-01-02',
+             'description': '午餐', 'created_at': '2024-01-02 00:00:00'}]
+        registry.get('bob')
+        assert 'alice' not in registry
+        with open(os.path.join(self.ledger_dir, 'alice.json'), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        assert len(data) == 2
+        assert data[1]['category'] == 'food'
+
+        # 重新加载后数据一致
+        reloaded = registry.get_account_model('alice')
+        assert reloaded is not account_model
+        assert len(reloaded.get_all_records()) == 2
+
+    def test_concurrent_eviction(self):
+        """测试多个线程持有各自账本锁并发获取账本时，淘汰不会死锁，正被使用的账本不被淘汰"""
+        registry = LedgerRegistry(ledger_dir=self.ledger_dir, max_open=1)
+        names = ['alice', 'bob', 'carol'] + [f'user{n}' for n in range(5)]
+        errors = []
+
+        def worker(name):
+            try:
+                for _ in range(30):
+                    with registry.lock_for(name):
+                        account_model = registry.get_account_model(name)
+                        assert name in registry
+                        account_model.get_incomes_and_expenses()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(name,), daemon=True) for name in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        assert not any(thread.is_alive() for thread in threads)
+        assert errors == []
+        assert registry.stats['evictions'] > 0
+
+        # 账本正被其他线程使用时，新账本加载后暂时超出上限
+        held = threading.Event()
+        release = threading.Event()
+
+        def holder():
+            with registry.lock_for('alice'):
+                registry.get('alice')
+                held.set()
+                release.wait(10)
+
+        thread = threading.Thread(target=holder, daemon=True)
+        thread.start()
+        held.wait(10)
+        registry.get('bob')
+        assert 'alice' in registry
+        release.set()
+        thread.join(timeout=10)
+        registry.get('carol')
+        assert 'alice' not in registry and len(registry) == 1
+
+    def test_cold_load_does_not_block_other_ledgers(self, monkeypatch):
+        """测试大账本冷加载期间其他账本照常访问，同一账本并发请求只加载一次"""
+        registry = LedgerRegistry(ledger_dir=self.ledger_dir)
+        loading = threading.Event()
+        release = threading.Event()
+        original = ledger_registry.AccountModel
+
+        def slow_account_model(data_file):
+            if data_file.endswith('alice.json'):
+                loading.set()
+                release.wait(10)
+            return original(data_file)
+
+        monkeypatch.setattr(ledger_registry, 'AccountModel', slow_account_model)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get('alice')), daemon=True)
+                   for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        assert loading.wait(10)
+        # alice加载未完成时，bob的加载和访问不受影响
+        assert registry.get_account_model('bob').get_all_records()[0]['description'] == 'bob工资'
+        assert 'alice' not in registry
+        release.set()
+        for thread in threads:
+            thread.join(timeout=10)
+        assert len(results) == 2 and results[0] is results[1]
+        assert registry.stats['loads'] == 2
+
+    def test_ledger_locks_released_when_unused(self):
+        """测试账本锁在没有调用方持有时释放，持有期间再次获取得到同一把锁"""
+        registry = LedgerRegistry(ledger_dir=self.ledger_dir, max_open=1)
+        lock = registry.lock_for('alice')
+        with lock:
+            registry.get('alice')
+            assert registry.lock_for('alice') is lock
+        del lock
+        registry.get('bob')
+        assert 'alice' not in registry
+        assert 'alice' not in registry._ledger_locks
+
+    def test_new_ledger_and_register(self):
+        """测试新账本文件及显式注册的数据文件"""
+        registry = LedgerRegistry(ledger_dir=self.ledger_dir)
+        account_model = registry.get_account_model('dave')
+        account_model.add_record(10, 'expense', '2024-01-01', '公交')
+        assert os.path.exists(os.path.join(self.ledger_dir, 'dave.json'))
+
+        custom_file = os.path.join(self.ledger_dir, 'custom', 'erin.json')
+        registry.register('erin', custom_file)
+        registry.get_account_model('erin').add_record(10, 'income', '2024-01-01', '红包')
+        assert os.path.exists(custom_file)
+        assert registry.close() is True
+        assert len(registry) == 0
+
+    def test_invalid_ledger_name(self):
+        """测试非法账本名称"""
+        registry = LedgerRegistry(ledger_dir=self.ledger_dir)
+        for name in ['', '../evil', 'a/b', '..']:
+            with pytest.raises(ValueError):
+                registry.get(name)
+            with pytest.raises(ValueError):
+                registry.lock_for(name)
+        assert len(registry._ledger_locks) == 0
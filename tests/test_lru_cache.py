@@ -0,0 +1,109 @@
+import pytest
+import threading
+from src.models.lru_cache import LRUCache
+
+class TestLRUCache:
+    """测试LRU缓存"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.cache = LRUCache(max_entries=3)
+
+    def test_get_and_put(self):
+        """测试读写缓存"""
+        assert self.cache.get('a') is None
+        assert self.cache.get('a', 0) == 0
+        self.cache.put('a', 1)
+        assert self.cache.get('a') == 1
+        assert 'a' in self.cache
+        assert len(self.cache) == 1
+
+    def test_evicts_least_recently_used(self):
+        """测试超过上限时淘汰最久未使用的条目"""
+        for key in ('a', 'b', 'c'):
+            self.cache.put(key, key)
+        # 访问a后，b成为最久未使用的条目
+        self.cache.get('a')
+        self.cache.put('d', 'd')
+        assert 'b' not in self.cache
+        assert all(key in self.cache for key in ('a', 'c', 'd'))
+
+    def test_discard_and_clear(self):
+        """测试按条件删除及清空"""
+        for key in (('x', 1), ('x', 2), ('y', 1)):
+            self.cache.put(key, True)
+        assert self.cache.discard(lambda key: key[0] == 'x') == 2
+        assert len(self.cache) == 1
+        self.cache.clear()
+        assert len(self.cache) == 0
+
+    def test_invalid_max_entries(self):
+        """测试非法的条目上限"""
+        with pytest.raises(ValueError):
+            LRUCache(max_entries=0)
+
+    def test_concurrent_access(self):
+        """测试多线程并发读写"""
+        cache = LRUCache(max_entries=50)
+
+        def worker(offset):
+            for i in range(1000):
+                cache.put((offset, i % 100), i)
+                cache.get((offset, (i * 7) % 100))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(cache) == 50
+
+class TestLRUCacheLimits:
+    """测试LRU缓存的字节上限、存活时间和统计"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.now = 0.0
+        self.clock = lambda: self.now
+
+    def test_stats_count_hits_and_misses(self):
+        """测试命中和未命中计数"""
+        cache = LRUCache(max_entries=2)
+        cache.put('a', 1)
+        cache.get('a')
+        cache.get('b')
+        cache.put('b', 2)
+        cache.put('c', 3)
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 1, 1)
+        assert stats['entries'] == 2
+
+    def test_max_bytes_evicts_oldest(self):
+        """测试超过字节上限时淘汰最久未使用的条目，过大的值不缓存"""
+        cache = LRUCache(max_entries=10, max_bytes=100, size_of=len)
+        cache.put('a', 'x' * 40)
+        cache.put('b', 'x' * 40)
+        cache.put('c', 'x' * 40)
+        assert 'a' not in cache
+        assert cache.stats()['bytes'] == 80
+        cache.put('d', 'x' * 200)
+        assert 'd' not in cache
+        assert cache.stats()['bytes'] == 80
+
+    def test_ttl_expires_entries(self):
+        """测试条目超过存活时间后失效"""
+        cache = LRUCache(max_entries=10, ttl=5, clock=self.clock)
+        cache.put('a', 1)
+        self.now = 4.9
+        assert cache.get('a') == 1
+        self.now = 5.0
+        assert cache.get('a') is None
+        stats = cache.stats()
+        assert (stats['expirations'], stats['entries']) == (1, 0)
+
+    def test_invalid_limits(self):
+        """测试非法的字节上限和存活时间"""
+        with pytest.raises(ValueError):
+            LRUCache(max_bytes=0)
+        with pytest.raises(ValueError):
+            LRUCache(ttl=-1)
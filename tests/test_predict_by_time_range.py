@@ -0,0 +1,109 @@
+import pytest
+import os
+import numpy as np
+import pandas as pd
+from src.models.account_model import AccountModel
+from src.models.prediction_model import PredictionModel
+
+class TestPredictByTimeRange:
+    """测试PredictionModel.predict_future_by_time_range函数"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.temp_data_file = 'data/test_predict_by_time_range_records.json'
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+        self.account_model = AccountModel(self.temp_data_file)
+        self.prediction_model = PredictionModel(self.account_model)
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+
+    def _legacy_predict(self, start_date_str, end_date_str, days_ahead=30):
+        """逐条记录筛选的原实现，作为参考输出"""
+        all_records = self.account_model.get_all_records()
+        if not all_records:
+            return None
+        start_date = pd.to_datetime(start_date_str)
+        end_date = pd.to_datetime(end_date_str)
+        filtered = [r for r in all_records if start_date <= pd.to_datetime(r['date']) <= end_date]
+        income_records = [r for r in filtered if r['type'] == 'income']
+        expense_records = [r for r in filtered if r['type'] == 'expense']
+        if not income_records or not expense_records:
+            return None
+        income_cents = sum(r['amount_cents'] for r in income_records)
+        expense_cents = sum(r['amount_cents'] for r in expense_records)
+        date_range_days = (end_date - start_date).days + 1
+        return {
+            'period_avg_income': income_cents / 100 / len(income_records),
+            'period_avg_expense': expense_cents / 100 / len(expense_records),
+            'period_daily_avg_income': income_cents / 100 / date_range_days,
+            'period_daily_avg_expense': expense_cents / 100 / date_range_days,
+        }
+
+    def _load_random_records(self, count, seed):
+        """生成随机记录"""
+        rng = np.random.default_rng(seed)
+        days = rng.integers(0, 730, size=count)
+        dates = (np.datetime64('2022-01-01') + days).astype(str)
+        cents = rng.integers(1, 1_000_000, size=count)
+        types = rng.choice(['income', 'expense'], size=count, p=[0.3, 0.7])
+        self.account_model.records = [
+            {'id': i + 1, 'amount': int(cents[i]) / 100, 'amount_cents': int(cents[i]), 'type': str(types[i]),
+             'date': str(dates[i]), 'description': '', 'category': 'other'}
+            for i in range(count)
+        ]
+
+    def test_matches_legacy_implementation(self):
+        """测试向量化实现与逐条筛选的结果一致"""
+        self._load_random_records(2000, seed=36)
+        ranges = [
+            ('2022-01-01', '2023-12-31'),
+            ('2022-03-15', '2022-03-16'),
+            ('2022-06-01', '2022-08-31'),
+            ('2022-06-01 12:00', '2022-08-31 08:00'),
+            ('2021-01-01', '2024-12-31'),
+        ]
+        for start_date, end_date in ranges:
+            expected = self._legacy_predict(start_date, end_date)
+            result = self.prediction_model.predict_future_by_time_range(start_date, end_date, days_ahead=7)
+            for key, value in expected.items():
+                assert result[key] == value
+            assert result['income_prediction'] == [expected['period_daily_avg_income']] * 7
+            assert result['period_start_date'] == start_date
+
+    def test_insufficient_data(self):
+        """测试区间内没有记录或缺少收入/支出时返回None"""
+        assert self.prediction_model.predict_future_by_time_range('2023-01-01', '2023-12-31') is None
+        self.account_model.add_record(100, 'income', '2023-01-10', '工资')
+        assert self.prediction_model.predict_future_by_time_range('2023-01-01', '2023-12-31') is None
+        self.account_model.add_record(50, 'expense', '2023-02-10', '餐饮')
+        assert self.prediction_model.predict_future_by_time_range('2023-03-01', '2023-12-31') is None
+        result = self.prediction_model.predict_future_by_time_range('2023-01-10', '2023-02-10', days_ahead=3)
+        assert result['period_daily_avg_income'] == 100 / 32
+        assert result['net_prediction'] == [100 / 32 - 50 / 32] * 3
+
+    def test_arrays_follow_add_and_delete(self):
+        """测试增删记录后列式数组增量合并的结果与重新构建的一致"""
+        self._load_random_records(500, seed=7)
+        rng = np.random.default_rng(7)
+        for step in range(40):
+            if step % 3 == 2:
+                ids = self.account_model.get_record_arrays()['id']
+                self.account_model.delete_record(int(rng.choice(ids)))
+            else:
+                date = str(np.datetime64('2021-12-01') + int(rng.integers(0, 800)))
+                self.account_model.add_record(float(rng.integers(1, 1000)), 'expense' if step % 2 else 'income', date, '午餐')
+            if step % 4 == 0:
+                merged = self.account_model.get_record_arrays()
+                rebuilt = AccountModel('data/test_predict_by_time_range_rebuilt.json')
+                rebuilt.records = list(self.account_model.get_all_records())
+                expected = rebuilt.get_record_arrays()
+                for name, column in expected.items():
+                    assert merged[name].tolist() == column.tolist()
+                assert self.account_model.get_record_arrays() is merged
+        result = self.prediction_model.predict_future_by_time_range('2022-01-01', '2023-12-31', days_ahead=7)
+        expected = self._legacy_predict('2022-01-01', '2023-12-31', days_ahead=7)
+        assert result['period_daily_avg_expense'] == expected['period_daily_avg_expense']
@@ -1,6 +1,7 @@
 import pytest
 import os
 import numpy as np
+import pandas as pd
 from src.models.account_model import AccountModel
 from src.models.prediction_model import PredictionModel
 
@@ -254,3 +255,62 @@ class TestPredictFuture:
         # 验证结果不为空
         assert result is not None
         assert len(result['income_prediction']) == 10
+    
+    def test_prepared_series_cached_by_version(self):
+        """测试每日收支序列按账本版本号缓存"""
+        self._add_sufficient_test_records()
+        
+        first = self.prediction_model.prepare_data_for_prediction()
+        # 账本未变化时不同预测天数直接复用缓存
+        self.prediction_model.predict_future(days_ahead=7)
+        self.prediction_model.predict_future(days_ahead=60)
+        assert self.prediction_model.prepare_data_for_prediction() is first
+        
+        # 新增记录后缓存失效
+        self.account_model.add_record(500, 'income', '2023-05-01', '奖金')
+        second = self.prediction_model.prepare_data_for_prediction()
+        assert second is not first
+        assert second[0]['amount'].iloc[-1] == 500
+        
+        # 自定义记录集按内容指纹缓存
+        records = self.account_model.get_records_by_date_range('2023-01-01', '2023-03-31')
+        filtered = self.prediction_model.prepare_data_for_prediction(records)
+        assert self.prediction_model.prepare_data_for_prediction(list(records)) is filtered
+        assert filtered[0]['date'].iloc[-1] == pd.Timestamp('2023-03-03')
+    
+    def test_prepared_series_is_dense_calendar(self):
+        """测试每日序列按日历日连续排列，没有记录的日期金额为0"""
+        self.account_model.add_record(100, 'income', '2023-01-01', '工资')
+        self.account_model.add_record(50, 'expense', '2023-01-02', '餐饮')
+        self.account_model.add_record(300, 'income', '2023-01-10', '工资')
+        self.account_model.add_record(20, 'expense', '2023-01-10', '餐饮')
+        self.account_model.add_record(30, 'expense', '2023-01-10', '交通')
+        
+        daily_income, daily_expense = self.prediction_model.prepare_data_for_prediction()
+        
+        # 收入和支出覆盖相同的日历区间
+        expected_dates = pd.date_range('2023-01-01', '2023-01-10')
+        assert list(daily_income['date']) == list(expected_dates)
+        assert list(daily_expense['date']) == list(expected_dates)
+        assert daily_income['amount'].tolist() == [100] + [0] * 8 + [300]
+        assert daily_expense['amount'].tolist() == [0, 50] + [0] * 7 + [50]
+    
+    def test_predict_future_respects_calendar_gaps(self):
+        """测试回归以日历日为自变量，稀疏账本的间隔不会被当作相邻日期"""
+        # 收入每10天一笔且逐笔增加，支出每天固定
+        for i, amount in enumerate([100, 200, 300]):
+            self.account_model.add_record(amount, 'income', f'2023-01-{1 + i * 10:02d}', '工资')
+        for day in range(1, 22):
+            self.account_model.add_record(10, 'expense', f'2023-01-{day:02d}', '餐饮')
+        
+        result = self.prediction_model.predict_future(days_ahead=10)
+        daily_income, _ = self.prediction_model.prepare_data_for_prediction()
+        x = np.arange(len(daily_income))
+        slope, intercept = np.polyfit(x, daily_income['amount'], 1)
+        expected = np.maximum(intercept + slope * np.arange(len(x), len(x) + 10), 0)
+        np.testing.assert_allclose(result['income_prediction'], expected, rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(result['expense_prediction'], [10] * 10, rtol=1e-9)
+        
+        # 按给定记录重新拟合与增量趋势结果一致
+        refit = self.prediction_model.predict_future(days_ahead=10, records=self.account_model.get_all_records())
+        np.testing.assert_allclose(refit['income_prediction'], result['income_prediction'], rtol=1e-9, atol=1e-9)
@@ -0,0 +1,91 @@
+import pytest
+import os
+import numpy as np
+import pandas as pd
+from src.models.account_model import AccountModel
+from src.models.prediction_model import PredictionModel
+
+class TestPredictMany:
+    """测试PredictionModel.predict_many批量预测"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.temp_data_file = 'data/test_predict_many_records.json'
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+        self.account_model = AccountModel(self.temp_data_file)
+        self.prediction_model = PredictionModel(self.account_model)
+        rng = np.random.default_rng(37)
+        count = 3000
+        days = rng.integers(0, 730, size=count)
+        dates = (np.datetime64('2022-01-01') + days).astype(str)
+        cents = rng.integers(1, 500_000, size=count)
+        types = rng.choice(['income', 'expense'], size=count, p=[0.3, 0.7])
+        self.account_model.records = [
+            {'id': i + 1, 'amount': int(cents[i]) / 100, 'amount_cents': int(cents[i]), 'type': str(types[i]),
+             'date': str(dates[i]), 'description': '', 'category': 'other'}
+            for i in range(count)
+        ]
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+
+    def _reference_window(self, start_date, end_date, horizon):
+        """逐窗口构建逐日序列并用polyfit拟合的参考实现"""
+        calendar = pd.date_range(start_date, end_date)
+        result = {}
+        for record_type in ('income', 'expense'):
+            daily = {}
+            for r in self.account_model.get_all_records():
+                if r['type'] == record_type and start_date <= r['date'] <= end_date:
+                    daily[r['date']] = daily.get(r['date'], 0) + r['amount_cents']
+            y = np.array([daily.get(day.strftime('%Y-%m-%d'), 0) for day in calendar], dtype=float)
+            if len(y) > 1:
+                slope, intercept = np.polyfit(np.arange(len(y)), y, 1)
+            else:
+                slope, intercept = 0.0, y[0]
+            future = intercept + slope * np.arange(len(y), len(y) + horizon)
+            result[record_type] = np.maximum(future, 0) / 100
+        return result
+
+    def test_matches_per_window_fit(self):
+        """测试批量结果与逐窗口拟合一致"""
+        windows = [(f'2022-{m:02d}-01', (pd.Timestamp(f'2022-{m:02d}-01') + pd.offsets.MonthEnd(0)).strftime('%Y-%m-%d'))
+                   for m in range(1, 13)]
+        windows += [('2022-01-01', '2022-03-31'), ('2022-04-01', '2022-06-30'), ('2022-01-01', '2023-12-31')]
+        results = self.prediction_model.predict_many(windows, horizons=[7, 30])
+        assert len(results) == len(windows)
+        for (start_date, end_date), result in zip(windows, results):
+            reference = self._reference_window(start_date, end_date, 30)
+            for horizon in (7, 30):
+                prediction = result['predictions'][horizon]
+                assert len(prediction['income_prediction']) == horizon
+                np.testing.assert_allclose(prediction['income_prediction'], reference['income'][:horizon],
+                                           rtol=1e-6, atol=1e-6)
+                np.testing.assert_allclose(prediction['expense_prediction'], reference['expense'][:horizon],
+                                           rtol=1e-6, atol=1e-6)
+
+    def test_period_statistics_match_time_range(self):
+        """测试窗口统计量与predict_future_by_time_range一致"""
+        windows = [('2022-02-01', '2022-02-28'), ('2023-06-15', '2023-09-30')]
+        for window, result in zip(windows, self.prediction_model.predict_many(windows, horizons=5)):
+            expected = self.prediction_model.predict_future_by_time_range(*window, days_ahead=5)
+            for key in ('period_avg_income', 'period_avg_expense', 'period_daily_avg_income',
+                        'period_daily_avg_expense'):
+                assert result[key] == pytest.approx(expected[key], rel=1e-12)
+
+    def test_edge_windows(self):
+        """测试单日窗口、无数据窗口及非法参数"""
+        single_day = self.account_model.get_all_records()[0]['date']
+        results = self.prediction_model.predict_many([('2030-01-01', '2030-01-31'), (single_day, single_day)], 3)
+        assert results[0] is None
+        if results[1] is not None:
+            income = results[1]['predictions'][3]['income_prediction']
+            assert income == [income[0]] * 3
+        assert self.prediction_model.predict_many([], 3) == []
+        with pytest.raises(ValueError):
+            self.prediction_model.predict_many([('2022-02-01', '2022-01-01')], 3)
+        with pytest.raises(ValueError):
+            self.prediction_model.predict_many([('2022-01-01', '2022-02-01')], 0)
@@ -0,0 +1,62 @@
+import pytest
+import os
+from src.models.account_model import AccountModel
+from src.models.prediction_model import PredictionModel
+
+class TestPredictionCache:
+    """测试PredictionModel的预测结果缓存"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.temp_data_file = 'data/test_prediction_cache_records.json'
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+        self.account_model = AccountModel(self.temp_data_file)
+        with self.account_model.batch():
+            for day in range(1, 21):
+                self.account_model.add_record(1000 + day, 'income', f'2024-01-{day:02d}', '工资', 'salary')
+                self.account_model.add_record(300 + day, 'expense', f'2024-01-{day:02d}', '餐饮', 'food')
+        self.prediction_model = PredictionModel(self.account_model)
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+
+    def test_repeat_time_range_query_hits_cache(self):
+        """测试重复的时间区间查询命中缓存"""
+        first = self.prediction_model.predict_future_by_time_range('2024-01-01', '2024-01-10', 7)
+        second = self.prediction_model.predict_future_by_time_range('2024-01-01', '2024-01-10', 7)
+        assert second is first
+        stats = self.prediction_model.cache_stats()
+        assert (stats['hits'], stats['misses']) == (1, 1)
+        # 参数不同时分别缓存
+        self.prediction_model.predict_future_by_time_range('2024-01-01', '2024-01-10', 14)
+        assert self.prediction_model.cache_stats()['entries'] == 2
+
+    def test_records_change_invalidates_results(self):
+        """测试记录变化后不再返回旧结果"""
+        before = self.prediction_model.predict_future_by_time_range('2024-01-01', '2024-01-10', 7)
+        self.account_model.add_record(5000, 'income', '2024-01-05', '奖金', 'bonus')
+        after = self.prediction_model.predict_future_by_time_range('2024-01-01', '2024-01-10', 7)
+        assert after['period_daily_avg_income'] == pytest.approx(before['period_daily_avg_income'] + 500)
+
+        future = self.prediction_model.predict_future(7)
+        assert self.prediction_model.predict_future(7) is future
+        self.account_model.delete_record(1)
+        assert self.prediction_model.predict_future(7) is not future
+
+    def test_none_result_cached(self):
+        """测试数据不足的查询结果同样被缓存"""
+        assert self.prediction_model.predict_future_by_time_range('2023-01-01', '2023-01-10') is None
+        assert self.prediction_model.predict_future_by_time_range('2023-01-01', '2023-01-10') is None
+        assert self.prediction_model.cache_stats()['hits'] == 1
+
+    def test_configurable_limits(self):
+        """测试可配置的条目上限"""
+        prediction_model = PredictionModel(self.account_model, result_cache_entries=1, result_cache_ttl=60)
+        prediction_model.predict_future_by_time_range('2024-01-01', '2024-01-10', 7)
+        prediction_model.predict_future_by_time_range('2024-01-01', '2024-01-11', 7)
+        stats = prediction_model.cache_stats()
+        assert (stats['entries'], stats['evictions']) == (1, 1)
+        assert prediction_model.result_cache.ttl == 60
@@ -0,0 +1,86 @@
+import pytest
+import os
+import numpy as np
+from src.models.account_model import AccountModel
+from src.models.prediction_model import PredictionModel
+
+class TestPredictionIntervals:
+    """测试自助抽样预测区间"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.temp_data_file = 'data/test_prediction_intervals_records.json'
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+        self.account_model = AccountModel(self.temp_data_file)
+        self.prediction_model = PredictionModel(self.account_model)
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+
+    def _add_noisy_records(self, days=90, income_slope=0):
+        """每天一笔收入和支出，金额在固定水平（收入可带每天上升income_slope元的趋势）上下波动"""
+        rng = np.random.default_rng(41)
+        dates = (np.datetime64('2023-01-01') + np.arange(days)).astype(str)
+        records = []
+        for i, date in enumerate(dates):
+            for record_type, base in (('income', 300), ('expense', 200)):
+                cents = int(base * 100 + rng.integers(-5000, 5000))
+                if record_type == 'income':
+                    cents += i * income_slope * 100
+                records.append({'id': len(records) + 1, 'amount': cents / 100, 'amount_cents': cents,
+                                'type': record_type, 'date': str(date), 'description': '', 'category': 'other'})
+        self.account_model.records = records
+
+    def test_interval_structure_and_order(self):
+        """测试区间结构及分位数顺序"""
+        self._add_noisy_records()
+        result = self.prediction_model.predict_intervals(days_ahead=14, samples=3000, seed=1)
+        assert result['samples'] == 3000
+        for name in ('income', 'expense', 'net'):
+            bands = result[name]
+            assert all(len(bands[label]) == 14 for label in ('p10', 'p50', 'p90'))
+            assert np.all(np.array(bands['p10']) <= np.array(bands['p50']))
+            assert np.all(np.array(bands['p50']) <= np.array(bands['p90']))
+            total = result['total'][name]
+            assert total['p10'] <= total['p50'] <= total['p90']
+        # 收支在固定水平附近波动，中位数接近点预测
+        point = self.prediction_model.predict_future(days_ahead=14)
+        np.testing.assert_allclose(result['income']['p50'], point['income_prediction'], atol=15)
+        assert min(result['expense']['p10']) >= 0
+
+    def test_seed_reproducible_and_chunked(self):
+        """测试相同种子结果可复现，分块结果与进程数无关"""
+        self._add_noisy_records()
+        first = self.prediction_model.predict_intervals(7, samples=500, seed=3)
+        assert self.prediction_model.predict_intervals(7, samples=500, seed=3) == first
+        sequential = self.prediction_model.predict_intervals(7, samples=2500, seed=3, chunk_size=1000, max_workers=1)
+        parallel = self.prediction_model.predict_intervals(7, samples=2500, seed=3, chunk_size=1000, max_workers=2)
+        assert sequential == parallel
+        assert sequential['samples'] == 2500
+
+    def test_interval_around_given_point(self):
+        """测试给出点预测时区间以其为中心（按时间区间的日均值预测），而非线性趋势"""
+        # 收入逐日上升，线性趋势外推明显高于区间日均值
+        self._add_noisy_records(income_slope=5)
+        prediction = self.prediction_model.predict_future_by_time_range('2023-01-01', '2023-03-31', 14)
+        point = (prediction['income_prediction'], prediction['expense_prediction'])
+        result = self.prediction_model.predict_intervals(14, samples=3000, seed=1, point=point)
+        for name in ('income', 'expense', 'net'):
+            total = result['total'][name]
+            expected = sum(prediction[f'{name}_prediction'])
+            assert total['p10'] <= expected <= total['p90']
+        trend = self.prediction_model.predict_intervals(14, samples=3000, seed=1)
+        assert trend['total']['income']['p10'] > result['total']['income']['p90']
+        with pytest.raises(ValueError):
+            self.prediction_model.predict_intervals(14, point=(point[0], point[1][:7]))
+
+    def test_insufficient_data_and_invalid_arguments(self):
+        """测试数据不足和非法参数"""
+        assert self.prediction_model.predict_intervals() is None
+        self.account_model.add_record(100, 'income', '2023-01-01', '工资')
+        assert self.prediction_model.predict_intervals() is None
+        with pytest.raises(ValueError):
+            self.prediction_model.predict_intervals(days_ahead=0)
@@ -0,0 +1,115 @@
+import pytest
+import os
+import json
+import shutil
+import subprocess
+import sys
+import numpy as np
+import batch_profile
+from src.models.account_model import AccountModel
+from src.models.prediction_model import PredictionModel
+from src.models.profile_batch import cohort_statistics, collect_ledger_files, run_profiles
+
+class TestProfileBatch:
+    """测试批量并行计算经济画像"""
+
+    def setup_method(self):
+        """每个测试方法执行前生成测试账本"""
+        self.ledger_dir = 'data/test_profile_batch'
+        if os.path.exists(self.ledger_dir):
+            shutil.rmtree(self.ledger_dir)
+        os.makedirs(self.ledger_dir)
+        rng = np.random.default_rng(3)
+        descriptions = ['午餐', '超市买菜', '房租', '地铁', '电影']
+        for index in range(6):
+            records = []
+            for i in range(60):
+                record_type = 'income' if i % 4 == 0 else 'expense'
+                cents = int(rng.integers(1000, 500000))
+                records.append({'id': i + 1, 'amount': cents / 100, 'amount_cents': cents, 'type': record_type,
+                                'date': str(np.datetime64('2023-01-01') + int(rng.integers(0, 180))),
+                                'description': str(rng.choice(descriptions))})
+            self._write_ledger(f'household_{index}', records)
+        self._write_ledger('empty', [])
+        self.output = os.path.join(self.ledger_dir, 'out', 'profiles.jsonl')
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.ledger_dir):
+            shutil.rmtree(self.ledger_dir)
+
+    def _write_ledger(self, name, records):
+        with open(os.path.join(self.ledger_dir, f'{name}.json'), 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False)
+
+    def _read_output(self):
+        with open(self.output, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_collect_ledger_files(self):
+        """测试展开目录和通配符并去重"""
+        files = collect_ledger_files([self.ledger_dir, os.path.join(self.ledger_dir, 'household_*.json')])
+        assert len(files) == 7
+        assert files[0].endswith('empty.json')
+
+    @pytest.mark.parametrize('max_workers', [1, 2])
+    def test_profiles_match_single_ledger(self, max_workers):
+        """测试批量结果与逐个账本计算一致（复用模型加载不同账本不应串数据）"""
+        files = collect_ledger_files([self.ledger_dir])
+        summary = run_profiles(files, self.output, max_workers=max_workers, chunk_size=2)
+        lines = self._read_output()
+        assert [line['file'] for line in lines] == files
+        for line in lines:
+            expected = PredictionModel(AccountModel(line['file'])).get_economic_profile()
+            assert line['profile'] == json.loads(json.dumps(expected))
+        assert summary['ledgers'] == 7 and summary['profiled'] == 6
+
+    def test_malformed_ledger(self, monkeypatch):
+        """测试个别账本出错时写出错误行，其余账本照常生成画像；无法解析的记录被隔离，不影响账本"""
+        self._write_ledger('broken', [{'id': 1, 'amount': 'abc', 'type': 'expense', 'date': '2023-01-01',
+                                       'description': '午餐'}])
+        original = PredictionModel.get_economic_profile
+
+        def failing_profile(prediction_model):
+            if prediction_model.account_model.data_file.endswith('household_2.json'):
+                raise RuntimeError("画像计算失败")
+            return original(prediction_model)
+
+        monkeypatch.setattr(PredictionModel, 'get_economic_profile', failing_profile)
+        files = collect_ledger_files([self.ledger_dir])
+        summary = run_profiles(files, self.output, max_workers=1, chunk_size=3)
+        lines = self._read_output()
+        assert [line['file'] for line in lines] == files
+        failed = [line for line in lines if 'error' in line]
+        assert [(line['ledger'], line['error']) for line in failed] == [('household_2', 'RuntimeError: 画像计算失败')]
+        assert [line['records'] for line in lines if line['ledger'] == 'broken'] == [0]
+        assert summary['ledgers'] == 8 and summary['profiled'] == 5 and summary['failed'] == 1
+
+    def test_cohort_statistics(self):
+        """测试人群分位数和百分位排名"""
+        values = {'engel_coefficient': [(f'f{i}', value) for i, value in enumerate([0.1, 0.2, 0.3, 0.4])],
+                  'avg_propensity_consumption': []}
+        percentiles, ranks = cohort_statistics(values)
+        assert percentiles['engel_coefficient']['p50'] == pytest.approx(0.25)
+        assert percentiles['avg_propensity_consumption'] is None
+        assert [ranks[f'f{i}']['engel_coefficient'] for i in range(4)] == [25, 50, 75, 100]
+
+    def test_command_line(self):
+        """测试命令行入口"""
+        summary_file = os.path.join(self.ledger_dir, 'out', 'summary.json')
+        summary = batch_profile.main([os.path.join(self.ledger_dir, '*.json'), '--output', self.output,
+                                      '--summary', summary_file, '--workers', '1'])
+        with open(summary_file, encoding='utf-8') as f:
+            assert json.load(f)['profiled'] == summary['profiled'] == 6
+        assert len(self._read_output()) == 7
+
+    def test_command_line_bare_file_names(self):
+        """测试在账本目录中以不带目录的文件名运行命令行"""
+        script = os.path.abspath(batch_profile.__file__)
+        result = subprocess.run([sys.executable, script, 'household_0.json', 'empty.json', '--workers', '1',
+                                 '--output', 'profiles.jsonl', '--summary', 'summary.json'],
+                                cwd=self.ledger_dir, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        with open(os.path.join(self.ledger_dir, 'summary.json'), encoding='utf-8') as f:
+            summary = json.load(f)
+        assert summary['ledgers'] == 2 and summary['profiled'] == 1 and summary['failed'] == 0
@@ -0,0 +1,123 @@
+import pytest
+import os
+import numpy as np
+from src.models.account_model import AccountModel, day_number
+from src.models.prediction_model import PredictionModel
+from src.models.recurrence_model import (autocorrelation, detect_recurring, next_occurrences,
+                                         normalize_description, project_schedules)
+
+class TestRecurrenceDetection:
+    """测试周期性收支识别"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.temp_data_file = 'data/test_recurrence_records.json'
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+        self.account_model = AccountModel(self.temp_data_file)
+        self.prediction_model = PredictionModel(self.account_model)
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+
+    def _add_household(self, months=14):
+        """每月1日房租、10日工资（金额小幅变化）、每周二视频会员，另有每天金额不定的午餐"""
+        rng = np.random.default_rng(0)
+        first = np.datetime64('2023-01-01')
+        last = (np.datetime64('2023-01', 'M') + months).astype('datetime64[D]') - 1
+        with self.account_model.batch():
+            for month in range(months):
+                start = (np.datetime64('2023-01', 'M') + month).astype('datetime64[D]')
+                self.account_model.add_record(3000, 'expense', str(start), f'{month + 1}月房租')
+                self.account_model.add_record(12000 + month * 10, 'income', str(start + 9), '工资')
+            for day in range(int((last - first).astype(int)) + 1):
+                date = first + day
+                self.account_model.add_record(round(float(rng.uniform(20, 40)), 2), 'expense', str(date), '午餐')
+                if day % 7 == 2:
+                    self.account_model.add_record(15, 'expense', str(date), '视频会员')
+
+    def test_normalize_description(self):
+        """测试描述归一化去掉数字和标点"""
+        assert normalize_description('3月房租') == normalize_description('4月 房租') == '月房租'
+        assert normalize_description('Netflix-2024') == 'netflix'
+        assert normalize_description(None) == ''
+
+    def test_autocorrelation_counts_pairs(self):
+        """测试FFT自相关等于相隔各天数的发生次数"""
+        rng = np.random.default_rng(1)
+        occurrence = (rng.random((3, 50)) < 0.3).astype(float)
+        acf = autocorrelation(occurrence, 10)
+        for row in range(3):
+            expected = [int((occurrence[row, lag:] * occurrence[row, :50 - lag]).sum()) for lag in range(11)]
+            assert acf[row].tolist() == expected
+
+    def test_detects_schedules(self):
+        """测试识别每周、每月计划，每天发生的支出不被识别"""
+        self._add_household()
+        schedules = self.prediction_model.get_recurring_schedules()
+        summary = [(s['description'], s['type'], s['period'], s['amount'], s['day_of_month']) for s in schedules]
+        assert summary == [
+            ('视频会员', 'expense', 'weekly', 15, None),
+            ('工资', 'income', 'monthly', 12065, 10),
+            ('14月房租', 'expense', 'monthly', 3000, 1),
+        ]
+        assert [s['next_date'] for s in schedules] == ['2024-03-05', '2024-03-10', '2024-03-01']
+        assert all(s['active'] for s in schedules)
+
+    def test_detects_yearly_and_inactive(self):
+        """测试识别按年计划，以及已停止的计划不再生效"""
+        days = [day_number(f'{year}-02-29' if year % 4 == 0 else f'{year}-02-28') for year in range(2019, 2024)]
+        days += [day_number(f'2019-{month:02d}-15') for month in range(1, 7)]
+        days.append(day_number('2024-06-30'))
+        cents = [59900] * 5 + [8800] * 6 + [100]
+        descriptions = ['年费'] * 5 + ['健身房'] * 6 + ['其他']
+        schedules, mask = detect_recurring(days, cents, [True] * len(days), descriptions)
+        by_name = {s['description']: s for s in schedules}
+        assert by_name['年费']['period'] == 'yearly'
+        assert by_name['年费']['active']
+        assert by_name['健身房']['period'] == 'monthly'
+        assert not by_name['健身房']['active']
+        assert mask.tolist() == [True] * 11 + [False]
+
+    def test_next_occurrences_clip_to_month_end(self):
+        """测试按月计划在小月落在月末"""
+        schedule = {'period': 'monthly', 'last_date': '2024-01-31', 'day_of_month': 31}
+        dates = next_occurrences(schedule, day_number('2024-02-01'), count=3)
+        assert [str(np.datetime64(int(d), 'D')) for d in dates] == ['2024-02-29', '2024-03-31', '2024-04-30']
+        weekly = {'period': 'weekly', 'last_date': '2024-01-02', 'day_of_month': None}
+        dates = next_occurrences(weekly, day_number('2024-01-10'), end_day=day_number('2024-01-31'))
+        assert [str(np.datetime64(int(d), 'D')) for d in dates] == ['2024-01-16', '2024-01-23', '2024-01-30']
+
+    def test_project_schedules(self):
+        """测试按计划日期投射金额，未生效的计划不投射"""
+        schedules = [
+            {'period': 'monthly', 'last_date': '2024-01-01', 'day_of_month': 1, 'type': 'expense', 'amount': 3000, 'active': True},
+            {'period': 'monthly', 'last_date': '2024-01-10', 'day_of_month': 10, 'type': 'income', 'amount': 12000, 'active': True},
+            {'period': 'monthly', 'last_date': '2024-01-05', 'day_of_month': 5, 'type': 'expense', 'amount': 99, 'active': False},
+        ]
+        income, expense = project_schedules(schedules, day_number('2024-01-20'), 30)
+        assert np.flatnonzero(income).tolist() == [21]
+        assert np.flatnonzero(expense).tolist() == [12]
+        assert expense[12] == 3000
+
+    def test_predict_future_with_recurring(self):
+        """测试预测中周期性收支按计划日期原样出现"""
+        self._add_household()
+        prediction = self.prediction_model.predict_future(31, recurring=True)
+        # 最后一条记录在2024-02-29，预测从2024-03-01开始
+        assert prediction['recurring_expense'][0] == 3000
+        assert prediction['recurring_income'][9] == 12065
+        assert np.flatnonzero(prediction['recurring_income']).tolist() == [9]
+        assert prediction['income_prediction'][9] == pytest.approx(12065)
+        # 其余日期的支出来自午餐的趋势，在30元左右
+        assert 20 < prediction['expense_prediction'][1] < 40
+        assert prediction['net_prediction'][0] == pytest.approx(
+            prediction['income_prediction'][0] - prediction['expense_prediction'][0])
+        # 结果按账本版本号缓存
+        assert self.prediction_model.predict_future(31, recurring=True) is prediction
+        self.account_model.add_record(30, 'expense', '2024-02-29', '午餐')
+        assert self.prediction_model.predict_future(31, recurring=True) is not prediction
+        with pytest.raises(ValueError):
+            self.prediction_model.predict_future(31, records=self.account_model.get_all_records(), recurring=True)
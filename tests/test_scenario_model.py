@@ -0,0 +1,114 @@
+import pytest
+import os
+import numpy as np
+from src.models.account_model import AccountModel
+from src.models.prediction_model import PredictionModel
+from src.models.scenario_model import ScenarioEngine, lever_mask, scenario_grid
+
+class TestScenarioEngine:
+    """测试情景模拟"""
+
+    def setup_method(self):
+        """每个测试方法执行前初始化"""
+        self.temp_data_file = 'data/test_scenario_records.json'
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+        self.account_model = AccountModel(self.temp_data_file)
+        self.prediction_model = PredictionModel(self.account_model)
+        self.engine = ScenarioEngine(self.prediction_model, days_ahead=90)
+
+    def teardown_method(self):
+        """每个测试方法执行后清理"""
+        if os.path.exists(self.temp_data_file):
+            os.remove(self.temp_data_file)
+
+    def _add_household(self):
+        """14个月：每月1日房租3000、10日工资12000，每天午餐，每5天一次地铁"""
+        rng = np.random.default_rng(0)
+        first = np.datetime64('2023-01-01')
+        with self.account_model.batch():
+            for month in range(14):
+                start = (np.datetime64('2023-01', 'M') + month).astype('datetime64[D]')
+                self.account_model.add_record(3000, 'expense', str(start), '房租')
+                self.account_model.add_record(12000, 'income', str(start + 9), '工资')
+            for day in range(425):
+                date = str(first + day)
+                self.account_model.add_record(round(float(rng.uniform(20, 40)), 2), 'expense', date, '午餐')
+                if day % 5 == 0:
+                    self.account_model.add_record(50, 'expense', date, '地铁')
+
+    def test_project_cash_flows(self):
+        """测试收支分量之和与按周期性计划的预测一致"""
+        self._add_household()
+        projection = self.prediction_model.project_cash_flows(90)
+        assert projection['start_date'] == '2024-03-01'
+        assert [(c['type'], c['category'], c['recurring']) for c in projection['components']] == [
+            ('income', 'salary', True), ('expense', 'housing', True),
+            ('expense', 'food', False), ('expense', 'transport', False)]
+        prediction = self.prediction_model.predict_future(90, recurring=True)
+        is_income = np.array([c['type'] == 'income' for c in projection['components']])
+        assert projection['flows'][is_income].sum(axis=0) == pytest.approx(prediction['income_prediction'])
+        assert projection['flows'][~is_income].sum(axis=0) == pytest.approx(prediction['expense_prediction'])
+        assert self.prediction_model.project_cash_flows(90) is projection
+
+    def test_lever_mask(self):
+        """测试调整项按分量和日期选中单元格"""
+        components = [{'type': 'income', 'category': 'salary', 'label': '工资', 'recurring': True},
+                      {'type': 'expense', 'category': 'food', 'label': 'food', 'recurring': False}]
+        mask = lever_mask({'category': 'salary', 'start': 2, 'days': 3}, components, 10)
+        assert mask[0].nonzero()[0].tolist() == [2, 3, 4]
+        assert not mask[1].any()
+        assert lever_mask({'type': 'expense'}, components, 10)[1].all()
+        with pytest.raises(ValueError):
+            lever_mask({'factor': 2}, components, 10)
+        with pytest.raises(ValueError):
+            lever_mask({'type': 'expense', 'start': -1}, components, 10)
+
+    def test_scenario_grid(self):
+        """测试候选倍数的全部组合"""
+        grid = scenario_grid([[1.0, 1.1], [0, 0.5, 1]])
+        assert grid.shape == (6, 2)
+        assert grid[1].tolist() == [1.0, 0.5]
+        assert scenario_grid([]).shape == (1, 0)
+
+    def test_single_scenario_runway(self):
+        """测试"房租涨10%、工资停发2个月、餐饮减少30%"的余额曲线和资金耗尽日"""
+        self._add_household()
+        levers = [{'category': 'housing', 'factor': 1.1},
+                  {'category': 'salary', 'factor': 0, 'days': 60},
+                  {'category': 'food', 'factor': 0.7}]
+        result = self.engine.simulate(levers, balance=5000)
+        assert result['matched'] == [1, 1, 1]
+        projection = self.engine.baseline()
+        flows = projection['flows'].copy()
+        flows[1] *= 1.1
+        flows[0, :60] = 0
+        flows[2] *= 0.7
+        net = flows[0] - flows[1:].sum(axis=0)
+        assert result['balance'][0] == pytest.approx(5000 + np.cumsum(net))
+        # 3月1日付房租后余额1700，4月1日（第32天）再付房租时余额为负
+        assert result['runway'].tolist() == [32]
+        baseline = self.engine.simulate([], balance=5000)
+        assert baseline['runway'].tolist() == [-1]
+        assert baseline['end_balance'][0] == pytest.approx(5000 + np.cumsum(projection['flows'][0] - projection['flows'][1:].sum(axis=0))[-1])
+
+    def test_many_scenarios_match_individual_runs(self):
+        """测试一次模拟多个情景与逐个模拟结果一致，重叠的调整项倍数相乘"""
+        self._add_household()
+        levers = [{'type': 'expense', 'start': 10, 'days': 30}, {'category': 'food'}, {'recurring': True}]
+        factors = scenario_grid([[0.5, 1, 2], [0, 1.3], [1, 0.8]])
+        result = self.engine.simulate(levers, factors, balance=1000)
+        assert result['balance'].shape == (12, 90)
+        for i, row in enumerate(factors):
+            single = self.engine.simulate([dict(lever, factor=f) for lever, f in zip(levers, row)], balance=1000)
+            assert result['balance'][i] == pytest.approx(single['balance'][0])
+            assert result['runway'][i] == single['runway'][0]
+        with pytest.raises(ValueError):
+            self.engine.simulate(levers, [[1, 1]])
+        with pytest.raises(ValueError):
+            self.engine.simulate(levers, [[1, -1, 1]])
+
+    def test_insufficient_data(self):
+        """测试数据不足时抛出ValueError"""
+        with pytest.raises(ValueError):
+            self.engine.simulate([{'type': 'income', 'factor': 0}])
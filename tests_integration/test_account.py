@@ -192,3 +192,19 @@ class TestAccountIntegration:
         
         for amount, record_type, date, description in test_records:
             self.account_model.add_record(amount, record_type, date, description)
+
+    def test_batch_saves_once_integration(self):
+        """测试批量操作期间推迟保存，退出时统一写入文件"""
+        with self.account_model.batch():
+            for day in range(1, 4):
+                success, _ = self.account_model.add_record(100, 'expense', f'2023-01-0{day}', '餐饮')
+                assert success is True
+            self.account_model.delete_record(1)
+            # 批量期间文件内容保持不变
+            with open(self.temp_data_file, 'r', encoding='utf-8') as f:
+                assert json.load(f) == []
+
+        with open(self.temp_data_file, 'r', encoding='utf-8') as f:
+            saved_records = json.load(f)
+        assert [r['id'] for r in saved_records] == [2, 3]
+        assert self.account_model.flush() is True